@@ -1,4 +1,4 @@
-import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
+import { useInfiniteQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import { api } from '@/shared/api/httpClient';
 
 interface DocumentInfo {
@@ -9,15 +9,30 @@ interface DocumentInfo {
     created_at: string;
 }
 
+interface DocumentPage {
+    documents: DocumentInfo[];
+    nextCursor: string | null;
+    total: number;
+}
+
 export function useDocuments() {
     const queryClient = useQueryClient();
 
-    const query = useQuery({
+    // Newest first, a page at a time; new uploads land on the first page
+    const query = useInfiniteQuery({
         queryKey: ['documents'],
-        queryFn: async () => {
-            const data = await api.get<{ documents: DocumentInfo[] }>('/documents');
-            return data.documents;
+        queryFn: ({ pageParam }) => {
+            const params = new URLSearchParams({ order: 'desc' });
+            if (pageParam) params.set('cursor', pageParam);
+            return api.get<DocumentPage>(`/documents?${params}`);
         },
+        initialPageParam: null as string | null,
+        getNextPageParam: (lastPage) => lastPage.nextCursor,
+        // Ingestion runs in the background; poll until every loaded upload settles
+        refetchInterval: (query) =>
+            query.state.data?.pages.some((page) => page.documents.some((d) => d.status === 'processing'))
+                ? 2000
+                : false,
     });
 
     const uploadMutation = useMutation({
@@ -35,7 +50,11 @@ export function useDocuments() {
     });
 
     return {
-        documents: query.data || [],
+        documents: query.data?.pages.flatMap((page) => page.documents) ?? [],
+        total: query.data?.pages[0]?.total ?? 0,
+        hasMore: query.hasNextPage,
+        loadMore: query.fetchNextPage,
+        isLoadingMore: query.isFetchingNextPage,
         isLoading: query.isLoading,
         isError: query.isError,
         uploadDocument: uploadMutation.mutate,
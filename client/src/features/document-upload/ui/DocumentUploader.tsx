@@ -16,6 +16,10 @@ import { toast } from 'sonner';
 export function DocumentUploader() {
     const {
         documents,
+        total,
+        hasMore,
+        loadMore,
+        isLoadingMore,
         uploadDocument,
         isUploading,
         deleteDocument,
@@ -72,7 +76,7 @@ export function DocumentUploader() {
                     <div>
                         <h2 className="text-sm font-bold tracking-tight text-white uppercase opacity-90">Intelligence</h2>
                         <span className="text-[10px] font-bold uppercase tracking-widest text-zinc-500">
-                            {documents.length} Units Active
+                            {total} Units Active
                         </span>
                     </div>
                 </div>
@@ -160,6 +164,17 @@ export function DocumentUploader() {
                                 </Button>
                             </div>
                         ))}
+                        {hasMore && (
+                            <Button
+                                variant="ghost"
+                                size="sm"
+                                className="w-full rounded-xl text-[9px] font-bold uppercase tracking-widest text-zinc-500 hover:text-zinc-200"
+                                onClick={() => loadMore()}
+                                disabled={isLoadingMore}
+                            >
+                                {isLoadingMore ? <Loader2 className="h-3.5 w-3.5 animate-spin" /> : 'Load more'}
+                            </Button>
+                        )}
                     </div>
                 </ScrollArea>
             )}
@@ -0,0 +1,191 @@
+"""Onboarding throughput: one /ingest request per file vs a single /ingest/bulk zip.
+
+Writes ``--docs`` text documents of ``--doc-kb`` KB and ingests them
+through the real app, twice:
+
+  single  one POST /ingest per file (retried on 503), drained by the
+          INGEST_WORKERS document-at-a-time workers
+  bulk    one POST /ingest/bulk carrying a zip of every file, run
+          through the staged parse → embed → upsert pipeline
+
+Embedding is a stub costing ``--embed-latency-ms`` per request plus
+``--embed-ms-per-chunk`` per text, at most EMBEDDING_MAX_IN_FLIGHT at
+once, like a remote API. Upserts cost ``--upsert-latency-ms``. Reports
+documents/min, chunks/s, embedding requests and their average size, and
+how much of the run each stage had work in flight (parse for bulk only).
+
+Usage (from rag-server/, needs the ``bench`` extra):
+    python -m benchmarks.bulk_ingest --docs 200 --doc-kb 32
+"""
+import argparse
+import asyncio
+import io
+import random
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+import httpx
+
+from src.config import get_settings
+from src.core.bulk_ingestion import StageClock, get_bulk_pipeline
+from src.core.ingestion import get_ingestion_queue
+from src.core.parse_pool import shutdown_process_pool
+from src.main import app
+from .stubs import StubEmbeddings, StubVectorStore, install_fake_redis, install_stubs, quiet_logs
+
+_WORDS = "manual pump valve pressure torque install warranty service filter seal motor flow".split()
+
+
+class _Embeddings(StubEmbeddings):
+    """Stub whose cost grows with the batch, timed by a ``StageClock``."""
+
+    def __init__(self, args, max_concurrency: int):
+        super().__init__(latency_s=args.embed_latency_ms / 1000, max_concurrency=max_concurrency)
+        self.per_chunk_s = args.embed_ms_per_chunk / 1000
+        self.clock = StageClock()
+        self.texts = 0
+
+    async def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        self.calls += 1
+        self.texts += len(texts)
+        async with self._slots:
+            with self.clock.running():
+                await asyncio.sleep(self.latency_s + self.per_chunk_s * len(texts))
+        return [[0.0] * self.dimensions for _ in texts]
+
+
+class _Store(StubVectorStore):
+    def __init__(self, args):
+        super().__init__(latency_s=args.upsert_latency_ms / 1000, keep_points=False)
+        self.clock = StageClock()
+
+    async def upsert_chunks(self, *args, **kwargs) -> int:
+        with self.clock.running():
+            return await super().upsert_chunks(*args, **kwargs)
+
+
+def _write_docs(directory: Path, count: int, kb: int) -> list[Path]:
+    rng = random.Random(0)
+    paths = []
+    for i in range(count):
+        path = directory / f"manual-{i:05d}.txt"
+        with open(path, "w") as f:
+            while f.tell() < kb * 1024:
+                f.write(" ".join(rng.choice(_WORDS) for _ in range(rng.randint(40, 160))) + ".\n\n")
+        paths.append(path)
+    return paths
+
+
+async def _ready(client: httpx.AsyncClient) -> int:
+    counts = (await client.get("/documents/counts")).json()
+    if counts["failed"]:
+        raise RuntimeError(f"{counts['failed']} documents failed to ingest")
+    return counts["ready"]
+
+
+async def _wait_ready(client: httpx.AsyncClient, ids: set[str], ready_before: int) -> int:
+    """Wait for ``ids`` to join the documents already ready, then sum their chunks."""
+    while await _ready(client) < ready_before + len(ids):
+        await asyncio.sleep(0.05)
+
+    chunks, cursor = 0, None
+    while True:
+        params = {"status": "ready", "limit": 1000} | ({"cursor": cursor} if cursor else {})
+        resp = await client.get("/documents", params=params)
+        chunks += sum(doc["points_upserted"] for doc in resp.json() if doc["id"] in ids)
+        cursor = resp.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return chunks
+
+
+async def _single(client: httpx.AsyncClient, paths: list[Path]) -> set[str]:
+    ids = set()
+    for path in paths:
+        while True:
+            resp = await client.post("/ingest", files={"file": (path.name, path.read_bytes(), "text/plain")})
+            if resp.status_code != 503:
+                break
+            await asyncio.sleep(0.05)  # queue full
+        resp.raise_for_status()
+        ids.add(resp.json()["id"])
+    return ids
+
+
+async def _bulk(client: httpx.AsyncClient, paths: list[Path]) -> set[str]:
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zf:
+        for path in paths:
+            zf.write(path, f"manuals/{path.name}")
+    resp = await client.post("/ingest/bulk", files={"files": ("manuals.zip", archive.getvalue(), "application/zip")})
+    resp.raise_for_status()
+    return {d["id"] for d in resp.json()["documents"]}
+
+
+async def _run(mode: str, client: httpx.AsyncClient, paths: list[Path], args) -> dict:
+    embeddings = _Embeddings(args, get_settings().EMBEDDING_MAX_IN_FLIGHT)
+    store = _Store(args)
+    install_stubs(embeddings, store)
+    pipeline = get_bulk_pipeline()
+    parse = pipeline.clocks["parse"] = StageClock()
+
+    ready_before = await _ready(client)
+    start = time.perf_counter()
+    ids = await (_single if mode == "single" else _bulk)(client, paths)
+    chunks = await _wait_ready(client, ids, ready_before)
+    elapsed = time.perf_counter() - start
+    return {
+        "seconds": elapsed,
+        "docs_per_min": len(paths) / elapsed * 60,
+        "chunks_per_s": chunks / elapsed,
+        "embed_requests": embeddings.calls,
+        "chunks_per_request": embeddings.texts / max(embeddings.calls, 1),
+        "parse": parse.active_s / elapsed if mode == "bulk" else None,
+        "embed": embeddings.clock.active_s / elapsed,
+        "upsert": store.clock.active_s / elapsed,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=200)
+    parser.add_argument("--doc-kb", type=int, default=32)
+    parser.add_argument("--embed-latency-ms", type=float, default=80)
+    parser.add_argument("--embed-ms-per-chunk", type=float, default=1.0)
+    parser.add_argument("--upsert-latency-ms", type=float, default=10)
+    parser.add_argument("--modes", nargs="+", choices=["single", "bulk"], default=["single", "bulk"])
+    args = parser.parse_args()
+    quiet_logs()
+    install_fake_redis()
+
+    queue = get_ingestion_queue()
+    pipeline = get_bulk_pipeline()
+    queue.start()
+    pipeline.start()
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=120)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = _write_docs(Path(tmp), args.docs, args.doc_kb)
+            # Spawn the parse pool before anything is timed.
+            await _run("single", client, paths[:1], args)
+
+            print(f"{args.docs} documents x {args.doc_kb} KB, embedding {args.embed_latency_ms:.0f} ms/request "
+                  f"+ {args.embed_ms_per_chunk:g} ms/chunk, upsert {args.upsert_latency_ms:.0f} ms")
+            print(f"{'mode':<8}{'seconds':>9}{'docs/min':>10}{'chunks/s':>10}{'requests':>10}{'chunks/req':>12}"
+                  f"   busy: parse / embed / upsert")
+            for mode in args.modes:
+                r = await _run(mode, client, paths, args)
+                parse = f"{r['parse']:.0%}" if r["parse"] is not None else "-"
+                print(f"{mode:<8}{r['seconds']:>9.2f}{r['docs_per_min']:>10.0f}{r['chunks_per_s']:>10.0f}"
+                      f"{r['embed_requests']:>10}{r['chunks_per_request']:>12.1f}"
+                      f"   {parse:>5} / {r['embed']:.0%} / {r['upsert']:.0%}")
+    finally:
+        await client.aclose()
+        await pipeline.stop()
+        await queue.stop()
+        shutdown_process_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
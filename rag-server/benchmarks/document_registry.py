@@ -0,0 +1,174 @@
+"""Document registry at scale: the indexed registry vs the old single JSON hash.
+
+Registers ``--documents`` documents (``--processing-pct`` of them still
+processing, a few failed) in both layouts under a throwaway tenant, then
+times, ``--repeat`` times each:
+
+  list        what GET /documents reads: the old layout loads, validates and
+              sorts every document; the registry reads one ``--page`` page
+  deep page   a page from the middle of the listing, by cursor
+  processing  the processing documents only (the UI's poll), one page
+  counts      total and per-status counts
+  progress    one progress update during ingestion: the old layout rewrites
+              the whole JSON, the registry writes the progress fields
+
+Each row shows p50 latency and the bytes of document data read or
+written. Runs against fakeredis unless ``--redis-url`` is given; fakeredis
+executes commands in Python, so absolute times are inflated, and more so
+per command than per byte.
+
+Usage (from rag-server/):
+    python -m benchmarks.document_registry --documents 100000
+    python -m benchmarks.document_registry --redis-url redis://localhost:6379
+"""
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import redis.asyncio as aioredis
+
+from src.adapters import redis_store
+from src.core.ingestion import PROGRESS_FIELDS
+from src.models.document import DocumentInfo, DocumentStatus, IngestStage
+from .stubs import install_fake_redis, percentile, quiet_logs
+
+TENANT = "bench-registry"
+LEGACY_KEY = f"{redis_store.LEGACY_DOCS_KEY}:{TENANT}"
+_BATCH = 1000
+
+
+def _documents(n: int, processing_pct: float) -> list[DocumentInfo]:
+    rng = random.Random(0)
+    start = datetime(2026, 1, 1)
+    docs = []
+    for i in range(n):
+        roll = rng.random() * 100
+        status = (
+            DocumentStatus.PROCESSING if roll < processing_pct
+            else DocumentStatus.FAILED if roll > 99.5
+            else DocumentStatus.READY
+        )
+        docs.append(DocumentInfo(
+            id=str(uuid.UUID(int=rng.getrandbits(128))),
+            filename=f"manual-{i:06d}.pdf",
+            status=status,
+            stage=IngestStage.EMBEDDING if status == DocumentStatus.PROCESSING else IngestStage.DONE,
+            chunks=rng.randint(20, 800),
+            file_size=rng.randint(10_000, 5_000_000),
+            created_at=start + timedelta(seconds=i * 7),
+            error="Document is empty" if status == DocumentStatus.FAILED else None,
+            tenant_id=TENANT,
+        ))
+    return docs
+
+
+async def _load(r: aioredis.Redis, docs: list[DocumentInfo]) -> None:
+    for offset in range(0, len(docs), _BATCH):
+        batch = docs[offset:offset + _BATCH]
+        await r.hset(LEGACY_KEY, mapping={d.id: d.model_dump_json() for d in batch})
+        await redis_store._save_many(r, batch)
+
+
+async def _clean(r: aioredis.Redis) -> None:
+    await r.delete(LEGACY_KEY)
+    keys = [key async for key in r.scan_iter(match=f"{redis_store.REGISTRY_PREFIX}:{TENANT}:*", count=10_000)]
+    for offset in range(0, len(keys), _BATCH):
+        await r.delete(*keys[offset:offset + _BATCH])
+
+
+async def _legacy_all(r: aioredis.Redis) -> list[DocumentInfo]:
+    """The pre-registry get_all_documents."""
+    raw = await r.hgetall(LEGACY_KEY)
+    return sorted((DocumentInfo.model_validate_json(v) for v in raw.values()), key=lambda d: d.created_at)
+
+
+def _size(docs: list[DocumentInfo]) -> int:
+    return sum(len(d.model_dump_json()) for d in docs)
+
+
+async def _time(repeat: int, fn) -> tuple[float, int]:
+    samples, size = [], 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size = await fn()
+        samples.append(time.perf_counter() - start)
+    return percentile(samples, 50) * 1000, size
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=100_000)
+    parser.add_argument("--processing-pct", type=float, default=1.0)
+    parser.add_argument("--page", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--redis-url")
+    args = parser.parse_args()
+    quiet_logs()
+    if args.redis_url:
+        redis_store._redis = aioredis.from_url(args.redis_url, decode_responses=True)
+    else:
+        install_fake_redis()
+    r = await redis_store.get_redis()
+
+    docs = _documents(args.documents, args.processing_pct)
+    await _clean(r)
+    start = time.perf_counter()
+    await _load(r, docs)
+    print(f"{args.documents} documents registered in both layouts in {time.perf_counter() - start:.1f} s; "
+          f"pages of {args.page}, p50 of {args.repeat} runs")
+
+    middle = (await r.zrange(redis_store._index_key(TENANT), args.documents // 2, args.documents // 2))[0]
+    sample = next(d for d in docs if d.status == DocumentStatus.PROCESSING)
+
+    async def legacy_list():
+        return _size(await _legacy_all(r))
+
+    async def legacy_processing():
+        return _size([d for d in await _legacy_all(r) if d.status == DocumentStatus.PROCESSING][:args.page])
+
+    async def legacy_counts():
+        return _size(await _legacy_all(r))  # per-status counts need every document
+
+    async def legacy_progress():
+        sample.chunks_embedded += 1
+        data = sample.model_dump_json()
+        await r.hset(LEGACY_KEY, sample.id, data)
+        return len(data)
+
+    async def page(cursor=None, status=None):
+        found, _, _ = await redis_store.list_documents(TENANT, args.page, cursor, status)
+        return _size(found)
+
+    async def counts():
+        await redis_store.count_documents_by_status(TENANT)
+        return 0
+
+    async def progress():
+        sample.chunks_embedded += 1
+        await redis_store.update_document_fields(sample, *PROGRESS_FIELDS)
+        return sum(len(k) + len(str(v)) for k, v in sample.model_dump(mode="json", include=set(PROGRESS_FIELDS)).items())
+
+    cases = [
+        ("list", legacy_list, page),
+        ("deep page", legacy_list, lambda: page(middle)),
+        ("processing", legacy_processing, lambda: page(status=DocumentStatus.PROCESSING)),
+        ("counts", legacy_counts, counts),
+        ("progress", legacy_progress, progress),
+    ]
+    print(f"{'operation':<12}{'old ms':>10}{'old bytes':>12}{'registry ms':>13}{'registry bytes':>16}{'speedup':>9}")
+    try:
+        for name, old, new in cases:
+            # The old layout costs a full read per call; fewer runs keep the total time sane.
+            old_ms, old_bytes = await _time(max(1, args.repeat // 5) if name != "progress" else args.repeat, old)
+            new_ms, new_bytes = await _time(args.repeat, new)
+            print(f"{name:<12}{old_ms:>10.2f}{old_bytes:>12}{new_ms:>13.2f}{new_bytes:>16}{old_ms / new_ms:>8.1f}x")
+    finally:
+        await _clean(r)
+        await redis_store.close_redis()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,307 @@
+"""End-to-end hot path — /ingest, /retrieve and the agent's voice turn, against local stand-ins.
+
+The real rag-server app runs in-process. Embeddings are a stub with
+``--embed-latency-ms`` per call, Qdrant is qdrant-client's local mode
+behind ``--search-latency-ms`` of simulated round trip (or, with
+``--vector-backend local``, the in-process store in a temporary
+directory), and Redis is fakeredis, so nothing needs API keys or running
+services. Phases:
+
+  ingest    ``--docs`` synthetic documents of ``--doc-kb`` KB go through
+            POST /ingest; reports wall time, MB/s and peak server heap
+            (tracemalloc) per ingested MB. Parse workers run in their own
+            processes and are not included in the heap figure.
+  retrieve  ``--requests`` distinct scripted utterances through POST
+            /retrieve at each ``--concurrency``; req/s and p50/p95/p99 per
+            request and per pipeline stage (the stages /metrics reports).
+  turn      with ``--turns`` above 0, the app is also served over HTTP and
+            voice-agent's ``benchmarks.turn_latency`` drives
+            ``VoiceAIAgent.on_user_turn_completed`` against it, run with
+            ``--agent-python`` (an interpreter with voice-agent installed).
+
+``--out`` writes every number as JSON, with the commit and the settings
+used. ``--baseline`` compares each p95 with an earlier ``--out`` file and
+exits non-zero when one got more than ``--tolerance`` slower (and by at
+least ``--min-delta-ms``), so a hot-path regression fails CI.
+
+Usage (from rag-server/, needs the ``bench`` extra):
+    python -m benchmarks.e2e --out bench.json
+    python -m benchmarks.e2e --turns 40 --agent-python ../voice-agent/.venv/bin/python
+    python -m benchmarks.e2e --baseline main.json --out bench.json
+    python -m benchmarks.e2e --vector-backend local
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+from qdrant_client import AsyncQdrantClient
+
+from src import metrics
+from src.adapters import embeddings as embedding_backend, qdrant_store, vector_store
+from src.adapters.local_vector_store import LocalVectorStore
+from src.core.ingestion import get_ingestion_queue
+from src.core.parse_pool import shutdown_process_pool
+from src.main import app
+from .stub_embedding_server import StubEmbeddingServer
+from .stubs import StageSamples, StubEmbeddings, install_fake_redis, quiet_logs, summarize
+
+AGENT_DIR = Path(__file__).resolve().parents[2] / "voice-agent"
+
+_WORDS = "refund policy order invoice shipping warranty return account billing support customer delivery".split()
+
+_UTTERANCES = (
+    "what is the refund policy for order {code}",
+    "can you check the shipping status of {code}",
+    "how long is the warranty on item {code}",
+    "why was invoice {code} charged twice",
+    "I want to return order {code}",
+    "who do I contact about billing for account {code}",
+)
+
+
+def utterances(n: int, seed: int = 0) -> list[str]:
+    """Distinct spoken-style questions; each names its own code, so no two share a cache entry."""
+    rng = random.Random(seed)
+    return [rng.choice(_UTTERANCES).format(code=f"AB-{i:04d}") for i in range(n)]
+
+
+def _write_document(path: Path, kb: int, rng: random.Random) -> None:
+    with open(path, "w") as f:
+        while f.tell() < kb * 1024:
+            words = rng.choices(_WORDS, k=rng.randint(60, 150))
+            words.insert(rng.randrange(len(words)), f"AB-{rng.randrange(10_000):04d}")
+            f.write(" ".join(words) + ".\n\n")
+
+
+class _SlowQdrant(qdrant_store.QdrantVectorStore):
+    """Local-mode Qdrant plus a fixed delay per search, standing in for the network hop."""
+
+    latency_s = 0.0
+
+    async def search_batch(self, *args, **kwargs):
+        await asyncio.sleep(self.latency_s)
+        return await super().search_batch(*args, **kwargs)
+
+
+async def _install(args) -> None:
+    install_fake_redis()
+    embedding_backend._embeddings = StubEmbeddings(latency_s=args.embed_latency_ms / 1000, dimensions=args.dims)
+    if args.vector_backend == "local":
+        store = await LocalVectorStore.open(Path(tempfile.mkdtemp(prefix="bench-vectors-")), args.dims)
+    else:
+        store = _SlowQdrant()
+        store.latency_s = args.search_latency_ms / 1000
+        store.client = AsyncQdrantClient(location=":memory:")
+        store.collection_name = "bench_e2e"
+        await store._ensure_collection()
+    vector_store._store = store
+    await store.load_lexical_index()
+
+
+async def _ingest(client: httpx.AsyncClient, paths: list[Path]) -> dict:
+    tracemalloc.start()
+    start = time.perf_counter()
+    pending = set()
+    for path in paths:
+        while True:
+            with open(path, "rb") as f:
+                resp = await client.post("/ingest", files={"file": (path.name, f, "text/plain")})
+            if resp.status_code != 503:
+                break
+            await asyncio.sleep(0.05)  # queue full
+        resp.raise_for_status()
+        pending.add(resp.json()["id"])
+
+    chunks = 0
+    while pending:
+        await asyncio.sleep(0.02)
+        for doc_id in list(pending):
+            doc = (await client.get(f"/documents/{doc_id}")).json()
+            if doc["status"] == "failed":
+                raise RuntimeError(f"Ingestion failed: {doc['error']}")
+            if doc["status"] == "ready":
+                pending.discard(doc_id)
+                chunks += doc["chunks"]
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    mb = sum(p.stat().st_size for p in paths) / 2**20
+    return {
+        "documents": len(paths),
+        "mb": round(mb, 2),
+        "chunks": chunks,
+        "seconds": round(elapsed, 3),
+        "mb_per_s": round(mb / elapsed, 3),
+        "heap_peak_mb_per_mb": round(peak / 2**20 / mb, 3),
+    }
+
+
+async def _retrieve(client: httpx.AsyncClient, queries: list[str], concurrency: int, top_k: int,
+                    samples: StageSamples) -> dict:
+    samples.clear()
+    latencies: list[float] = []
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(query: str) -> None:
+        async with sem:
+            start = time.perf_counter()
+            resp = await client.post("/retrieve", json={"query": query, "top_k": top_k})
+            resp.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(q) for q in queries))
+    elapsed = time.perf_counter() - start
+    return {
+        "req_per_s": round(len(queries) / elapsed, 1),
+        "request": summarize(latencies),
+        "stages": {stage: summarize(values) for stage, values in sorted(samples.samples.items())},
+    }
+
+
+async def _turns(args) -> dict:
+    """Run voice-agent's turn benchmark against this app served on a local port."""
+    async with StubEmbeddingServer(app) as server:
+        proc = await asyncio.create_subprocess_exec(
+            args.agent_python, "-m", "benchmarks.turn_latency", "--json",
+            "--turns", str(args.turns), "--concurrency", str(args.turn_concurrency),
+            cwd=AGENT_DIR,
+            env={**os.environ, "RAG_SERVER_URL": f"http://127.0.0.1:{server.port}"},
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        out, err = await proc.communicate()
+    if proc.returncode != 0:
+        # Most often voice-agent's dependencies aren't installed for --agent-python.
+        lines = err.decode().strip().splitlines()
+        return {"skipped": lines[-1] if lines else f"exit code {proc.returncode}"}
+    return json.loads(out.decode().strip().splitlines()[-1])
+
+
+def _p95s(results: dict, path: tuple = ()):
+    for key, value in results.items():
+        if isinstance(value, dict):
+            yield from _p95s(value, path + (key,))
+        elif key == "p95_ms":
+            yield ".".join(path), value
+
+
+def compare(baseline: dict, current: dict, tolerance: float, min_delta_ms: float) -> list[str]:
+    """p95s that regressed against ``baseline``, as printable lines."""
+    old = dict(_p95s(baseline["results"]))
+    regressions = []
+    for name, new in _p95s(current["results"]):
+        if name in old and new > old[name] * (1 + tolerance) and new - old[name] >= min_delta_ms:
+            regressions.append(f"{name}: {old[name]:.2f} -> {new:.2f} ms p95")
+    return regressions
+
+
+def _commit() -> str | None:
+    result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True)
+    return result.stdout.strip() or None
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=8)
+    parser.add_argument("--doc-kb", type=int, default=256)
+    parser.add_argument("--requests", type=int, default=200, help="per concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--dims", type=int, default=256)
+    parser.add_argument("--embed-latency-ms", type=float, default=30)
+    parser.add_argument("--search-latency-ms", type=float, default=2, help="qdrant backend only")
+    parser.add_argument("--vector-backend", choices=["qdrant", "local"], default="qdrant")
+    parser.add_argument("--turns", type=int, default=0)
+    parser.add_argument("--turn-concurrency", type=int, default=1)
+    parser.add_argument("--agent-python", default=sys.executable)
+    parser.add_argument("--out", type=Path, default=None)
+    parser.add_argument("--baseline", type=Path, default=None)
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed p95 slowdown, as a fraction")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0)
+    args = parser.parse_args()
+    quiet_logs()
+    # Local mode has no server to version-check and ignores payload indexes; both warn.
+    warnings.filterwarnings("ignore", category=UserWarning, module="qdrant_client")
+
+    await _install(args)
+    samples = StageSamples()
+    metrics.STAGE_SECONDS = samples
+    queue = get_ingestion_queue()
+    queue.start()
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60)
+    results: dict = {}
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            rng = random.Random(0)
+            # One tiny document first, so process pool spawn and imports aren't timed.
+            warm = Path(tmp) / "warm.txt"
+            _write_document(warm, 1, rng)
+            await _ingest(client, [warm])
+
+            paths = []
+            for i in range(args.docs):
+                paths.append(Path(tmp) / f"doc-{i}.txt")
+                _write_document(paths[-1], args.doc_kb, rng)
+            results["ingest"] = await _ingest(client, paths)
+        ingest = results["ingest"]
+        print(f"ingest: {ingest['documents']} docs, {ingest['mb']} MB, {ingest['chunks']} chunks in "
+              f"{ingest['seconds']:.2f} s ({ingest['mb_per_s']:.2f} MB/s), "
+              f"server heap peak {ingest['heap_peak_mb_per_mb']:.2f} MB per MB")
+
+        queries = utterances(args.requests * len(args.concurrency))
+        results["retrieve"] = {}
+        print(f"{'conc':>6}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}   stage p95 ms")
+        for n, concurrency in enumerate(args.concurrency):
+            batch = queries[n * args.requests:(n + 1) * args.requests]
+            run = await _retrieve(client, batch, concurrency, args.top_k, samples)
+            results["retrieve"][str(concurrency)] = run
+            stages = "  ".join(f"{s}={v['p95_ms']:.1f}" for s, v in run["stages"].items())
+            request = run["request"]
+            print(f"{concurrency:>6}{run['req_per_s']:>9.1f}{request['p50_ms']:>9.1f}"
+                  f"{request['p95_ms']:>9.1f}{request['p99_ms']:>9.1f}   {stages}")
+
+        if args.turns:
+            results["turn"] = await _turns(args)
+            print("turn:", json.dumps(results["turn"]))
+    finally:
+        await client.aclose()
+        await queue.stop()
+        shutdown_process_pool()
+        store = vector_store._store
+        await vector_store.close_vector_store()
+        if isinstance(store, LocalVectorStore):
+            shutil.rmtree(store.path, ignore_errors=True)
+
+    report = {
+        "benchmark": "e2e",
+        "commit": _commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "config": {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()},
+        "results": results,
+    }
+    if args.out:
+        args.out.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"wrote {args.out}")
+    if args.baseline:
+        regressions = compare(json.loads(args.baseline.read_text()), report, args.tolerance, args.min_delta_ms)
+        if regressions:
+            sys.exit("p95 regressions against {}:\n  {}".format(args.baseline, "\n  ".join(regressions)))
+        print(f"no p95 regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
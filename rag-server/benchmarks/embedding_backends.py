@@ -0,0 +1,88 @@
+"""Query latency and batch throughput: local ONNX backend vs OpenAI-style remote.
+
+The remote backend is the real ``OpenAIEmbeddings`` adapter pointed at
+``stub_embedding_server`` with an injected round-trip (``--rtt``), so the
+numbers show what the network costs per utterance. The local backend runs
+the configured fastembed model on CPU and needs the ``local`` extra; it is
+skipped if fastembed or the model is unavailable. The embedding cache is
+disabled so every call does real work.
+
+Usage (from rag-server/):
+    python -m benchmarks.embedding_backends --queries 200 --chunks 2000
+    python -m benchmarks.embedding_backends --rtt 0.15 --threads 4
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+
+from .stub_embedding_server import StubEmbeddingServer, create_app
+from .stubs import percentile, quiet_logs
+
+
+async def _measure(backend: str, queries: list[str], chunks: list[str]) -> None:
+    from src.adapters import embeddings as embedding_backend
+    from src.config import get_settings
+
+    os.environ["EMBEDDING_BACKEND"] = backend
+    get_settings.cache_clear()
+    await embedding_backend.close_embeddings()
+    try:
+        embeddings = embedding_backend.get_embeddings()
+    except Exception as e:
+        print(f"{backend:>8}  skipped: {e}")
+        return
+
+    # First call pays model load / connection setup; keep it out of the numbers.
+    await embeddings.embed_query("warmup")
+
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        await embeddings.embed_query(query)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await embeddings.embed_texts(chunks)
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{backend:>8}{embeddings.dimensions:>6}{percentile(latencies, 50) * 1000:>9.1f}"
+        f"{percentile(latencies, 95) * 1000:>9.1f}{len(chunks) / elapsed:>11.0f}"
+    )
+    await embedding_backend.close_embeddings()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--chunk-chars", type=int, default=800)
+    parser.add_argument("--rtt", type=float, default=0.1, help="simulated API round-trip in seconds")
+    parser.add_argument("--threads", type=int, default=0, help="ONNX Runtime threads (0 = default)")
+    parser.add_argument("--backends", nargs="+", default=["openai", "local"])
+    args = parser.parse_args()
+    quiet_logs()
+
+    rng = random.Random(0)
+    words = "the of and voice agent latency retrieval document query model embedding vector".split()
+    queries = [" ".join(rng.choices(words, k=rng.randint(5, 15))) for _ in range(args.queries)]
+    chunks = [" ".join(rng.choices(words, k=args.chunk_chars // 7)) for _ in range(args.chunks)]
+
+    app = create_app(request_latency_s=args.rtt, token_latency_s=2e-6)
+    async with StubEmbeddingServer(app) as server:
+        os.environ.update({
+            "OPENAI_API_KEY": "bench",
+            "OPENAI_BASE_URL": server.base_url,
+            "EMBEDDING_CACHE_SIZE": "0",
+            "EMBEDDING_CACHE_REDIS": "false",
+            "LOCAL_EMBEDDING_THREADS": str(args.threads),
+        })
+        print(f"{'backend':>8}{'dims':>6}{'p50 ms':>9}{'p95 ms':>9}{'chunks/s':>11}")
+        for backend in args.backends:
+            await _measure(backend, queries, chunks)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,78 @@
+"""Embedding throughput across batch sizes and concurrency, against a stub server.
+
+Drives the real ``OpenAIEmbeddings`` adapter (scheduler, retries, pooling)
+against ``stub_embedding_server``. The embedding cache is disabled so every
+text hits the server.
+
+Usage (from rag-server/):
+    python -m benchmarks.embedding_throughput --chunks 5000
+    python -m benchmarks.embedding_throughput --server-tpm 300000                       # 429 + Retry-After
+    python -m benchmarks.embedding_throughput --server-tpm 300000 --client-tpm 250000   # paced, no 429s
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+
+from .stub_embedding_server import StubEmbeddingServer, create_app
+from .stubs import fake_vector, quiet_logs
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=5000)
+    parser.add_argument("--chunk-chars", type=int, default=800)
+    parser.add_argument("--batch-tokens", type=int, nargs="+", default=[2000, 16000, 64000])
+    parser.add_argument("--in-flight", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--request-latency", type=float, default=0.05)
+    parser.add_argument("--token-latency", type=float, default=2e-6)
+    parser.add_argument("--server-tpm", type=int, default=None)
+    parser.add_argument("--client-tpm", type=int, default=None)
+    args = parser.parse_args()
+    quiet_logs()
+
+    rng = random.Random(0)
+    texts = ["".join(rng.choice("abcdefgh ") for _ in range(args.chunk_chars)) for _ in range(args.chunks)]
+
+    app = create_app(args.request_latency, args.token_latency, args.server_tpm)
+    async with StubEmbeddingServer(app) as server:
+        os.environ.update({
+            "OPENAI_API_KEY": "bench",
+            "OPENAI_BASE_URL": server.base_url,
+            "EMBEDDING_CACHE_SIZE": "0",
+            "EMBEDDING_CACHE_REDIS": "false",
+            # Small vectors keep the stub's own CPU cost out of the numbers.
+            "EMBEDDING_DIMENSIONS": "64",
+        })
+        if args.client_tpm:
+            os.environ["EMBEDDING_TPM"] = str(args.client_tpm)
+        from src.adapters import embeddings as embedding_backend
+        from src.config import get_settings
+
+        print(f"{'batch tok':>10}{'in-flight':>10}{'requests':>10}{'retries':>9}{'chunks/s':>11}{'seconds':>9}")
+        for batch_tokens in args.batch_tokens:
+            for in_flight in args.in_flight:
+                os.environ["EMBEDDING_BATCH_TOKENS"] = str(batch_tokens)
+                os.environ["EMBEDDING_MAX_IN_FLIGHT"] = str(in_flight)
+                get_settings.cache_clear()
+                await embedding_backend.close_embeddings()
+                embeddings = embedding_backend.get_embeddings()
+
+                start = time.perf_counter()
+                vectors = await embeddings.embed_texts(texts)
+                elapsed = time.perf_counter() - start
+                # Order must survive concurrent batches and retries.
+                for i in (0, len(texts) // 2, len(texts) - 1):
+                    assert abs(vectors[i][0] - fake_vector(texts[i], 64)[0]) < 1e-6
+
+                sched = embeddings.scheduler
+                print(
+                    f"{batch_tokens:>10}{in_flight:>10}{sched.requests:>10}{sched.retries:>9}"
+                    f"{len(texts) / elapsed:>11.0f}{elapsed:>9.2f}"
+                )
+        await embedding_backend.close_embeddings()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,154 @@
+"""Filtered search and delete latency as a Qdrant collection grows.
+
+Grows one throwaway collection on ``--qdrant-url`` through ``--sizes``
+points of synthetic ``--dims`` vectors, with payloads shaped like ingested
+chunks (``--chunks-per-doc`` chunks per document, documents spread over
+``--tenants`` tenants). At each size it times unfiltered, document-scoped
+and tenant-scoped searches, built with the store's own filter conversion,
+then ``delete_by_document``-style deletes. ``--without-indexes`` skips the
+payload indexes so the two runs can be compared. ``:memory:`` runs
+qdrant-client's local mode, which ignores indexes — use it only to check
+the harness.
+
+Usage (from rag-server/, Qdrant running):
+    python -m benchmarks.filtered_search --sizes 100000 1000000 3000000
+    python -m benchmarks.filtered_search --sizes 100000 1000000 --without-indexes
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import numpy as np
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.models import (
+    Batch,
+    CollectionStatus,
+    Distance,
+    FieldCondition,
+    Filter,
+    FilterSelector,
+    MatchValue,
+    VectorParams,
+)
+
+from src.adapters.qdrant_store import PAYLOAD_INDEXES, _to_qdrant_filter
+from src.config import get_settings
+from src.models.document import RetrieveFilter
+from .stubs import percentile, quiet_logs
+
+COLLECTION = "bench_filtered_search"
+
+
+async def _grow(client: AsyncQdrantClient, start: int, stop: int, args, rng: np.random.Generator) -> None:
+    for offset in range(start, stop, args.batch):
+        ids = list(range(offset, min(offset + args.batch, stop)))
+        vectors = rng.standard_normal((len(ids), args.dims), dtype=np.float32)
+        payloads = []
+        for i in ids:
+            doc = i // args.chunks_per_doc
+            payloads.append({
+                "text": "",
+                "document_id": f"doc-{doc}",
+                "filename": f"file-{doc}.pdf",
+                "chunk_index": i % args.chunks_per_doc,
+                "tenant_id": f"tenant-{doc % args.tenants}",
+            })
+        await client.upsert(
+            collection_name=COLLECTION,
+            points=Batch(ids=ids, vectors=vectors.tolist(), payloads=payloads),
+            wait=False,
+        )
+    # Don't time searches against a half-built index.
+    while (await client.get_collection(COLLECTION)).status != CollectionStatus.GREEN:
+        await asyncio.sleep(0.5)
+
+
+async def _time_searches(client, queries: np.ndarray, filters: list, k: int) -> list[float]:
+    latencies = []
+    for qv, query_filter in zip(queries, filters):
+        start = time.perf_counter()
+        await client.query_points(
+            collection_name=COLLECTION, query=qv.tolist(), query_filter=query_filter, limit=k
+        )
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--dims", type=int, default=256)
+    parser.add_argument("--chunks-per-doc", type=int, default=50)
+    parser.add_argument("--tenants", type=int, default=100)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--deletes", type=int, default=20)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--batch", type=int, default=2048)
+    parser.add_argument("--without-indexes", action="store_true")
+    parser.add_argument("--qdrant-url", default=None, help="defaults to QDRANT_URL")
+    args = parser.parse_args()
+    quiet_logs()
+
+    url = args.qdrant_url or get_settings().QDRANT_URL
+    client = AsyncQdrantClient(location=url) if url == ":memory:" else AsyncQdrantClient(url=url)
+    if await client.collection_exists(COLLECTION):
+        await client.delete_collection(COLLECTION)
+    await client.create_collection(
+        collection_name=COLLECTION,
+        vectors_config=VectorParams(size=args.dims, distance=Distance.COSINE),
+    )
+    if not args.without_indexes:
+        for field, schema in PAYLOAD_INDEXES.items():
+            await client.create_payload_index(COLLECTION, field_name=field, field_schema=schema)
+
+    rng = np.random.default_rng(0)
+    picker = random.Random(0)
+    deleted: set[int] = set()
+    print(f"{args.dims}-d vectors, {args.chunks_per_doc} chunks/doc, {args.tenants} tenants, "
+          f"payload indexes {'off' if args.without_indexes else 'on'}")
+    print(f"{'points':>10}{'search':>10}{'':>8}{'doc':>10}{'':>8}{'tenant':>10}{'':>8}{'delete':>10}{'':>8}")
+    print(f"{'':>10}" + f"{'p50 ms':>10}{'p95 ms':>8}" * 4)
+    size = 0
+    try:
+        for target in sorted(args.sizes):
+            await _grow(client, size, target, args, rng)
+            size = target
+            docs = [d for d in range(size // args.chunks_per_doc) if d not in deleted]
+            queries = rng.standard_normal((args.queries, args.dims), dtype=np.float32)
+
+            rows = [
+                await _time_searches(client, queries, [None] * args.queries, args.k),
+                await _time_searches(client, queries, [
+                    _to_qdrant_filter(RetrieveFilter(document_ids=[f"doc-{picker.choice(docs)}"]))
+                    for _ in range(args.queries)
+                ], args.k),
+                await _time_searches(client, queries, [
+                    _to_qdrant_filter(None, f"tenant-{picker.randrange(args.tenants)}")
+                    for _ in range(args.queries)
+                ], args.k),
+            ]
+
+            deletes = []
+            for doc in picker.sample(docs, min(args.deletes, len(docs))):
+                start = time.perf_counter()
+                await client.delete(
+                    collection_name=COLLECTION,
+                    points_selector=FilterSelector(filter=Filter(
+                        must=[FieldCondition(key="document_id", match=MatchValue(value=f"doc-{doc}"))]
+                    )),
+                )
+                deletes.append(time.perf_counter() - start)
+                deleted.add(doc)
+            rows.append(deletes)
+
+            print(f"{size:>10}" + "".join(
+                f"{percentile(r, 50) * 1000:>10.2f}{percentile(r, 95) * 1000:>8.2f}" for r in rows
+            ))
+    finally:
+        await client.delete_collection(COLLECTION)
+        await client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,92 @@
+"""Server import time — how long ``import src.main`` takes in a fresh interpreter.
+
+Runs ``python -X importtime -c "import <module>"`` ``--runs`` times and
+reports the median total plus the slowest third-party and stdlib packages
+(cumulative time of each package's first import, from the last run). Also
+lists which ingestion-only dependencies got imported; they belong in the
+parse process pool, not the server process. ``--budget-ms`` exits non-zero when the median is over
+budget, and ``--json`` prints one machine-readable line, so the number can
+be tracked in CI.
+
+Usage (from rag-server/):
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --runs 10 --budget-ms 2500 --json
+"""
+import argparse
+import json
+import re
+import statistics
+import subprocess
+import sys
+
+# Needed only to parse and chunk uploads, inside the process pool.
+INGESTION_ONLY = ("pypdf", "docx", "langchain_text_splitters", "langchain_core")
+
+_LINE = re.compile(r"import time:\s+\d+ \|\s+(\d+) \| *(\S+)")
+
+
+def _run(module: str) -> tuple[float, dict[str, int], set[str]]:
+    """Return (total ms, cumulative us per outside package, all imported modules)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    packages: dict[str, int] = {}
+    modules: set[str] = set()
+    total_us = 0
+    for match in _LINE.finditer(result.stderr):
+        cumulative, name = match.groups()
+        modules.add(name)
+        top = name.split(".")[0]
+        if name == module:
+            total_us = int(cumulative)
+        elif top != module.split(".")[0]:
+            # A package's own line includes everything it imported.
+            packages[top] = max(packages.get(top, 0), int(cumulative))
+    return total_us / 1000, packages, modules
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="src.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=None)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    totals = []
+    for _ in range(args.runs):
+        total_ms, packages, modules = _run(args.module)
+        totals.append(total_ms)
+    median = statistics.median(totals)
+    leaked = sorted(m for m in modules if m.split(".")[0] in INGESTION_ONLY and "." not in m)
+    slowest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[: args.top]
+
+    if args.json:
+        print(json.dumps({
+            "benchmark": "import_time",
+            "module": args.module,
+            "runs": args.runs,
+            "median_ms": round(median, 1),
+            "min_ms": round(min(totals), 1),
+            "max_ms": round(max(totals), 1),
+            "ingestion_only_imported": leaked,
+            "slowest": {name: round(us / 1000, 1) for name, us in slowest},
+        }))
+    else:
+        print(f"import {args.module}: median {median:.0f} ms (min {min(totals):.0f}, max {max(totals):.0f}, "
+              f"{args.runs} runs)")
+        print(f"ingestion-only dependencies imported: {', '.join(leaked) or 'none'}")
+        print(f"{'package':<32}{'cumulative ms':>14}")
+        for name, us in slowest:
+            print(f"{name:<32}{us / 1000:>14.1f}")
+
+    if args.budget_ms is not None and median > args.budget_ms:
+        sys.exit(f"import {args.module} took {median:.0f} ms, over the {args.budget_ms:.0f} ms budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""Peak memory and latency of buffered vs streaming ingestion.
+
+"buffered" reproduces the old pipeline: read the whole upload, parse it to
+one string, chunk it, then embed and upsert. "streaming" runs the real
+``run_ingestion`` pipeline over the spooled file. Each size is run as a
+plain-text corpus of ``--mb`` MB and a PDF of ``--pdf-pages`` pages of
+text.
+
+Parsing happens in the process pool, so both modes parse there (buffered
+as one whole-file task) and each run gets a fresh pool. "parser MiB" is
+the largest growth of a pool worker's peak RSS (VmHWM) over its RSS when
+idle with the parsers imported; "server MiB" is the Python heap of the
+server process (tracemalloc), which holds chunks between parse and upsert.
+Reads /proc, so Linux only.
+
+Usage (from rag-server/, needs the ``bench`` extra):
+    python -m benchmarks.ingest_memory --mb 5 20 --pdf-pages 500 2000
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from pypdf import PdfWriter
+from pypdf.generic import ContentStream, DictionaryObject, NameObject
+
+from src.adapters.document_parser import parse_document
+from src.core.chunker import chunk_text
+from src.core.ingestion import run_ingestion
+from src.core.parse_pool import get_process_pool, pool_size, shutdown_process_pool
+from src.models.document import DocumentInfo, IngestJob
+from .stubs import StubEmbeddings, StubVectorStore, install_fake_redis, install_stubs, quiet_logs
+
+_WORDS = "policy refund order account invoice shipping warranty return customer support".split()
+
+
+def _write_corpus(path: Path, megabytes: int) -> None:
+    rng = random.Random(0)
+    target = megabytes * 1024 * 1024
+    with open(path, "w") as f:
+        while True:
+            words = rng.randint(40, 200)
+            f.write(" ".join(rng.choice(_WORDS) for _ in range(words)) + ".\n\n")
+            if f.tell() >= target:
+                break
+
+
+def _write_pdf(path: Path, pages: int) -> None:
+    """A PDF of ``pages`` pages, each 60 lines of text in compressed content streams."""
+    rng = random.Random(0)
+    font = DictionaryObject({
+        NameObject("/Type"): NameObject("/Font"),
+        NameObject("/Subtype"): NameObject("/Type1"),
+        NameObject("/BaseFont"): NameObject("/Helvetica"),
+    })
+    writer = PdfWriter()
+    for _ in range(pages):
+        page = writer.add_blank_page(612, 792)
+        page[NameObject("/Resources")] = DictionaryObject({
+            NameObject("/Font"): DictionaryObject({NameObject("/F1"): font}),
+        })
+        lines = (" ".join(rng.choice(_WORDS) for _ in range(12)) for _ in range(60))
+        content = ContentStream(None, None)
+        content.set_data(("BT /F1 9 Tf 11 TL 40 760 Td " + " ".join(f"({line}) '" for line in lines) + " ET").encode())
+        page.replace_contents(content)
+        page.compress_content_streams()
+    with open(path, "wb") as f:
+        writer.write(f)
+
+
+def _warm(delay_s: float) -> int:
+    """Runs in a pool worker: import the parsers, then hold the worker so each gets one."""
+    import docx  # noqa: F401
+    import pypdf  # noqa: F401
+
+    quiet_logs()
+    time.sleep(delay_s)
+    return os.getpid()
+
+
+def _parse_whole(path: str) -> list[str]:
+    """The old parse step, run in a pool worker: whole file in, every chunk out."""
+    return chunk_text(parse_document(Path(path).read_bytes(), Path(path).name))
+
+
+def _status_kib(pid: int, field: str) -> int:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith(f"{field}:"):
+                return int(line.split()[1])
+    return 0
+
+
+async def _buffered(path: Path, embeddings: StubEmbeddings, store: StubVectorStore) -> float:
+    loop = asyncio.get_running_loop()
+    chunks = await loop.run_in_executor(get_process_pool(), _parse_whole, str(path))
+    first = None
+    for start in range(0, len(chunks), 100):
+        batch = chunks[start : start + 100]
+        vectors = await embeddings.embed_texts(batch)
+        await store.upsert_chunks(batch, vectors, "bench", path.name, start_index=start)
+        first = first or time.perf_counter()
+    return first
+
+
+async def _streaming(path: Path, store: StubVectorStore) -> float:
+    first = None
+    upsert = store.upsert_chunks
+
+    async def timed_upsert(*args, **kwargs):
+        nonlocal first
+        result = await upsert(*args, **kwargs)
+        first = first or time.perf_counter()
+        return result
+
+    store.upsert_chunks = timed_upsert
+    doc = DocumentInfo(id="bench", filename=path.name)
+    await run_ingestion(IngestJob(doc_id="bench", filename=path.name, path=str(path), attempts=1), doc)
+    return first
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mb", type=int, nargs="+", default=[5, 20])
+    parser.add_argument("--pdf-pages", type=int, nargs="+", default=[500, 2000])
+    parser.add_argument("--embed-latency", type=float, default=0.02)
+    args = parser.parse_args()
+    quiet_logs()
+    install_fake_redis()
+
+    loop = asyncio.get_running_loop()
+    print(f"{pool_size()} parse workers")
+    print(f"{'mode':<11}{'corpus':>16}{'MB':>7}{'parser MiB':>12}{'server MiB':>12}{'first batch s':>15}{'total s':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        corpora = []
+        for mb in args.mb:
+            corpora.append((Path(tmp) / f"corpus-{mb}.txt", f"text {mb} MB"))
+            _write_corpus(corpora[-1][0], mb)
+        for pages in args.pdf_pages:
+            corpora.append((Path(tmp) / f"corpus-{pages}.pdf", f"pdf {pages} pages"))
+            _write_pdf(corpora[-1][0], pages)
+
+        for path, corpus in corpora:
+            size = path.stat().st_size / 2**20
+            for mode in ("buffered", "streaming"):
+                embeddings = StubEmbeddings(latency_s=args.embed_latency, dimensions=8)
+                store = StubVectorStore(latency_s=0.0, keep_points=False)
+                install_stubs(embeddings, store)
+
+                shutdown_process_pool()
+                pool = get_process_pool()
+                pids = await asyncio.gather(*(loop.run_in_executor(pool, _warm, 0.5) for _ in range(pool_size())))
+                idle = {pid: _status_kib(pid, "VmRSS") for pid in pids}
+
+                tracemalloc.start()
+                start = time.perf_counter()
+                if mode == "buffered":
+                    first = await _buffered(path, embeddings, store)
+                else:
+                    first = await _streaming(path, store)
+                total = time.perf_counter() - start
+                _, server_peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                parser_peak = max(_status_kib(pid, "VmHWM") - rss for pid, rss in idle.items())
+                print(f"{mode:<11}{corpus:>16}{size:>7.1f}{parser_peak / 1024:>12.1f}{server_peak / 2**20:>12.1f}"
+                      f"{first - start:>15.2f}{total:>10.2f}")
+    shutdown_process_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,80 @@
+"""BM25 index build rate, query latency and memory at increasing corpus sizes.
+
+Chunks are synthetic ~120-word passages over a Zipf-like vocabulary with a
+product code planted in one of them; every query asks for that code among
+common words, the shape of a spoken "what's the status of order AB-1234".
+Memory is Python heap growth measured by tracemalloc.
+
+Usage (from rag-server/):
+    python -m benchmarks.lexical_index --chunks 10000 50000 200000
+"""
+import argparse
+import itertools
+import random
+import time
+import tracemalloc
+
+from src.adapters.lexical_index import LexicalIndex
+from .stubs import percentile
+
+
+def _corpus(n: int, rng: random.Random) -> list[dict]:
+    vocab = [f"term{i}" for i in range(50_000)]
+    cum_weights = list(itertools.accumulate(1 / (i + 1) for i in range(len(vocab))))
+    target = rng.randrange(n)
+    chunks = []
+    for i in range(n):
+        words = rng.choices(vocab, cum_weights=cum_weights, k=120)
+        if i == target:
+            words.append("AB-1234")
+        chunks.append({
+            "chunk_id": str(i),
+            "text": " ".join(words),
+            "document_id": f"doc-{i // 500}",
+            "filename": "bench.txt",
+            "chunk_index": i % 500,
+        })
+    return chunks
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, nargs="+", default=[10_000, 50_000, 200_000])
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f"{'chunks':>8}{'build/s':>10}{'p50 ms':>9}{'p99 ms':>9}{'heap MB':>9}")
+    for n in args.chunks:
+        chunks = _corpus(n, rng)
+        index = LexicalIndex()
+        start = time.perf_counter()
+        index.add(chunks)
+        build = time.perf_counter() - start
+        index.finish_loading()
+
+        # Separate build for memory: tracing would distort the build timing.
+        tracemalloc.start()
+        base = tracemalloc.get_traced_memory()[0]
+        traced = LexicalIndex()
+        traced.add(chunks)
+        heap = tracemalloc.get_traced_memory()[0] - base
+        tracemalloc.stop()
+        del traced
+
+        latencies = []
+        for i in range(args.queries):
+            query = f"what is the status of order AB-1234 term{rng.randrange(50)}"
+            start = time.perf_counter()
+            hits = index.search(query, 3)
+            latencies.append(time.perf_counter() - start)
+            assert "AB-1234" in hits[0]["text"]
+
+        print(
+            f"{n:>8}{n / build:>10.0f}{percentile(latencies, 50) * 1000:>9.3f}"
+            f"{percentile(latencies, 99) * 1000:>9.3f}{heap / 2**20:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
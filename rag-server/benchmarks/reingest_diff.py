@@ -0,0 +1,91 @@
+"""Re-ingesting an edited document: content-hash diff vs ingesting it as a new document.
+
+Writes a text document of ``--paragraphs`` paragraphs, ingests it, then
+rewrites ``--edit`` percent of its paragraphs and ingests the new version
+twice — once as an update of the same document (only changed chunks are
+embedded and upserted) and once under a new document id (everything is).
+Embedding is a stub with ``--embed-latency-ms`` per request; Qdrant is
+``--qdrant-url`` (``:memory:`` runs qdrant-client's local mode).
+
+Usage (from rag-server/, needs the ``bench`` extra):
+    python -m benchmarks.reingest_diff --paragraphs 2000 --edit 1 5 20
+"""
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from qdrant_client import AsyncQdrantClient
+
+from src.adapters import embeddings as embedding_backend, qdrant_store, vector_store
+from src.config import get_settings
+from src.core.ingestion import get_ingest_savings, run_ingestion
+from src.core.parse_pool import shutdown_process_pool
+from src.models.document import DocumentInfo, IngestJob
+from .stubs import StubEmbeddings, install_fake_redis, quiet_logs
+
+_WORDS = "alpha beta gamma delta order invoice refund shipping warranty account billing support".split()
+
+
+def _paragraph(rng: random.Random) -> str:
+    return " ".join(rng.choices(_WORDS, k=120)) + "."
+
+
+async def _ingest(doc: DocumentInfo, path: Path) -> tuple[float, DocumentInfo]:
+    start = time.perf_counter()
+    await run_ingestion(IngestJob(doc_id=doc.id, filename=path.name, path=str(path)), doc)
+    return time.perf_counter() - start, doc
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--paragraphs", type=int, default=2000)
+    parser.add_argument("--edit", type=float, nargs="+", default=[1, 5, 20], help="percent of paragraphs rewritten")
+    parser.add_argument("--embed-latency-ms", type=float, default=50)
+    parser.add_argument("--qdrant-url", default=":memory:")
+    args = parser.parse_args()
+    quiet_logs()
+    install_fake_redis()
+
+    embedding_backend._embeddings = StubEmbeddings(latency_s=args.embed_latency_ms / 1000, dimensions=256)
+    store = qdrant_store.QdrantVectorStore()
+    url = args.qdrant_url or get_settings().QDRANT_URL
+    store.client = AsyncQdrantClient(location=url) if url == ":memory:" else AsyncQdrantClient(url=url)
+    store.collection_name = "bench_reingest_diff"
+    await store._ensure_collection()
+    vector_store._store = store
+
+    rng = random.Random(0)
+    paragraphs = [_paragraph(rng) for _ in range(args.paragraphs)]
+    print(f"{args.paragraphs} paragraphs, stub embedding {args.embed_latency_ms:.0f} ms/request")
+    print(f"{'edit %':>7}{'mode':>8}{'seconds':>9}{'embedded':>10}{'upserted':>10}{'kept':>7}{'removed':>9}")
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for n, percent in enumerate(args.edit):
+                original = Path(tmp) / f"doc-{n}.txt"
+                original.write_text("\n\n".join(paragraphs))
+                await _ingest(DocumentInfo(id=f"doc-{n}", filename=original.name), original)
+
+                edited = list(paragraphs)
+                for i in rng.sample(range(len(edited)), int(len(edited) * percent / 100)):
+                    edited[i] = _paragraph(rng)
+                revised = Path(tmp) / f"doc-{n}-v2.txt"
+                revised.write_text("\n\n".join(edited))
+
+                for mode, doc_id in (("update", f"doc-{n}"), ("new", f"doc-{n}-copy")):
+                    seconds, doc = await _ingest(DocumentInfo(id=doc_id, filename=revised.name), revised)
+                    print(
+                        f"{percent:>7.1f}{mode:>8}{seconds:>9.2f}{doc.chunks_embedded:>10}"
+                        f"{doc.points_upserted:>10}{doc.chunks_unchanged:>7}{doc.chunks_removed:>9}"
+                    )
+        print("savings:", get_ingest_savings().stats())
+    finally:
+        await store.client.delete_collection(store.collection_name)
+        await store.close()
+        shutdown_process_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
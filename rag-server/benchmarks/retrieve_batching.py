@@ -0,0 +1,99 @@
+"""Micro-batched /retrieve and the /retrieve/batch endpoint, against capacity-limited stubs.
+
+The stubs allow only ``--backend-slots`` calls in flight each, the way a
+pooled embedding API budget or a CPU-bound Qdrant does, so N separate
+calls queue while one batched call doesn't. Part 1 drives concurrent
+single-query /retrieve with micro-batching off and on; part 2 sends N
+queries as N calls vs one /retrieve/batch request.
+
+Usage (from rag-server/):
+    python -m benchmarks.retrieve_batching --requests 400 --concurrency 1 16 64
+"""
+import argparse
+import asyncio
+import os
+import time
+
+import httpx
+
+from src.config import get_settings
+from src.core import retriever
+from src.main import app
+from .stubs import StubEmbeddings, StubVectorStore, install_stubs, percentile, quiet_logs
+
+
+def _install(args) -> tuple[StubEmbeddings, StubVectorStore]:
+    embeddings = StubEmbeddings(latency_s=args.embed_latency, max_concurrency=args.backend_slots)
+    store = StubVectorStore(latency_s=args.search_latency, max_concurrency=args.backend_slots)
+    install_stubs(embeddings, store)
+    return embeddings, store
+
+
+async def _concurrent(client: httpx.AsyncClient, concurrency: int, total: int) -> tuple[float, list[float]]:
+    latencies: list[float] = []
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        async with sem:
+            start = time.perf_counter()
+            resp = await client.post("/retrieve", json={"query": f"question {i}", "top_k": 3, "mode": "dense"})
+            resp.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    return total / (time.perf_counter() - start), latencies
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--window-ms", type=float, default=2.0)
+    parser.add_argument("--batch-queries", type=int, nargs="+", default=[4, 16, 64])
+    parser.add_argument("--embed-latency", type=float, default=0.03)
+    parser.add_argument("--search-latency", type=float, default=0.01)
+    parser.add_argument("--backend-slots", type=int, default=8)
+    args = parser.parse_args()
+    quiet_logs()
+    os.environ["RESULT_CACHE_ENABLED"] = "false"
+    get_settings.cache_clear()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"{'window ms':>10}{'conc':>6}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'embed calls':>13}{'avg batch':>11}")
+        for window_ms in (0.0, args.window_ms):
+            for conc in args.concurrency:
+                embeddings, _ = _install(args)
+                retriever._batcher = retriever.RetrievalBatcher(window_s=window_ms / 1000, max_batch=64)
+                rps, lat = await _concurrent(client, conc, args.requests)
+                print(
+                    f"{window_ms:>10.1f}{conc:>6}{rps:>9.0f}{percentile(lat, 50) * 1000:>9.1f}"
+                    f"{percentile(lat, 95) * 1000:>9.1f}{embeddings.calls:>13}"
+                    f"{retriever._batcher.stats()['avg_batch'] or 1:>11}"
+                )
+
+        print(f"\n{'queries':>8}{'N calls ms':>12}{'1 batch ms':>12}")
+        retriever._batcher = retriever.RetrievalBatcher(window_s=0, max_batch=64)
+        for n in args.batch_queries:
+            queries = [f"expansion {i}" for i in range(n)]
+            _install(args)
+            start = time.perf_counter()
+            await asyncio.gather(*(
+                client.post("/retrieve", json={"query": q, "top_k": 3, "mode": "dense"}) for q in queries
+            ))
+            separate = time.perf_counter() - start
+
+            _install(args)
+            start = time.perf_counter()
+            resp = await client.post(
+                "/retrieve/batch",
+                json={"queries": [{"query": q} for q in queries], "top_k": 3, "mode": "dense", "merge": True},
+            )
+            resp.raise_for_status()
+            batched = time.perf_counter() - start
+            print(f"{n:>8}{separate * 1000:>12.1f}{batched * 1000:>12.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,68 @@
+"""Concurrent /retrieve load benchmark against local stubs.
+
+Compares the async adapters with stand-ins that block the event loop the
+way the old sync OpenAI/Qdrant clients did. With async adapters throughput
+should grow with concurrency; with blocking ones it stays flat.
+
+Usage (from rag-server/):
+    python -m benchmarks.retrieve_load --requests 200 --concurrency 1 8 32 64
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from src.main import app
+from .stubs import StubEmbeddings, StubVectorStore, install_stubs, percentile, quiet_logs
+
+
+async def _run(concurrency: int, total: int) -> tuple[float, list[float]]:
+    latencies: list[float] = []
+    sem = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def one(i: int) -> None:
+            async with sem:
+                start = time.perf_counter()
+                resp = await client.post("/retrieve", json={"query": f"question {i}", "top_k": 3})
+                resp.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        elapsed = time.perf_counter() - start
+
+    return total / elapsed, latencies
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--embed-latency", type=float, default=0.05)
+    parser.add_argument("--search-latency", type=float, default=0.01)
+    args = parser.parse_args()
+    quiet_logs()
+
+    print(f"{'mode':<10}{'conc':>6}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for blocking in (False, True):
+        mode = "blocking" if blocking else "async"
+        for conc in args.concurrency:
+            install_stubs(
+                StubEmbeddings(latency_s=args.embed_latency, blocking=blocking),
+                StubVectorStore(latency_s=args.search_latency, blocking=blocking),
+            )
+            # Blocking runs serialize completely; keep them short.
+            total = min(args.requests, 40) if blocking else args.requests
+            rps, lat = await _run(conc, total)
+            print(
+                f"{mode:<10}{conc:>6}{rps:>10.1f}"
+                f"{percentile(lat, 50) * 1000:>10.1f}{percentile(lat, 99) * 1000:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
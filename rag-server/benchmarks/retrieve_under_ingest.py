@@ -0,0 +1,116 @@
+"""/retrieve latency while bulk ingestion is running.
+
+Three scenarios, each with the same steady /retrieve load:
+  idle    — no ingestion
+  inline  — documents parsed and chunked on the event loop (old behaviour)
+  pool    — the real ``run_ingestion`` pipeline using the parse process pool
+
+Usage (from rag-server/, needs the ``bench`` extra):
+    python -m benchmarks.retrieve_under_ingest --docs 4 --mb 4
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from src.adapters.document_parser import parse_document
+from src.core.chunker import chunk_text
+from src.core.ingestion import run_ingestion
+from src.config import get_settings
+from src.core.parse_pool import shutdown_process_pool
+from src.main import app
+from src.models.document import DocumentInfo, IngestJob
+from .ingest_memory import _write_corpus
+from .stubs import StubEmbeddings, StubVectorStore, install_fake_redis, install_stubs, percentile, quiet_logs
+
+
+async def _ingest_inline(paths: list[Path]) -> None:
+    embeddings = StubEmbeddings(latency_s=0.02, dimensions=8)
+    for path in paths:
+        chunks = chunk_text(parse_document(path.read_bytes(), path.name))
+        for start in range(0, len(chunks), 100):
+            await embeddings.embed_texts(chunks[start : start + 100])
+
+
+async def _ingest_pool(paths: list[Path]) -> None:
+    await asyncio.gather(*(
+        run_ingestion(
+            IngestJob(doc_id=f"bench-{i}", filename=p.name, path=str(p), attempts=1),
+            DocumentInfo(id=f"bench-{i}", filename=p.name),
+        )
+        for i, p in enumerate(paths)
+    ))
+
+
+async def _retrieve_load(client: httpx.AsyncClient, stop: asyncio.Event, concurrency: int) -> list[float]:
+    latencies: list[float] = []
+
+    async def loop(worker: int) -> None:
+        i = 0
+        while not stop.is_set():
+            start = time.perf_counter()
+            resp = await client.post("/retrieve", json={"query": f"q{worker}-{i}", "top_k": 3})
+            resp.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+            i += 1
+
+    await asyncio.gather(*(loop(w) for w in range(concurrency)))
+    return latencies
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=4)
+    parser.add_argument("--mb", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--idle-seconds", type=float, default=3.0)
+    args = parser.parse_args()
+    quiet_logs()
+    install_fake_redis()
+
+    transport = httpx.ASGITransport(app=app)
+    client = httpx.AsyncClient(transport=transport, base_url="http://bench")
+
+    print(f"{'scenario':<9}{'requests':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ingest s':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        # Run one tiny document through the pool so spawn and import time isn't measured.
+        warm = Path(tmp) / "warm.txt"
+        _write_corpus(warm, 0)
+        install_stubs(StubEmbeddings(latency_s=0.0), StubVectorStore(latency_s=0.0, keep_points=False))
+        await _ingest_pool([warm] * get_settings().INGEST_WORKERS)
+
+        paths = []
+        for i in range(args.docs):
+            path = Path(tmp) / f"doc-{i}.txt"
+            _write_corpus(path, args.mb)
+            paths.append(path)
+
+        for scenario in ("idle", "inline", "pool"):
+            install_stubs(StubEmbeddings(latency_s=0.02), StubVectorStore(latency_s=0.005, keep_points=False))
+            stop = asyncio.Event()
+            load = asyncio.create_task(_retrieve_load(client, stop, args.concurrency))
+            start = time.perf_counter()
+            if scenario == "idle":
+                await asyncio.sleep(args.idle_seconds)
+            elif scenario == "inline":
+                await _ingest_inline(paths)
+            else:
+                await _ingest_pool(paths)
+            elapsed = time.perf_counter() - start
+            stop.set()
+            lat = await load
+            print(
+                f"{scenario:<9}{len(lat):>10}{percentile(lat, 50) * 1000:>10.1f}"
+                f"{percentile(lat, 95) * 1000:>10.1f}{percentile(lat, 99) * 1000:>10.1f}"
+                f"{(elapsed if scenario != 'idle' else 0):>10.2f}"
+            )
+
+    await client.aclose()
+    shutdown_process_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
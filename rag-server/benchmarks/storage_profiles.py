@@ -0,0 +1,151 @@
+"""Recall@k vs search latency vs memory for each Qdrant storage profile.
+
+Embeds a local corpus once at full dimensions with the configured backend
+(``--corpus DIR``; each query is the opening of a held-out chunk), or uses
+synthetic clustered vectors (``--synthetic N``) when no API key or model is
+at hand. Ground truth is exact float32 top-k at full dimensions in NumPy, so
+recall reflects both Matryoshka truncation and quantization. Each
+profile x dimensions pair is loaded into a throwaway collection on
+``--qdrant-url`` (``:memory:`` runs qdrant-client's local mode, which ignores
+quantization — use it only to check the harness). Memory is the vector
+footprint from ``bytes_per_vector``, excluding HNSW links and payload.
+
+Usage (from rag-server/, Qdrant running):
+    python -m benchmarks.storage_profiles --corpus ../docs --dims 3072 1024 256
+    python -m benchmarks.storage_profiles --synthetic 50000 --dims 3072 1024 --oversampling 1 2 4
+"""
+import argparse
+import asyncio
+import time
+from pathlib import Path
+
+import numpy as np
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.models import CollectionStatus, PointStruct
+
+from src.adapters.document_parser import SUPPORTED_EXTENSIONS, get_extension, parse_document
+from src.adapters.storage_profiles import (
+    STORAGE_PROFILES,
+    bytes_per_vector,
+    quantization_config,
+    search_params,
+    vectors_config,
+)
+from src.config import get_settings
+from src.core.chunker import chunk_text
+from .stubs import percentile, quiet_logs
+
+
+def _synthetic(n: int, queries: int, dims: int) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(0)
+    # Decaying per-dimension variance, so leading dimensions carry most of the
+    # signal the way Matryoshka-trained embeddings do.
+    scale = 1 / np.sqrt(1 + np.arange(dims) / 64)
+    centers = rng.standard_normal((max(8, n // 200), dims)) * scale
+    corpus = centers[rng.integers(len(centers), size=n)] + 0.6 * rng.standard_normal((n, dims)) * scale
+    picks = rng.choice(n, size=queries, replace=False)
+    query = corpus[picks] + 0.4 * rng.standard_normal((queries, dims)) * scale
+    return corpus.astype(np.float32), query.astype(np.float32)
+
+
+async def _embedded(corpus_dir: Path, queries: int) -> tuple[np.ndarray, np.ndarray]:
+    from src.adapters.embeddings import close_embeddings, get_embeddings
+
+    chunks = []
+    for path in sorted(corpus_dir.rglob("*")):
+        if path.is_file() and get_extension(path.name) in SUPPORTED_EXTENSIONS:
+            chunks.extend(chunk_text(parse_document(path.read_bytes(), path.name)))
+    if len(chunks) <= queries:
+        raise SystemExit(f"Corpus has {len(chunks)} chunks; need more than --queries {queries}")
+
+    embeddings = get_embeddings()
+    corpus = await embeddings.embed_texts(chunks)
+    step = len(chunks) // queries
+    query = [await embeddings.embed_query(chunks[i][:150]) for i in range(0, step * queries, step)]
+    await close_embeddings()
+    return np.asarray(corpus, dtype=np.float32), np.asarray(query, dtype=np.float32)
+
+
+def _truncate(vectors: np.ndarray, dims: int) -> np.ndarray:
+    head = vectors[:, :dims]
+    return head / np.linalg.norm(head, axis=1, keepdims=True)
+
+
+async def _load(client: AsyncQdrantClient, name: str, vectors: np.ndarray, profile) -> None:
+    if await client.collection_exists(name):
+        await client.delete_collection(name)
+    await client.create_collection(
+        collection_name=name,
+        vectors_config=vectors_config(vectors.shape[1], profile),
+        quantization_config=quantization_config(profile),
+    )
+    for start in range(0, len(vectors), 512):
+        batch = vectors[start : start + 512]
+        await client.upsert(
+            collection_name=name,
+            points=[PointStruct(id=start + i, vector=v.tolist()) for i, v in enumerate(batch)],
+        )
+    # Don't time searches against a half-built index.
+    while (await client.get_collection(name)).status != CollectionStatus.GREEN:
+        await asyncio.sleep(0.5)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--corpus", type=Path)
+    source.add_argument("--synthetic", type=int, metavar="N")
+    parser.add_argument("--synthetic-dims", type=int, default=3072)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--dims", type=int, nargs="+", default=[3072, 1024, 256])
+    parser.add_argument("--profiles", nargs="+", default=list(STORAGE_PROFILES), choices=list(STORAGE_PROFILES))
+    parser.add_argument("--oversampling", type=float, nargs="+", default=[0], help="0 = profile default")
+    parser.add_argument("--qdrant-url", default=None, help="defaults to QDRANT_URL")
+    args = parser.parse_args()
+    quiet_logs()
+
+    if args.corpus:
+        corpus, queries = await _embedded(args.corpus, args.queries)
+    else:
+        corpus, queries = _synthetic(args.synthetic, args.queries, args.synthetic_dims)
+    full = corpus.shape[1]
+
+    # Exact top-k at full precision is the reference every profile is scored against.
+    truth = np.argsort(-(_truncate(queries, full) @ _truncate(corpus, full).T), axis=1)[:, : args.k]
+
+    url = args.qdrant_url or get_settings().QDRANT_URL
+    client = AsyncQdrantClient(location=url) if url == ":memory:" else AsyncQdrantClient(url=url)
+    print(f"{len(corpus)} vectors, {len(queries)} queries, recall@{args.k} vs exact {full}-d float32")
+    print(f"{'profile':>8}{'dims':>6}{'overs':>7}{'recall':>8}{'p50 ms':>8}{'p95 ms':>8}{'RAM MB':>9}{'disk MB':>9}")
+    try:
+        for dims in [d for d in args.dims if d <= full]:
+            vectors, query_vectors = _truncate(corpus, dims), _truncate(queries, dims)
+            for name in args.profiles:
+                profile = STORAGE_PROFILES[name]
+                collection = f"bench_storage_{name}_{dims}"
+                await _load(client, collection, vectors, profile)
+                for oversampling in args.oversampling if profile.quantization else [0]:
+                    params = search_params(profile, oversampling or None)
+                    latencies, hits = [], 0
+                    for qv, expected in zip(query_vectors, truth):
+                        start = time.perf_counter()
+                        result = await client.query_points(
+                            collection_name=collection, query=qv.tolist(), limit=args.k, search_params=params
+                        )
+                        latencies.append(time.perf_counter() - start)
+                        hits += len({p.id for p in result.points} & set(expected.tolist()))
+                    ram, disk = bytes_per_vector(dims, profile)
+                    print(
+                        f"{name:>8}{dims:>6}{oversampling or profile.oversampling:>7.1f}"
+                        f"{hits / truth.size:>8.3f}{percentile(latencies, 50) * 1000:>8.2f}"
+                        f"{percentile(latencies, 95) * 1000:>8.2f}"
+                        f"{ram * len(vectors) / 2**20:>9.1f}{disk * len(vectors) / 2**20:>9.1f}"
+                    )
+                await client.delete_collection(collection)
+    finally:
+        await client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,99 @@
+"""Local stand-in for the OpenAI ``/v1/embeddings`` endpoint.
+
+Simulates per-request and per-token latency and, optionally, a server-side
+tokens-per-minute limit (a continuously refilled bucket, like OpenAI's)
+that answers 429 with Retry-After, so the embedding
+scheduler can be exercised without API keys. Point the adapter at it with
+``OPENAI_BASE_URL=http://127.0.0.1:<port>/v1``.
+"""
+import asyncio
+import base64
+import socket
+import time
+from array import array
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from src.adapters.embedding_scheduler import estimate_tokens
+from .stubs import fake_vector
+
+
+def create_app(
+    request_latency_s: float = 0.05,
+    token_latency_s: float = 0.0,
+    server_tpm: int | None = None,
+) -> FastAPI:
+    app = FastAPI()
+    bucket = {"tokens": float(server_tpm or 0), "updated": time.monotonic()}
+    app.state.requests = 0
+    app.state.rejected = 0
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request):
+        body = await request.json()
+        inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        tokens = sum(estimate_tokens(t) for t in inputs)
+        app.state.requests += 1
+
+        if server_tpm is not None:
+            now = time.monotonic()
+            refill = (now - bucket["updated"]) * server_tpm / 60
+            bucket["tokens"] = min(server_tpm, bucket["tokens"] + refill)
+            bucket["updated"] = now
+            if bucket["tokens"] < tokens:
+                app.state.rejected += 1
+                retry_after = (tokens - bucket["tokens"]) * 60 / server_tpm
+                return JSONResponse(
+                    {"error": {"message": "Rate limit reached", "type": "rate_limit_exceeded"}},
+                    status_code=429,
+                    headers={"retry-after": f"{retry_after:.2f}"},
+                )
+            bucket["tokens"] -= tokens
+
+        await asyncio.sleep(request_latency_s + token_latency_s * tokens)
+
+        dims = body.get("dimensions") or 64
+        as_base64 = body.get("encoding_format") == "base64"
+        data = []
+        for i, text in enumerate(inputs):
+            vector = fake_vector(text, dims)
+            embedding = base64.b64encode(array("f", vector).tobytes()).decode() if as_base64 else vector
+            data.append({"object": "embedding", "index": i, "embedding": embedding})
+        return {
+            "object": "list",
+            "data": data,
+            "model": body["model"],
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }
+
+    return app
+
+
+class StubEmbeddingServer:
+    """Runs ``create_app`` with uvicorn on a free local port inside the current loop."""
+
+    def __init__(self, app: FastAPI):
+        self.app = app
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            self.port = sock.getsockname()[1]
+        self._server = uvicorn.Server(
+            uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning")
+        )
+        self._task: asyncio.Task | None = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/v1"
+
+    async def __aenter__(self) -> "StubEmbeddingServer":
+        self._task = asyncio.create_task(self._server.serve())
+        while not self._server.started:
+            await asyncio.sleep(0.01)
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self._server.should_exit = True
+        await self._task
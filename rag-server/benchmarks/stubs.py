@@ -0,0 +1,221 @@
+"""Local stand-ins for the embedding API and Qdrant, with injected latency.
+
+Benchmarks install these into the adapter singletons so the real FastAPI
+routes and core orchestration run unchanged, minus the network.
+"""
+import asyncio
+import hashlib
+import logging
+import math
+import time
+from collections import defaultdict
+from typing import NamedTuple
+
+import structlog
+
+from src.adapters import embeddings as embedding_backend, vector_store
+
+
+def fake_vector(text: str, dimensions: int) -> list[float]:
+    """Deterministic unit vector derived from the text hash."""
+    seed = hashlib.sha256(text.encode()).digest()
+    raw = [seed[i % len(seed)] - 127.5 for i in range(dimensions)]
+    norm = math.sqrt(sum(v * v for v in raw)) or 1.0
+    return [v / norm for v in raw]
+
+
+class _Latency:
+    """Injected per-call delay; ``max_concurrency`` caps calls in flight like a finite backend."""
+
+    def __init__(self, latency_s: float, blocking: bool, max_concurrency: int | None):
+        self.latency_s = latency_s
+        self.blocking = blocking
+        self._slots = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        self.calls = 0
+
+    async def _wait(self) -> None:
+        self.calls += 1
+        if self.blocking:
+            time.sleep(self.latency_s)
+        elif self._slots:
+            async with self._slots:
+                await asyncio.sleep(self.latency_s)
+        else:
+            await asyncio.sleep(self.latency_s)
+
+
+class StubEmbeddings(_Latency):
+    """Embedding adapter stand-in. ``blocking=True`` mimics the old sync client."""
+
+    def __init__(
+        self,
+        latency_s: float = 0.05,
+        dimensions: int = 64,
+        blocking: bool = False,
+        max_concurrency: int | None = None,
+    ):
+        super().__init__(latency_s, blocking, max_concurrency)
+        self.dimensions = dimensions
+        self.model = "stub-embedding"
+
+    async def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        await self._wait()
+        return [fake_vector(t, self.dimensions) for t in texts]
+
+    async def embed_query(self, query: str) -> list[float]:
+        await self._wait()
+        return fake_vector(query, self.dimensions)
+
+    async def embed_queries(self, queries: list[str]) -> list[list[float]]:
+        await self._wait()
+        return [fake_vector(q, self.dimensions) for q in queries]
+
+    async def ping(self) -> None:
+        await self._wait()
+
+    async def close(self) -> None:
+        pass
+
+
+class StubVectorStore(_Latency):
+    """Vector store stand-in returning canned hits after an injected delay."""
+
+    def __init__(
+        self,
+        latency_s: float = 0.01,
+        blocking: bool = False,
+        keep_points: bool = True,
+        max_concurrency: int | None = None,
+    ):
+        super().__init__(latency_s, blocking, max_concurrency)
+        # Ingestion benchmarks drop points so the stub's heap doesn't skew memory or GC.
+        self.keep_points = keep_points
+        self.points: dict[str, list[dict]] = {}
+        self.corpus_version = 0
+        self.dimensions = 64
+
+    async def upsert_chunks(
+        self,
+        texts,
+        embeddings,
+        document_id,
+        filename,
+        start_index: int = 0,
+        tenant_id: str = "default",
+        chunk_indexes=None,
+    ) -> int:
+        await self._wait()
+        if self.keep_points:
+            self.points.setdefault(document_id, []).extend(
+                {"text": t, "document_id": document_id, "filename": filename, "chunk_index": i}
+                for i, t in zip(chunk_indexes or range(start_index, start_index + len(texts)), texts)
+            )
+        self.corpus_version += 1
+        return len(texts)
+
+    async def document_chunks(self, document_id: str, tenant_id: str = "default") -> dict[str, dict]:
+        return {}
+
+    async def count_chunks(self, tenant_id: str = "default") -> int:
+        return sum(len(points) for points in self.points.values())
+
+    async def update_chunks(self, payloads, tenant_id: str = "default") -> None:
+        pass
+
+    async def vectors_by_content(self, hashes, tenant_id: str = "default") -> dict:
+        return {}
+
+    async def delete_chunks(self, chunk_ids, tenant_id: str = "default") -> None:
+        pass
+
+    async def search(
+        self, query_vector, top_k: int = 5, score_threshold: float = 0.3, filter=None, tenant_id: str = "default"
+    ) -> list[dict]:
+        await self._wait()
+        return self._hits(top_k)
+
+    async def search_batch(
+        self, query_vectors, top_ks, score_threshold: float = 0.3, filters=None, tenant_ids=None
+    ) -> list[list[dict]]:
+        await self._wait()
+        return [self._hits(k) for k in top_ks]
+
+    def _hits(self, top_k: int) -> list[dict]:
+        return [
+            {
+                "chunk_id": f"stub-{i}",
+                "text": f"stub chunk {i}",
+                "document_id": "stub-doc",
+                "filename": "stub.txt",
+                "chunk_index": i,
+                "score": 1.0 - i * 0.1,
+            }
+            for i in range(top_k)
+        ]
+
+    async def delete_by_document(self, document_id: str, tenant_id: str = "default") -> None:
+        await self._wait()
+        self.points.pop(document_id, None)
+        self.corpus_version += 1
+
+    async def ping(self) -> None:
+        await self._wait()
+
+    async def close(self) -> None:
+        pass
+
+
+class _Stage(NamedTuple):
+    samples: list[float]
+
+    def observe(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+
+class StageSamples:
+    """Stand-in for ``src.metrics.STAGE_SECONDS`` that keeps every sample for exact percentiles."""
+
+    def __init__(self):
+        self.samples: dict[str, list[float]] = defaultdict(list)
+
+    def labels(self, stage: str) -> _Stage:
+        return _Stage(self.samples[stage])
+
+    def clear(self) -> None:
+        self.samples.clear()
+
+
+def summarize(samples: list[float]) -> dict:
+    """Count and p50/p95/p99 in milliseconds, the shape benchmarks write to JSON."""
+    return {
+        "n": len(samples),
+        **{f"p{p}_ms": round(percentile(samples, p) * 1000, 3) for p in (50, 95, 99)},
+    }
+
+
+def install_fake_redis() -> None:
+    """Point the Redis registry at an in-process fakeredis server."""
+    import fakeredis
+
+    from src.adapters import redis_store
+
+    redis_store._redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+
+
+def install_stubs(embeddings: StubEmbeddings, store: StubVectorStore) -> None:
+    """Swap the adapter singletons for stubs."""
+    embedding_backend._embeddings = embeddings
+    vector_store._store = store
+
+
+def quiet_logs() -> None:
+    """Drop info-level structlog output so it doesn't skew timings."""
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[idx]
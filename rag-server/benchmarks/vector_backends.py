@@ -0,0 +1,198 @@
+"""Vector search per backend as the corpus grows: the in-process store vs Qdrant local mode.
+
+For each of ``--sizes`` and each of ``--backends``, a fresh process loads
+that many synthetic ``--dims`` vectors (clustered, like embeddings of a
+real corpus; ``--chunks-per-doc`` chunks per document) through the store's
+own ``upsert_chunks``, then reports:
+
+  load      seconds to upsert everything (and, for the graph, to build it)
+  reopen    seconds to open the persisted store again (local backends)
+  p50/p95   single-query ``search`` latency, one query at a time
+  batch     per-query latency inside ``search_batch`` of ``--batch`` queries
+  recall    top-k overlap with the exact answer
+  rss       resident memory added by the store (mapped vector pages included)
+
+Backends: ``local-exact`` (the NumPy scan), ``local-graph`` (the HNSW graph
+built from the first chunk; needs hnswlib) and ``qdrant-local``
+(qdrant-client's local mode, the closest in-process equivalent to the
+server). Local mode keeps every point as a Python object and scans in
+Python, so it is skipped above ``--qdrant-max`` chunks. The lexical index
+is filled by both stores and counts towards both RSS figures.
+
+Usage (from rag-server/):
+    python -m benchmarks.vector_backends
+    python -m benchmarks.vector_backends --sizes 10000 100000 1000000 --backends local-exact local-graph
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+from qdrant_client import AsyncQdrantClient
+
+from src.adapters import embeddings as embedding_backend, qdrant_store
+from src.adapters.local_vector_store import LocalVectorStore
+from src.config import get_settings
+from .stubs import StubEmbeddings, percentile, quiet_logs
+
+BACKENDS = ("local-exact", "local-graph", "qdrant-local")
+
+
+def _rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+class _Corpus:
+    """Clustered vectors generated batch by batch, with the exact top-k of each query kept as they stream."""
+
+    def __init__(self, args):
+        self.rng = np.random.default_rng(0)
+        self.dims = args.dims
+        self.centers = self.rng.standard_normal((args.clusters, args.dims), dtype=np.float32)
+        self.queries = self._sample(args.queries)
+        self.queries /= np.linalg.norm(self.queries, axis=1, keepdims=True)
+        self.k = args.top_k
+        self.best_scores = np.full((args.queries, 0), -np.inf, np.float32)
+        self.best_ids = np.zeros((args.queries, 0), np.int64)
+
+    def _sample(self, n: int) -> np.ndarray:
+        picks = self.rng.integers(len(self.centers), size=n)
+        return self.centers[picks] + 0.6 * self.rng.standard_normal((n, self.dims), dtype=np.float32)
+
+    def batch(self, start: int, n: int) -> np.ndarray:
+        vectors = self._sample(n)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        scores = np.concatenate([self.best_scores, self.queries @ vectors.T], axis=1)
+        ids = np.concatenate([self.best_ids, np.broadcast_to(np.arange(start, start + n), (len(self.queries), n))], axis=1)
+        keep = np.argsort(-scores, axis=1)[:, :self.k]
+        self.best_scores = np.take_along_axis(scores, keep, axis=1)
+        self.best_ids = np.take_along_axis(ids, keep, axis=1)
+        return vectors
+
+
+async def _open(backend: str, path: Path, args):
+    if backend == "qdrant-local":
+        store = qdrant_store.QdrantVectorStore()
+        store.client = AsyncQdrantClient(location=":memory:")
+        store.collection_name = "bench_vector_backends"
+        await store._ensure_collection()
+        return store
+    return await LocalVectorStore.open(path, args.dims)
+
+
+async def _finish_graph(store: LocalVectorStore) -> None:
+    """Wait until every row is in the graph (the store leaves a short tail to exact scans)."""
+    while store._graph is None or store._graph_rows < len(store._ids):
+        if store._graph_task is None or store._graph_task.done():
+            store._graph_task = asyncio.create_task(store._extend_graph())
+        await store._graph_task
+
+
+async def _child(backend: str, size: int, args) -> dict:
+    embedding_backend._embeddings = StubEmbeddings(latency_s=0, dimensions=args.dims)
+    get_settings().LOCAL_VECTOR_GRAPH_MIN_CHUNKS = 0 if backend == "local-graph" else size + 1
+    corpus = _Corpus(args)
+    path = Path(tempfile.mkdtemp(prefix="bench-vector-backends-"))
+    try:
+        rss_before = _rss_mb()
+        store = await _open(backend, path, args)
+        start = time.perf_counter()
+        for doc, offset in enumerate(range(0, size, args.chunks_per_doc)):
+            n = min(args.chunks_per_doc, size - offset)
+            vectors = corpus.batch(offset, n)
+            await store.upsert_chunks(
+                [f"chunk {i}" for i in range(offset, offset + n)], vectors.tolist(), f"doc-{doc}", f"file-{doc}.txt",
+            )
+        if backend == "local-graph":
+            await _finish_graph(store)
+        result = {"load_s": time.perf_counter() - start}
+
+        if backend != "qdrant-local":
+            await store.close()
+            start = time.perf_counter()
+            store = await LocalVectorStore.open(path, args.dims)
+            result["reopen_s"] = time.perf_counter() - start
+        result["rss_mb"] = _rss_mb() - rss_before
+
+        queries = corpus.queries.tolist()
+        # First touch pages the mapped vectors in; don't time it.
+        await store.search_batch(queries[:args.batch], [args.top_k] * args.batch, -1.0)
+        latencies, found = [], []
+        for query in queries:
+            start = time.perf_counter()
+            chunks = await store.search(query, args.top_k, -1.0)
+            latencies.append(time.perf_counter() - start)
+            found.append({int(c["text"].split()[1]) for c in chunks})
+        batched = []
+        for offset in range(0, len(queries), args.batch):
+            group = queries[offset:offset + args.batch]
+            start = time.perf_counter()
+            await store.search_batch(group, [args.top_k] * len(group), -1.0)
+            batched.append((time.perf_counter() - start) / len(group))
+
+        truth = [set(row) for row in corpus.best_ids.tolist()]
+        result.update(
+            p50_ms=percentile(latencies, 50) * 1000,
+            p95_ms=percentile(latencies, 95) * 1000,
+            batch_ms=sum(batched) / len(batched) * 1000,
+            recall=sum(len(f & t) for f, t in zip(found, truth)) / (len(truth) * args.top_k),
+        )
+        await store.close()
+        return result
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--dims", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--batch", type=int, default=32)
+    parser.add_argument("--clusters", type=int, default=512)
+    parser.add_argument("--chunks-per-doc", type=int, default=100)
+    parser.add_argument("--qdrant-max", type=int, default=100_000)
+    parser.add_argument("--child", nargs=2, metavar=("BACKEND", "SIZE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    quiet_logs()
+    warnings.filterwarnings("ignore", category=UserWarning, module="qdrant_client")
+
+    if args.child:
+        backend, size = args.child
+        print(json.dumps(asyncio.run(_child(backend, int(size), args))))
+        return
+
+    print(f"{args.dims} dims, top {args.top_k}, {args.queries} queries, search_batch of {args.batch}")
+    print(f"{'chunks':>9}  {'backend':<13}{'load s':>9}{'reopen s':>10}{'p50 ms':>9}{'p95 ms':>9}"
+          f"{'batch ms':>10}{'recall':>8}{'rss MB':>9}")
+    for size in args.sizes:
+        for backend in args.backends:
+            if backend == "qdrant-local" and size > args.qdrant_max:
+                print(f"{size:>9}  {backend:<13}skipped (above --qdrant-max)")
+                continue
+            proc = subprocess.run(
+                [sys.executable, "-m", "benchmarks.vector_backends", *sys.argv[1:], "--child", backend, str(size)],
+                capture_output=True, text=True,
+            )
+            if proc.returncode:
+                print(f"{size:>9}  {backend:<13}failed: {proc.stderr.strip().splitlines()[-1]}")
+                continue
+            r = json.loads(proc.stdout.strip().splitlines()[-1])
+            reopen = f"{r['reopen_s']:.2f}" if "reopen_s" in r else "-"
+            print(f"{size:>9}  {backend:<13}{r['load_s']:>9.2f}{reopen:>10}{r['p50_ms']:>9.3f}{r['p95_ms']:>9.3f}"
+                  f"{r['batch_ms']:>10.3f}{r['recall']:>8.3f}{r['rss_mb']:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,53 +1,164 @@
-"""Document parser adapter — handles PDF, DOCX, TXT, MD files."""
+"""Document parser adapter — handles PDF, DOCX, TXT, MD files.
+
+pypdf and python-docx are imported on first use: parsing runs in the
+ingestion process pool, so the server process never needs them.
+"""
 import io
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
 import structlog
-from pypdf import PdfReader
-from docx import Document as DocxDocument
 
 logger = structlog.get_logger()
 
 SUPPORTED_EXTENSIONS = {".pdf", ".docx", ".txt", ".md"}
 
+# Plain-text paragraphs longer than this are yielded in pieces
+_TEXT_SECTION_CHARS = 64 * 1024
+
+Source = str | Path | BinaryIO
+
 
 def parse_document(content: bytes, filename: str) -> str:
     """Parse document content to plain text based on file extension."""
-    ext = _get_extension(filename)
+    return "\n\n".join(iter_sections(io.BytesIO(content), filename))
+
+
+def iter_sections(
+    source: Source,
+    filename: str,
+    start: int = 0,
+    stop: int | None = None,
+) -> Iterator[str]:
+    """Lazily yield document text section by section — pages for PDF, paragraphs otherwise.
+
+    ``source`` is a path or binary stream. Text files are read line by line
+    and PDFs page by page from an open file (see ``open_pdf``); DOCX is
+    always loaded whole. ``start`` and ``stop`` restrict parsing to a page
+    range for PDF and a byte range for plain text (see ``_iter_text``).
+    """
+    ext = get_extension(filename)
 
     if ext == ".pdf":
-        return _parse_pdf(content)
+        return _iter_pdf(source, start, stop)
     elif ext == ".docx":
-        return _parse_docx(content)
+        return _iter_docx(source)
     elif ext in (".txt", ".md"):
-        return _parse_text(content)
+        return _iter_text(source, start, stop)
     else:
         raise ValueError(f"Unsupported file type: {ext}. Supported: {SUPPORTED_EXTENSIONS}")
 
 
-def _get_extension(filename: str) -> str:
+def count_pdf_pages(source: Source) -> int:
+    reader = open_pdf(source)
+    try:
+        return len(reader.pages)
+    finally:
+        _close_pdf(reader, source)
+
+
+def open_pdf(source: Source):
+    """Open a ``PdfReader`` that reads objects from the file as pages are extracted.
+
+    pypdf copies the whole file into memory when given a path, so paths are
+    opened here and passed as a stream instead. The reader still keeps the
+    cross-reference table and page tree resident (a few KB per page).
+    """
+    from pypdf import PdfReader
+
+    stream = open(source, "rb") if isinstance(source, (str, Path)) else source
+    try:
+        return PdfReader(stream)
+    except BaseException:
+        if stream is not source:
+            stream.close()
+        raise
+
+
+def iter_pdf_pages(reader, start: int = 0, stop: int | None = None) -> Iterator[str]:
+    """Yield the text of pages ``[start, stop)`` of an open reader.
+
+    Objects parsed for the range (content streams, fonts) are dropped from the
+    reader's cache afterwards, so a reader reused across ranges only holds one
+    range's worth of them.
+    """
+    pages = reader.pages[start:stop]
+    chars = 0
+    try:
+        for page in pages:
+            text = page.extract_text()
+            if text and text.strip():
+                chars += len(text)
+                yield text.strip()
+    finally:
+        reader.resolved_objects.clear()
+    logger.info("Parsed PDF", pages=len(pages), chars=chars)
+
+
+def get_extension(filename: str) -> str:
     return "." + filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
 
 
-def _parse_pdf(content: bytes) -> str:
-    reader = PdfReader(io.BytesIO(content))
-    text_parts = []
-    for page in reader.pages:
-        text = page.extract_text()
-        if text:
-            text_parts.append(text.strip())
-    result = "\n\n".join(text_parts)
-    logger.info("Parsed PDF", pages=len(reader.pages), chars=len(result))
-    return result
+def _close_pdf(reader, source: Source) -> None:
+    if reader.stream is not source:
+        reader.stream.close()
+
+
+def _iter_pdf(source: Source, start: int = 0, stop: int | None = None) -> Iterator[str]:
+    reader = open_pdf(source)
+    try:
+        yield from iter_pdf_pages(reader, start, stop)
+    finally:
+        _close_pdf(reader, source)
+
+
+def _iter_docx(source: Source) -> Iterator[str]:
+    from docx import Document as DocxDocument
 
+    doc = DocxDocument(source)
+    paragraphs = chars = 0
+    for para in doc.paragraphs:
+        if para.text.strip():
+            paragraphs += 1
+            chars += len(para.text)
+            yield para.text
+    logger.info("Parsed DOCX", paragraphs=paragraphs, chars=chars)
 
-def _parse_docx(content: bytes) -> str:
-    doc = DocxDocument(io.BytesIO(content))
-    text_parts = [para.text for para in doc.paragraphs if para.text.strip()]
-    result = "\n\n".join(text_parts)
-    logger.info("Parsed DOCX", paragraphs=len(text_parts), chars=len(result))
-    return result
 
+def _iter_text(source: Source, start: int = 0, stop: int | None = None) -> Iterator[str]:
+    """Yield paragraphs of a UTF-8 text file.
 
-def _parse_text(content: bytes) -> str:
-    result = content.decode("utf-8", errors="ignore")
-    logger.info("Parsed text file", chars=len(result))
-    return result
+    With a byte range, yields the lines that *start* inside ``[start, stop)``,
+    so adjacent ranges partition the file without splitting a line.
+    """
+    stream = open(source, "rb") if isinstance(source, (str, Path)) else source
+    try:
+        if start:
+            # Resume at the first line that begins at or after ``start``.
+            stream.seek(start - 1)
+            stream.readline()
+        position = stream.tell()
+        buffer: list[str] = []
+        size = chars = 0
+        for raw in iter(stream.readline, b""):
+            if stop is not None and position >= stop:
+                break
+            position += len(raw)
+            line = raw.decode("utf-8", errors="ignore")
+            chars += len(line)
+            if not line.strip():
+                if buffer:
+                    yield "".join(buffer)
+                    buffer, size = [], 0
+                continue
+            buffer.append(line)
+            size += len(line)
+            if size >= _TEXT_SECTION_CHARS:
+                yield "".join(buffer)
+                buffer, size = [], 0
+        if buffer:
+            yield "".join(buffer)
+        logger.info("Parsed text file", chars=chars)
+    finally:
+        if stream is not source:
+            stream.close()
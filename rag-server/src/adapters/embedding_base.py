@@ -0,0 +1,70 @@
+"""Embedding backend interface — shared caching logic for every backend."""
+from abc import ABC, abstractmethod
+
+from ..metrics import timed
+from .embedding_cache import cache_key, get_embedding_cache
+
+
+class BaseEmbeddings(ABC):
+    """Base class for embedding backends.
+
+    Subclasses set ``model`` and ``dimensions`` and implement
+    ``_embed_documents``; backends that embed queries differently (e.g.
+    with an instruction prefix) also override ``_embed_queries`` and
+    ``query_model`` so their cache entries don't collide with passages.
+    """
+
+    model: str
+    dimensions: int
+
+    @property
+    def query_model(self) -> str:
+        return self.model
+
+    async def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        """Embed a batch of texts. Returns list of embedding vectors.
+
+        Texts already in the embedding cache are not re-embedded.
+        """
+        return await self._cached(texts, self.model, self._embed_documents)
+
+    async def embed_query(self, query: str) -> list[float]:
+        """Embed a single query string."""
+        return (await self.embed_queries([query]))[0]
+
+    async def embed_queries(self, queries: list[str]) -> list[list[float]]:
+        """Embed several queries in one backend call."""
+        return await self._cached(queries, self.query_model, self._embed_queries)
+
+    async def _cached(self, texts: list[str], model_key: str, embed) -> list[list[float]]:
+        if not texts:
+            return []
+
+        cache = get_embedding_cache()
+        keys = [cache_key(model_key, self.dimensions, t) for t in texts]
+        vectors = await cache.get_many(keys)
+
+        # Deduplicate misses so repeated boilerplate is embedded once
+        missing = list(dict.fromkeys(t for t, v in zip(texts, vectors) if v is None))
+        if missing:
+            # Only the backend round trip; cache lookups are part of the caller's stage.
+            with timed("embed"):
+                fresh = dict(zip(missing, await embed(missing)))
+            await cache.put_many({cache_key(model_key, self.dimensions, t): v for t, v in fresh.items()})
+            vectors = [v if v is not None else fresh[t] for t, v in zip(texts, vectors)]
+
+        return vectors
+
+    @abstractmethod
+    async def _embed_documents(self, texts: list[str]) -> list[list[float]]:
+        """Embed texts with the backend, bypassing the cache."""
+
+    async def _embed_queries(self, texts: list[str]) -> list[list[float]]:
+        return await self._embed_documents(texts)
+
+    async def ping(self) -> None:
+        """Cheapest round trip through the backend; also warms it before the first query."""
+        await self._embed_queries(["ping"])
+
+    async def close(self) -> None:
+        pass
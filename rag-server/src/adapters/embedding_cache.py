@@ -0,0 +1,129 @@
+"""Content-addressed embedding cache — in-process LRU in front of a shared Redis tier."""
+import base64
+import hashlib
+from array import array
+from collections import OrderedDict
+
+import structlog
+
+from ..config import get_settings
+from .redis_store import get_redis
+
+logger = structlog.get_logger()
+
+EMBEDDING_KEY_PREFIX = "voice-ai:emb:"
+
+
+def cache_key(model: str, dimensions: int, text: str) -> str:
+    digest = hashlib.sha256(f"{model}\x00{dimensions}\x00{text}".encode()).hexdigest()
+    return f"{EMBEDDING_KEY_PREFIX}{digest}"
+
+
+def _encode(vector: array) -> str:
+    return base64.b64encode(vector.tobytes()).decode()
+
+
+def _decode(raw: str) -> array:
+    vector = array("f")
+    vector.frombytes(base64.b64decode(raw))
+    return vector
+
+
+class EmbeddingCache:
+    """Two-tier cache of float32 vectors keyed by ``cache_key``.
+
+    The LRU tier holds at most ``max_entries`` vectors. The Redis tier is
+    shared across replicas; entries expire after ``ttl_seconds`` and Redis
+    evicts under memory pressure (``volatile-lru``). Redis errors degrade to
+    LRU-only rather than failing the embedding call.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int, use_redis: bool = True):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.use_redis = use_redis
+        self._lru: OrderedDict[str, array] = OrderedDict()
+        self.hits_memory = 0
+        self.hits_redis = 0
+        self.misses = 0
+
+    def _remember(self, key: str, vector: array) -> None:
+        self._lru[key] = vector
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    async def get_many(self, keys: list[str]) -> list[list[float] | None]:
+        """Look up vectors; returns ``None`` for each miss, in input order."""
+        found: dict[str, array] = {}
+        remote: list[str] = []
+        for key in keys:
+            vector = self._lru.get(key)
+            if vector is not None:
+                self._lru.move_to_end(key)
+                found[key] = vector
+                self.hits_memory += 1
+            elif key not in remote:
+                remote.append(key)
+
+        if remote and self.use_redis:
+            try:
+                r = await get_redis()
+                for key, raw in zip(remote, await r.mget(remote)):
+                    if raw is not None:
+                        vector = _decode(raw)
+                        found[key] = vector
+                        self._remember(key, vector)
+                        self.hits_redis += 1
+            except Exception as e:
+                logger.warning("Embedding cache Redis lookup failed", error=str(e))
+
+        results = [found[k].tolist() if k in found else None for k in keys]
+        self.misses += sum(1 for v in results if v is None)
+        return results
+
+    async def put_many(self, items: dict[str, list[float]]) -> None:
+        if not items:
+            return
+        encoded = {}
+        for key, values in items.items():
+            vector = array("f", values)
+            self._remember(key, vector)
+            encoded[key] = _encode(vector)
+
+        if self.use_redis:
+            try:
+                r = await get_redis()
+                async with r.pipeline(transaction=False) as pipe:
+                    for key, raw in encoded.items():
+                        pipe.set(key, raw, ex=self.ttl_seconds)
+                    await pipe.execute()
+            except Exception as e:
+                logger.warning("Embedding cache Redis write failed", error=str(e))
+
+    def stats(self) -> dict:
+        lookups = self.hits_memory + self.hits_redis + self.misses
+        return {
+            "entries": len(self._lru),
+            "max_entries": self.max_entries,
+            "hits_memory": self.hits_memory,
+            "hits_redis": self.hits_redis,
+            "misses": self.misses,
+            "hit_rate": round((self.hits_memory + self.hits_redis) / lookups, 4) if lookups else 0.0,
+        }
+
+
+# Singleton
+_cache: EmbeddingCache | None = None
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    global _cache
+    if _cache is None:
+        settings = get_settings()
+        _cache = EmbeddingCache(
+            max_entries=settings.EMBEDDING_CACHE_SIZE,
+            ttl_seconds=settings.EMBEDDING_CACHE_TTL,
+            use_redis=settings.EMBEDDING_CACHE_REDIS,
+        )
+    return _cache
@@ -0,0 +1,156 @@
+"""Embedding request scheduler — token-sized batches, bounded concurrency, rate limits, retries."""
+import asyncio
+import math
+import random
+import time
+from typing import Awaitable, Callable
+
+import structlog
+
+logger = structlog.get_logger()
+
+EmbedBatch = Callable[[list[str]], Awaitable[list[list[float]]]]
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap upper-leaning token estimate (~3 chars/token for English with BPE)."""
+    return max(1, math.ceil(len(text) / 3))
+
+
+class RetryableEmbeddingError(Exception):
+    """Raised by an ``EmbedBatch`` for transient failures (429, 5xx, timeouts)."""
+
+    def __init__(self, message: str, retry_after: float | None = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """Token buckets for requests-per-minute and tokens-per-minute.
+
+    Both buckets refill continuously; ``acquire`` waits until a request of
+    ``tokens`` fits in both. A request larger than the whole TPM budget is
+    let through once the bucket is full rather than waiting forever.
+    Priority callers (live queries) go first: while one is waiting, others
+    don't take from the buckets.
+    """
+
+    # How often a caller held back for a priority one looks again.
+    yield_interval = 0.01
+
+    def __init__(self, rpm: int, tpm: int):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = float(rpm)
+        self._tokens = float(tpm)
+        self._updated = time.monotonic()
+        self._priority_waiting = 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+        self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+
+    async def acquire(self, tokens: int, priority: bool = False) -> None:
+        tokens = min(tokens, self.tpm)
+        if priority:
+            self._priority_waiting += 1
+        try:
+            while True:
+                # No await between the check and the take, so it needs no lock;
+                # callers sleep concurrently and each rechecks on waking.
+                self._refill()
+                held_back = not priority and self._priority_waiting > 0
+                if not held_back and self._requests >= 1 and self._tokens >= tokens:
+                    self._requests -= 1
+                    self._tokens -= tokens
+                    return
+                wait = max(
+                    (1 - self._requests) * 60 / self.rpm if self._requests < 1 else 0.0,
+                    (tokens - self._tokens) * 60 / self.tpm if self._tokens < tokens else 0.0,
+                    self.yield_interval if held_back else 0.0,
+                )
+                await asyncio.sleep(wait)
+        finally:
+            if priority:
+                self._priority_waiting -= 1
+
+
+class EmbeddingScheduler:
+    """Splits texts into token-bounded batches and runs them concurrently.
+
+    Document batches and priority (query) batches run in separate lanes of
+    ``max_in_flight`` and ``query_max_in_flight`` requests, so a query never
+    waits for an ingestion batch's slot; both lanes share one ``RateLimiter``,
+    where queries go first. Transient failures are retried with full-jitter
+    exponential backoff (or the server's Retry-After). Output order always
+    matches input order.
+    """
+
+    def __init__(
+        self,
+        embed_batch: EmbedBatch,
+        batch_tokens: int,
+        batch_max_items: int,
+        max_in_flight: int,
+        rate_limiter: RateLimiter,
+        max_retries: int,
+        query_max_in_flight: int = 2,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+    ):
+        self._embed_batch = embed_batch
+        self.batch_tokens = batch_tokens
+        self.batch_max_items = batch_max_items
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._query_in_flight = asyncio.Semaphore(query_max_in_flight)
+        self._limiter = rate_limiter
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.requests = 0
+        self.retries = 0
+
+    def plan_batches(self, texts: list[str]) -> list[tuple[int, int, int]]:
+        """Return ``(start, stop, tokens)`` slices of ``texts``."""
+        batches = []
+        start = tokens = 0
+        for i, text in enumerate(texts):
+            cost = estimate_tokens(text)
+            if i > start and (tokens + cost > self.batch_tokens or i - start >= self.batch_max_items):
+                batches.append((start, i, tokens))
+                start, tokens = i, 0
+            tokens += cost
+        if start < len(texts):
+            batches.append((start, len(texts), tokens))
+        return batches
+
+    async def embed(self, texts: list[str], priority: bool = False) -> list[list[float]]:
+        """Embed ``texts``; ``priority`` puts them in the query lane."""
+        batches = self.plan_batches(texts)
+        results = await asyncio.gather(*(self._run(texts[a:b], tokens, priority) for a, b, tokens in batches))
+        return [vector for batch in results for vector in batch]
+
+    async def _run(self, batch: list[str], tokens: int, priority: bool) -> list[list[float]]:
+        lane = self._query_in_flight if priority else self._in_flight
+        attempt = 0
+        while True:
+            async with lane:
+                await self._limiter.acquire(tokens, priority)
+                self.requests += 1
+                try:
+                    return await self._embed_batch(batch)
+                except RetryableEmbeddingError as e:
+                    if attempt >= self.max_retries:
+                        raise
+                    # Full jitter; added on top of Retry-After so retries don't stampede.
+                    delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+                    if e.retry_after is not None:
+                        delay += e.retry_after
+                    attempt += 1
+                    self.retries += 1
+                    logger.warning("Embedding request retrying", attempt=attempt, delay=round(delay, 2), error=str(e))
+            # Back off outside the semaphore so other batches keep the slot busy.
+            await asyncio.sleep(delay)
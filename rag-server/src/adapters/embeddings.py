@@ -0,0 +1,33 @@
+"""Embedding backend selection — one shared backend chosen by ``EMBEDDING_BACKEND``."""
+from ..config import get_settings
+from .embedding_base import BaseEmbeddings
+
+
+def _create_backend(name: str) -> BaseEmbeddings:
+    if name == "openai":
+        from .openai_embeddings import OpenAIEmbeddings
+
+        return OpenAIEmbeddings()
+    if name == "local":
+        from .local_embeddings import LocalEmbeddings
+
+        return LocalEmbeddings()
+    raise ValueError(f"Unknown EMBEDDING_BACKEND: {name!r} (expected 'openai' or 'local')")
+
+
+# Singleton
+_embeddings: BaseEmbeddings | None = None
+
+
+def get_embeddings() -> BaseEmbeddings:
+    global _embeddings
+    if _embeddings is None:
+        _embeddings = _create_backend(get_settings().EMBEDDING_BACKEND)
+    return _embeddings
+
+
+async def close_embeddings() -> None:
+    global _embeddings
+    if _embeddings is not None:
+        await _embeddings.close()
+        _embeddings = None
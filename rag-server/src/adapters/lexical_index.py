@@ -0,0 +1,262 @@
+"""In-process BM25 index over stored chunks — the lexical half of hybrid retrieval.
+
+Kept in step with the vector store: chunks are added as they are upserted,
+removed on document delete, and the whole index is reloaded from the
+stored payloads on startup. It is per process: writes made through
+another replica reach it when the vector store notices the shared corpus
+version moved and rebuilds it with ``replace_indexes``.
+"""
+import itertools
+import re
+from array import array
+from collections import Counter
+
+import numpy as np
+
+from ..models.document import DEFAULT_TENANT, RetrieveFilter
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:[-_./][a-z0-9]+)*")
+_PART = re.compile(r"[a-z0-9]+")
+
+# Query-side only: these match most of the corpus and would dominate the scan.
+_STOPWORDS = frozenset(
+    "a an and are as at be but by can do does for from has have how i if in is it its me my "
+    "of on or our so that the their there this to was we what when where which who why will "
+    "with you your".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercased word tokens; compounds like ``AB-1234`` also yield their parts.
+
+    Speech-to-text renders codes inconsistently ("AB-1234", "ab 1234"), so
+    both forms must match.
+    """
+    tokens = _TOKEN.findall(text.lower())
+    for compound in [t for t in tokens if not t.isalnum()]:
+        tokens.extend(_PART.findall(compound))
+    return tokens
+
+
+class LexicalIndex:
+    """Append-only BM25 postings with tombstoned deletes and periodic compaction.
+
+    Each chunk gets an integer slot. A term's postings are two parallel
+    arrays of slots and term frequencies, so scoring a query term is one
+    vectorised NumPy pass over its postings. Length norms, and the per-posting
+    BM25 weights of frequent terms, are cached until the next write.
+    """
+
+    # Terms with at least this many postings get their weights cached.
+    IMPACT_CACHE_MIN_DF = 1024
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: dict[str, tuple[array, array]] = {}
+        self._lengths = array("I")
+        self._alive = bytearray()
+        self._chunks: list[dict | None] = []
+        self._slots: dict[str, int] = {}
+        self._by_document: dict[str, list[int]] = {}
+        self._total_length = 0
+        self._dead = 0
+        self.loaded = False
+        self._removed_while_loading: set[str] = set()
+        self._norm: np.ndarray | None = None
+        self._impacts: dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def add(self, chunks: list[dict]) -> None:
+        """Index chunks (``chunk_id``, ``text``, ``document_id``, ``filename``, ``chunk_index``)."""
+        for chunk in chunks:
+            if chunk["chunk_id"] in self._slots or chunk["document_id"] in self._removed_while_loading:
+                continue
+            slot = len(self._lengths)
+            terms = Counter(tokenize(chunk["text"]))
+            for term, tf in terms.items():
+                slots, tfs = self._postings.setdefault(term, (array("I"), array("H")))
+                slots.append(slot)
+                tfs.append(min(tf, 0xFFFF))
+
+            length = sum(terms.values())
+            self._lengths.append(length)
+            self._alive.append(1)
+            self._chunks.append(chunk)
+            self._slots[chunk["chunk_id"]] = slot
+            self._by_document.setdefault(chunk["document_id"], []).append(slot)
+            self._total_length += length
+        self._invalidate()
+
+    def remove_document(self, document_id: str) -> None:
+        if not self.loaded:
+            # A concurrent load may still be replaying this document's points.
+            self._removed_while_loading.add(document_id)
+        for slot in self._by_document.pop(document_id, []):
+            self._tombstone(slot)
+        self._invalidate()
+        if self._dead > len(self._slots):
+            self._compact()
+
+    def remove_chunks(self, chunk_ids: list[str]) -> None:
+        for chunk_id in chunk_ids:
+            slot = self._slots.get(chunk_id)
+            if slot is None:
+                continue
+            slots = self._by_document[self._chunks[slot]["document_id"]]
+            slots.remove(slot)
+            if not slots:
+                del self._by_document[self._chunks[slot]["document_id"]]
+            self._tombstone(slot)
+        self._invalidate()
+        if self._dead > len(self._slots):
+            self._compact()
+
+    def update(self, payloads: dict[str, dict]) -> None:
+        """Overwrite stored fields of indexed chunks; text changes need a re-add."""
+        for chunk_id, payload in payloads.items():
+            slot = self._slots.get(chunk_id)
+            if slot is not None:
+                self._chunks[slot].update(payload)
+
+    def _tombstone(self, slot: int) -> None:
+        self._alive[slot] = 0
+        self._total_length -= self._lengths[slot]
+        del self._slots[self._chunks[slot]["chunk_id"]]
+        self._chunks[slot] = None
+        self._dead += 1
+
+    def _invalidate(self) -> None:
+        self._norm = None
+        self._impacts.clear()
+
+    def _impact(self, term: str) -> tuple[np.ndarray, np.ndarray]:
+        """Slots and ``tf * (k1 + 1) / (tf + norm)`` for one term's postings."""
+        cached = self._impacts.get(term)
+        slots = np.frombuffer(self._postings[term][0], dtype=np.uint32)
+        if cached is not None:
+            return slots, cached
+        tf = np.frombuffer(self._postings[term][1], dtype=np.uint16).astype(np.float32)
+        impact = tf * (self.k1 + 1) / (tf + self._norm[slots])
+        if len(slots) >= self.IMPACT_CACHE_MIN_DF:
+            self._impacts[term] = impact
+        return slots, impact
+
+    def finish_loading(self) -> None:
+        self.loaded = True
+        self._removed_while_loading.clear()
+
+    def _allowed_slots(self, filter: RetrieveFilter) -> np.ndarray | None:
+        if not (filter.document_ids or filter.filenames):
+            return None
+        documents = [d for d in filter.document_ids or self._by_document if d in self._by_document]
+        names = set(filter.filenames or ())
+        allowed = []
+        for document_id in documents:
+            # Filenames are per document, so one chunk answers for all of them.
+            if names and self._chunks[self._by_document[document_id][0]]["filename"] not in names:
+                continue
+            allowed.append(self._by_document[document_id])
+        return np.fromiter(itertools.chain.from_iterable(allowed), dtype=np.int64)
+
+    def search(self, query: str, top_k: int, filter: RetrieveFilter | None = None) -> list[dict]:
+        """Top-k chunks by BM25, best first; each result carries its ``score``."""
+        terms = [t for t in dict.fromkeys(tokenize(query)) if t not in _STOPWORDS and t in self._postings]
+        if not terms or not self._slots:
+            return []
+
+        n = len(self._slots)
+        # Terms in over half the corpus score near zero but cost a full scan; drop them
+        # unless nothing else is left.
+        terms = [t for t in terms if len(self._postings[t][0]) * 2 <= n] or terms
+        if self._norm is None:
+            lengths = np.frombuffer(self._lengths, dtype=np.uint32).astype(np.float32)
+            self._norm = self.k1 * (1 - self.b + self.b * lengths / (self._total_length / n))
+
+        scores = np.zeros(len(self._lengths), dtype=np.float32)
+        touched = []
+        for term in terms:
+            slots, impact = self._impact(term)
+            df = len(slots)  # includes tombstoned slots until compaction; close enough
+            idf = np.log1p((max(n - df, 0) + 0.5) / (df + 0.5))
+            scores[slots] += idf * impact
+            touched.append(slots)
+
+        # Rare terms (codes, names) touch few slots; collecting them beats scanning every slot.
+        if sum(len(t) for t in touched) * 8 < len(scores):
+            hits = np.unique(np.concatenate(touched))
+        else:
+            hits = np.flatnonzero(scores)
+        hits = hits[np.frombuffer(self._alive, dtype=np.uint8)[hits] == 1]
+        allowed = self._allowed_slots(filter) if filter else None
+        if allowed is not None:
+            hits = hits[np.isin(hits, allowed)]
+        if len(hits) > top_k:
+            hits = hits[np.argpartition(-scores[hits], top_k - 1)[:top_k]]
+        hits = hits[np.argsort(-scores[hits])]
+        return [{**self._chunks[slot], "score": float(scores[slot])} for slot in hits]
+
+    def _compact(self) -> None:
+        chunks = [c for c in self._chunks if c is not None]
+        removed = self._removed_while_loading
+        loaded = self.loaded
+        self.__init__(self.k1, self.b)
+        self.loaded = loaded
+        self.add(chunks)
+        self._removed_while_loading = removed
+
+    def stats(self) -> dict:
+        return {
+            "chunks": len(self._slots),
+            "terms": len(self._postings),
+            "tombstones": self._dead,
+            "loaded": self.loaded,
+        }
+
+
+# Per-tenant singletons
+_indexes: dict[str, LexicalIndex] = {}
+_loaded = False
+
+
+def get_lexical_index(tenant_id: str = DEFAULT_TENANT) -> LexicalIndex:
+    index = _indexes.get(tenant_id)
+    if index is None:
+        index = _indexes[tenant_id] = LexicalIndex()
+        # A tenant first seen after startup has nothing left to replay.
+        if _loaded:
+            index.finish_loading()
+    return index
+
+
+def finish_loading() -> None:
+    """Mark every tenant's index complete once the startup replay is done."""
+    global _loaded
+    _loaded = True
+    for index in _indexes.values():
+        index.finish_loading()
+
+
+def replace_indexes(indexes: dict[str, LexicalIndex]) -> None:
+    """Swap in freshly built indexes for every tenant; searches never see a partial one."""
+    global _indexes
+    for index in indexes.values():
+        index.finish_loading()
+    _indexes = indexes
+
+
+def lexical_index_loaded() -> bool:
+    return _loaded
+
+
+def lexical_index_stats() -> dict:
+    stats = [index.stats() for index in _indexes.values()]
+    return {
+        "tenants": len(stats),
+        "chunks": sum(s["chunks"] for s in stats),
+        "terms": sum(s["terms"] for s in stats),
+        "tombstones": sum(s["tombstones"] for s in stats),
+        "loaded": _loaded,
+    }
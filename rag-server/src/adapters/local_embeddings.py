@@ -0,0 +1,63 @@
+"""Local embeddings adapter — in-process ONNX model via fastembed, CPU only.
+
+Needs the ``local`` extra (``pip install rag-server[local]``). The model is
+downloaded on first use and cached under ``LOCAL_EMBEDDING_CACHE_DIR``.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import structlog
+
+from ..config import get_settings
+from .embedding_base import BaseEmbeddings
+
+logger = structlog.get_logger()
+
+
+class LocalEmbeddings(BaseEmbeddings):
+    def __init__(self):
+        try:
+            from fastembed import TextEmbedding
+        except ImportError as e:
+            raise RuntimeError(
+                "EMBEDDING_BACKEND=local requires fastembed: pip install 'rag-server[local]'"
+            ) from e
+
+        settings = get_settings()
+        self.model = settings.LOCAL_EMBEDDING_MODEL
+        self.dimensions = TextEmbedding.get_embedding_size(self.model)
+        self.batch_size = settings.LOCAL_EMBEDDING_BATCH_SIZE
+        self._model = TextEmbedding(
+            model_name=self.model,
+            cache_dir=settings.LOCAL_EMBEDDING_CACHE_DIR,
+            threads=settings.LOCAL_EMBEDDING_THREADS or None,
+        )
+        # Separate lanes so a live query never queues behind an ingestion batch.
+        # ONNX Runtime parallelises inside each call, so one thread per lane is enough.
+        self._query_lane = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embed-query")
+        self._document_lane = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embed-docs")
+        logger.info("Loaded local embedding model", model=self.model, dimensions=self.dimensions)
+
+    @property
+    def query_model(self) -> str:
+        # bge-style models prefix queries with an instruction, so the vectors
+        # differ from the passage embedding of the same text.
+        return f"{self.model}#query"
+
+    def _embed_documents_sync(self, texts: list[str]) -> list[list[float]]:
+        return [v.tolist() for v in self._model.embed(texts, batch_size=self.batch_size)]
+
+    def _embed_queries_sync(self, texts: list[str]) -> list[list[float]]:
+        return [v.tolist() for v in self._model.query_embed(texts)]
+
+    async def _embed_documents(self, texts: list[str]) -> list[list[float]]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._document_lane, self._embed_documents_sync, texts)
+
+    async def _embed_queries(self, texts: list[str]) -> list[list[float]]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._query_lane, self._embed_queries_sync, texts)
+
+    async def close(self) -> None:
+        self._query_lane.shutdown(wait=False, cancel_futures=True)
+        self._document_lane.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,650 @@
+"""In-process vector store — the chunk vectors in a memory-mapped float32 matrix,
+searched in the server process instead of over the network.
+
+For small and medium knowledge bases the round trip to Qdrant costs more
+than the similarity math itself. This store keeps, under ``LOCAL_VECTOR_DIR``:
+
+  vectors.f32   normalised vectors, one row per chunk, grown by doubling
+  chunks.log    append-only JSON lines of chunk writes, replayed on open
+  graph.hnsw    an HNSW graph over the rows, once the corpus is large enough
+  graph.json    how many rows the saved graph covers
+
+A restart maps the matrix and replays the log; nothing is re-embedded, and
+only rows added after the graph was last saved are inserted into it.
+Searches are exact (one matrix product per batch) until the store holds
+``LOCAL_VECTOR_GRAPH_MIN_CHUNKS`` chunks; above that they go through the
+graph, over-fetching and post-filtering for tenant and document filters,
+while rows not yet in the graph and narrowly filtered searches are still
+scanned exactly. The graph needs ``hnswlib`` (the ``local-index`` extra);
+without it every search is exact.
+
+Deleted chunks leave dead rows behind, reclaimed when a restart finds more
+dead rows than live ones. The store is per process, like the lexical index:
+run one replica per ``LOCAL_VECTOR_DIR``. Tenants are always partitions of
+the one store; ``TENANT_ISOLATION`` only applies to Qdrant.
+"""
+import asyncio
+import json
+import math
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+import structlog
+
+from ..config import get_settings
+from ..models.document import DEFAULT_TENANT, RetrieveFilter
+from .embeddings import get_embeddings
+from .lexical_index import finish_loading as finish_lexical_loading, get_lexical_index
+from .vector_store import chunk_point_id, content_hash
+
+logger = structlog.get_logger()
+
+_VECTORS_FILE = "vectors.f32"
+_LOG_FILE = "chunks.log"
+_META_FILE = "meta.json"
+_GRAPH_FILE = "graph.hnsw"
+_GRAPH_META_FILE = "graph.json"
+
+_INITIAL_ROWS = 1024
+# Searches reading fewer vector components than this run on the event loop; larger ones in a thread.
+_INLINE_FLOATS = 4_000_000
+# A search its filters narrow to this many rows or fewer is exact, graph or not.
+_EXACT_MAX_ROWS = 20_000
+# Rows inserted into the graph per thread hop, so close() never waits on a whole build.
+_GRAPH_BATCH = 10_000
+# Rows past the graph that are scanned exactly before the graph is extended.
+_GRAPH_TAIL_MAX = 5_000
+
+
+def _import_hnswlib():
+    try:
+        import hnswlib
+    except ImportError:
+        return None
+    return hnswlib
+
+
+def _normalise(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def _top(scores: np.ndarray, rows: np.ndarray, k: int, threshold: float) -> list[tuple[int, float]]:
+    """The best ``k`` (row, score) pairs at or above ``threshold``, best first."""
+    if len(scores) > k:
+        best = np.argpartition(-scores, k - 1)[:k]
+    else:
+        best = np.arange(len(scores))
+    best = best[np.argsort(-scores[best], kind="stable")]
+    return [(int(rows[i]), float(scores[i])) for i in best if scores[i] >= threshold]
+
+
+class LocalVectorStore:
+    """Chunks of every tenant in one memory-mapped matrix, with payloads and
+    the document, filename and content-hash lookups held in memory.
+
+    Open with ``await LocalVectorStore.open()``; the methods match
+    ``QdrantVectorStore``.
+    """
+
+    def __init__(self, path: Path, dimensions: int):
+        settings = get_settings()
+        self.path = path
+        self.dimensions = dimensions
+        self.graph_min_chunks = settings.LOCAL_VECTOR_GRAPH_MIN_CHUNKS
+        self.graph_m = settings.LOCAL_VECTOR_GRAPH_M
+        self.graph_ef_construction = settings.LOCAL_VECTOR_GRAPH_EF_CONSTRUCTION
+        self.graph_ef_search = settings.LOCAL_VECTOR_GRAPH_EF_SEARCH
+        # Bumped on every write. In-process only: a directory has one replica, whereas
+        # QdrantVectorStore shares its version between replicas through Redis.
+        self.corpus_version = 0
+        self._log = None
+        self._mmap: np.memmap | None = None
+        self._hnswlib = _import_hnswlib()
+        self._graph = None
+        self._graph_task: asyncio.Task | None = None
+        # Held around graph queries and resizes; inserts run alongside queries.
+        self._graph_lock = threading.Lock()
+        self._closing = False
+        self._reset()
+
+    def _reset(self) -> None:
+        self._vectors = np.zeros((0, self.dimensions), np.float32)
+        self._alive = np.zeros(0, bool)
+        self._tenant_of = np.zeros(0, np.int32)
+        self._ids: list[str | None] = []
+        self._payloads: list[dict | None] = []
+        self._rows: dict[str, int] = {}
+        self._tenant_codes: dict[str, int] = {}
+        self._tenant_counts: dict[str, int] = {}
+        self._document_rows: dict[tuple[str, str], set[int]] = {}
+        self._filename_rows: dict[tuple[str, str], set[int]] = {}
+        self._hash_rows: dict[tuple[str, str], set[int]] = {}
+        self._dead = 0
+        # Rows [0, _graph_rows) are in the graph; _graph_saved_rows of them are on disk.
+        self._graph_rows = 0
+        self._graph_saved_rows = 0
+
+    @classmethod
+    async def open(cls, path: Path | None = None, dimensions: int | None = None) -> "LocalVectorStore":
+        """Open (or create) the store; defaults to ``LOCAL_VECTOR_DIR`` and the embedding backend's size."""
+        store = cls(
+            path or Path(get_settings().LOCAL_VECTOR_DIR),
+            dimensions or get_embeddings().dimensions,
+        )
+        await asyncio.to_thread(store._load)
+        store._maybe_extend_graph()
+        return store
+
+    # --- files ------------------------------------------------------------
+
+    def _load(self) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        meta_path = self.path / _META_FILE
+        if meta_path.exists():
+            stored = json.loads(meta_path.read_text())["dimensions"]
+            if stored != self.dimensions:
+                raise RuntimeError(
+                    f"Local vector store at {self.path} holds {stored}-dimensional vectors but the "
+                    f"embedding backend produces {self.dimensions}; point LOCAL_VECTOR_DIR elsewhere "
+                    "or delete it and re-ingest"
+                )
+        else:
+            meta_path.write_text(json.dumps({"dimensions": self.dimensions}))
+
+        vectors_path = self.path / _VECTORS_FILE
+        stored_rows = vectors_path.stat().st_size // (4 * self.dimensions) if vectors_path.exists() else 0
+        self._map_vectors(max(_INITIAL_ROWS, stored_rows))
+        self._replay()
+
+        live = len(self._rows)
+        if self._dead > live:
+            logger.info("Compacting local vector store", live=live, dead=self._dead)
+            self._compact()
+            self._reset()
+            self._map_vectors(max(_INITIAL_ROWS, live))
+            self._replay()
+
+        self._load_graph()
+        self._log = open(self.path / _LOG_FILE, "a", encoding="utf-8")
+        logger.info(
+            "Local vector store opened", path=str(self.path), chunks=live,
+            graph_rows=self._graph_rows, dimensions=self.dimensions,
+        )
+
+    def _map_vectors(self, rows: int) -> None:
+        """Map the vector file with room for ``rows`` rows, growing the file if needed."""
+        path = self.path / _VECTORS_FILE
+        nbytes = rows * self.dimensions * 4
+        if not path.exists() or path.stat().st_size < nbytes:
+            with open(path, "ab") as f:
+                f.truncate(nbytes)
+        if self._mmap is not None:
+            self._mmap.flush()
+        # The old mapping stays valid for anything still reading it (a graph insert in flight).
+        self._mmap = np.memmap(path, dtype=np.float32, mode="r+", shape=(rows, self.dimensions))
+        self._vectors = np.asarray(self._mmap)
+        for name in ("_alive", "_tenant_of"):
+            old = getattr(self, name)
+            grown = np.zeros(rows, old.dtype)
+            grown[:len(old)] = old
+            setattr(self, name, grown)
+
+    def _reserve(self, count: int) -> list[int]:
+        """Rows for ``count`` new chunks, growing the matrix if it is full."""
+        start = len(self._ids)
+        if start + count > len(self._vectors):
+            self._map_vectors(max(2 * len(self._vectors), start + count))
+        self._ids.extend([None] * count)
+        self._payloads.extend([None] * count)
+        return list(range(start, start + count))
+
+    def _replay(self) -> None:
+        path = self.path / _LOG_FILE
+        if not path.exists():
+            return
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A write torn by a crash; everything before it is intact.
+                    logger.warning("Ignoring truncated local vector store log entry", path=str(path))
+                    break
+                self._apply(entry)
+
+    def _apply(self, entry: dict) -> None:
+        op = entry["op"]
+        if op == "put":
+            row = entry["row"]
+            if row >= len(self._ids):
+                self._ids.extend([None] * (row + 1 - len(self._ids)))
+                self._payloads.extend([None] * (row + 1 - len(self._payloads)))
+            self._put(row, entry["id"], entry["p"])
+        elif op == "set":
+            self._set(entry["row"], entry["p"])
+        elif op == "del":
+            for row in entry["rows"]:
+                self._remove(row)
+
+    def _append(self, entries: list[dict]) -> None:
+        self._log.write("".join(json.dumps(e, separators=(",", ":")) + "\n" for e in entries))
+        self._log.flush()
+
+    def _compact(self) -> None:
+        """Rewrite the vector file and log with live rows only; the graph, keyed by row, is dropped."""
+        live = sorted(self._rows.values())
+        vectors_tmp = self.path / (_VECTORS_FILE + ".tmp")
+        log_tmp = self.path / (_LOG_FILE + ".tmp")
+        with open(vectors_tmp, "wb") as vf, open(log_tmp, "w", encoding="utf-8") as lf:
+            for new_row, row in enumerate(live):
+                vf.write(self._vectors[row].tobytes())
+                lf.write(json.dumps(
+                    {"op": "put", "row": new_row, "id": self._ids[row], "p": self._payloads[row]},
+                    separators=(",", ":"),
+                ) + "\n")
+        self._mmap = None
+        os.replace(vectors_tmp, self.path / _VECTORS_FILE)
+        os.replace(log_tmp, self.path / _LOG_FILE)
+        for name in (_GRAPH_FILE, _GRAPH_META_FILE):
+            (self.path / name).unlink(missing_ok=True)
+
+    # --- in-memory indexes ------------------------------------------------
+
+    def _put(self, row: int, point_id: str, payload: dict) -> None:
+        if self._payloads[row] is not None:
+            self._unindex(row)
+        self._ids[row] = point_id
+        self._rows[point_id] = row
+        self._payloads[row] = payload
+        self._index(row)
+
+    def _set(self, row: int, fields: dict) -> None:
+        self._unindex(row)
+        self._payloads[row] = {**self._payloads[row], **fields}
+        self._index(row)
+
+    def _remove(self, row: int) -> None:
+        self._unindex(row)
+        del self._rows[self._ids[row]]
+        self._ids[row] = None
+        self._payloads[row] = None
+        self._dead += 1
+
+    def _index(self, row: int) -> None:
+        payload = self._payloads[row]
+        tenant = payload["tenant_id"]
+        code = self._tenant_codes.setdefault(tenant, len(self._tenant_codes))
+        self._tenant_of[row] = code
+        self._alive[row] = True
+        self._tenant_counts[tenant] = self._tenant_counts.get(tenant, 0) + 1
+        self._document_rows.setdefault((tenant, payload["document_id"]), set()).add(row)
+        self._filename_rows.setdefault((tenant, payload["filename"]), set()).add(row)
+        self._hash_rows.setdefault((tenant, payload["content_hash"]), set()).add(row)
+
+    def _unindex(self, row: int) -> None:
+        payload = self._payloads[row]
+        tenant = payload["tenant_id"]
+        self._alive[row] = False
+        self._tenant_counts[tenant] -= 1
+        for lookup, key in (
+            (self._document_rows, payload["document_id"]),
+            (self._filename_rows, payload["filename"]),
+            (self._hash_rows, payload["content_hash"]),
+        ):
+            rows = lookup[(tenant, key)]
+            rows.discard(row)
+            if not rows:
+                del lookup[(tenant, key)]
+
+    def _tenant_rows(self, tenant_id: str, lookup: dict, keys) -> set[int]:
+        rows: set[int] = set()
+        for key in keys:
+            rows |= lookup.get((tenant_id, key), set())
+        return rows
+
+    # --- graph --------------------------------------------------------------
+
+    def _load_graph(self) -> None:
+        meta_path = self.path / _GRAPH_META_FILE
+        if self._hnswlib is None or not meta_path.exists():
+            return
+        rows = json.loads(meta_path.read_text())["rows"]
+        if rows > len(self._ids):
+            logger.warning("Ignoring local vector graph newer than the store", path=str(self.path))
+            return
+        graph = self._hnswlib.Index(space="ip", dim=self.dimensions)
+        graph.load_index(str(self.path / _GRAPH_FILE), max_elements=len(self._vectors))
+        graph.set_ef(self.graph_ef_search)
+        self._graph = graph
+        self._graph_rows = self._graph_saved_rows = rows
+
+    def _maybe_extend_graph(self) -> None:
+        """Start building (or extending) the graph in the background when it is due."""
+        if self._closing or (self._graph_task is not None and not self._graph_task.done()):
+            return
+        if self._graph is None:
+            if len(self._rows) < self.graph_min_chunks:
+                return
+            if self._hnswlib is None:
+                logger.warning(
+                    "hnswlib is not installed; the local vector store stays exact",
+                    chunks=len(self._rows),
+                )
+                self.graph_min_chunks = math.inf
+                return
+        elif len(self._ids) - self._graph_rows < _GRAPH_TAIL_MAX:
+            return
+        self._graph_task = asyncio.create_task(self._extend_graph())
+
+    async def _extend_graph(self) -> None:
+        graph = self._graph
+        if graph is None:
+            graph = self._hnswlib.Index(space="ip", dim=self.dimensions)
+            graph.init_index(
+                max_elements=len(self._vectors), M=self.graph_m, ef_construction=self.graph_ef_construction,
+            )
+            graph.set_ef(self.graph_ef_search)
+            logger.info("Building local vector graph", chunks=len(self._rows))
+        start = self._graph_rows if graph is self._graph else 0
+        try:
+            while start < len(self._ids) and not self._closing:
+                stop = min(len(self._ids), start + _GRAPH_BATCH)
+                if graph.get_max_elements() < stop:
+                    with self._graph_lock:
+                        graph.resize_index(len(self._vectors))
+                # Dead rows are inserted too: labels are rows, and searches skip dead ones.
+                await asyncio.to_thread(graph.add_items, self._vectors[start:stop], np.arange(start, stop))
+                start = stop
+                if graph is self._graph:
+                    self._graph_rows = start
+            if self._graph is None and start == len(self._ids):
+                self._graph, self._graph_rows = graph, start
+                await asyncio.to_thread(self._save_graph)
+                logger.info("Local vector graph built", rows=start)
+        except Exception:
+            logger.exception("Local vector graph build failed; searches stay exact")
+
+    def _save_graph(self) -> None:
+        rows = self._graph_rows
+        graph_tmp = self.path / (_GRAPH_FILE + ".tmp")
+        self._graph.save_index(str(graph_tmp))
+        os.replace(graph_tmp, self.path / _GRAPH_FILE)
+        (self.path / _GRAPH_META_FILE).write_text(json.dumps({"rows": rows}))
+        self._graph_saved_rows = rows
+
+    # --- writes -------------------------------------------------------------
+
+    async def upsert_chunks(
+        self,
+        texts: list[str],
+        embeddings: list[list[float]],
+        document_id: str,
+        filename: str,
+        start_index: int = 0,
+        tenant_id: str = DEFAULT_TENANT,
+        chunk_indexes: list[int] | None = None,
+    ) -> int:
+        """Store text chunks with their embeddings under ``chunk_point_id`` ids.
+
+        ``chunk_index`` runs from ``start_index`` unless ``chunk_indexes`` gives
+        each chunk's position explicitly. Re-upserting a chunk overwrites it.
+        """
+        if not texts:
+            return 0
+        if chunk_indexes is None:
+            chunk_indexes = range(start_index, start_index + len(texts))
+        vectors = _normalise(np.asarray(embeddings, dtype=np.float32))
+        ids = [chunk_point_id(document_id, text) for text in texts]
+        new = self._reserve(sum(1 for point_id in dict.fromkeys(ids) if point_id not in self._rows))
+        entries, chunks = [], []
+        for i, point_id, text, vector in zip(chunk_indexes, ids, texts, vectors):
+            # An existing chunk keeps its row: its id comes from its text, so its vector is unchanged.
+            row = self._rows.get(point_id)
+            if row is None:
+                row = new.pop(0)
+                self._vectors[row] = vector
+            payload = {
+                "text": text,
+                "document_id": document_id,
+                "filename": filename,
+                "chunk_index": i,
+                "tenant_id": tenant_id,
+                "content_hash": content_hash(text),
+            }
+            self._put(row, point_id, payload)
+            entries.append({"op": "put", "row": row, "id": point_id, "p": payload})
+            chunks.append({"chunk_id": point_id, **{k: v for k, v in payload.items() if k != "content_hash"}})
+        # Vectors reach the page cache before the log entry that makes them visible on replay.
+        self._append(entries)
+        get_lexical_index(tenant_id).add(chunks)
+        self.corpus_version += 1
+        self._maybe_extend_graph()
+        logger.info("Upserted chunks", document_id=document_id, tenant_id=tenant_id, count=len(entries))
+        return len(entries)
+
+    async def document_chunks(self, document_id: str, tenant_id: str = DEFAULT_TENANT) -> dict[str, dict]:
+        """Point id -> ``chunk_index`` and ``filename`` for every stored chunk of a document."""
+        return {
+            self._ids[row]: {
+                "chunk_index": self._payloads[row]["chunk_index"],
+                "filename": self._payloads[row]["filename"],
+            }
+            for row in self._document_rows.get((tenant_id, document_id), ())
+        }
+
+    async def vectors_by_content(self, hashes: list[str], tenant_id: str = DEFAULT_TENANT) -> dict[str, list[float]]:
+        """Stored vectors of any of the tenant's chunks whose text hashes to one of ``hashes``."""
+        found = {}
+        for h in hashes:
+            rows = self._hash_rows.get((tenant_id, h))
+            if rows:
+                found[h] = self._vectors[next(iter(rows))].tolist()
+        return found
+
+    async def update_chunks(self, payloads: dict[str, dict], tenant_id: str = DEFAULT_TENANT) -> None:
+        """Overwrite payload fields (``chunk_index``, ``filename``) of stored chunks."""
+        entries = []
+        for point_id, fields in payloads.items():
+            row = self._rows.get(point_id)
+            if row is not None:
+                self._set(row, fields)
+                entries.append({"op": "set", "row": row, "p": fields})
+        if not entries:
+            return
+        self._append(entries)
+        get_lexical_index(tenant_id).update(payloads)
+        self.corpus_version += 1
+
+    async def delete_chunks(self, chunk_ids: list[str], tenant_id: str = DEFAULT_TENANT) -> None:
+        if not chunk_ids:
+            return
+        rows = [
+            row for row in (self._rows.get(point_id) for point_id in chunk_ids)
+            if row is not None and self._payloads[row]["tenant_id"] == tenant_id
+        ]
+        self._delete_rows(rows)
+        get_lexical_index(tenant_id).remove_chunks(chunk_ids)
+        self.corpus_version += 1
+        logger.info("Deleted chunks", tenant_id=tenant_id, count=len(chunk_ids))
+
+    async def delete_by_document(self, document_id: str, tenant_id: str = DEFAULT_TENANT) -> None:
+        """Delete all chunks belonging to a document."""
+        self._delete_rows(list(self._document_rows.get((tenant_id, document_id), ())))
+        get_lexical_index(tenant_id).remove_document(document_id)
+        self.corpus_version += 1
+        logger.info("Deleted chunks for document", document_id=document_id, tenant_id=tenant_id)
+
+    def _delete_rows(self, rows: list[int]) -> None:
+        if not rows:
+            return
+        for row in rows:
+            self._remove(row)
+        self._append([{"op": "del", "rows": rows}])
+
+    # --- reads --------------------------------------------------------------
+
+    async def search(
+        self,
+        query_vector: list[float],
+        top_k: int = 5,
+        score_threshold: float = 0.3,
+        filter: RetrieveFilter | None = None,
+        tenant_id: str = DEFAULT_TENANT,
+    ) -> list[dict]:
+        """Search for similar chunks."""
+        return (await self.search_batch([query_vector], [top_k], score_threshold, [filter], [tenant_id]))[0]
+
+    async def search_batch(
+        self,
+        query_vectors: list[list[float]],
+        top_ks: list[int],
+        score_threshold: float = 0.3,
+        filters: list[RetrieveFilter | None] | None = None,
+        tenant_ids: list[str] | None = None,
+    ) -> list[list[dict]]:
+        """Run several searches; exact ones share one pass over the matrix. Results are in input order."""
+        if not query_vectors:
+            return []
+        filters = filters or [None] * len(query_vectors)
+        tenant_ids = tenant_ids or [DEFAULT_TENANT] * len(query_vectors)
+        queries = _normalise(np.asarray(query_vectors, dtype=np.float32))
+        plans = [self._plan(f, t) for f, t in zip(filters, tenant_ids)]
+
+        scanned = sum(
+            len(self._ids) - self._graph_rows if use_graph else len(rows) if rows is not None else len(self._ids)
+            for rows, _, use_graph in plans
+        )
+        args = (queries, top_ks, score_threshold, plans)
+        if scanned * self.dimensions <= _INLINE_FLOATS:
+            hits = self._search(*args)
+        else:
+            hits = await asyncio.to_thread(self._search, *args)
+        return [[chunk for chunk in map(self._to_chunk, found) if chunk is not None] for found in hits]
+
+    def _plan(self, filter: RetrieveFilter | None, tenant_id: str):
+        """(candidate rows or None for every row, allowed-row mask, whether to use the graph)."""
+        size = len(self._ids)
+        if filter is not None and (filter.document_ids or filter.filenames):
+            rows = None
+            for lookup, keys in (
+                (self._document_rows, filter.document_ids),
+                (self._filename_rows, filter.filenames),
+            ):
+                if keys:
+                    matched = self._tenant_rows(tenant_id, lookup, keys)
+                    rows = matched if rows is None else rows & matched
+            rows = np.fromiter(sorted(rows), np.int64, len(rows))
+            return rows, None, False
+
+        count = self._tenant_counts.get(tenant_id, 0)
+        if count == 0:
+            return np.zeros(0, np.int64), None, False
+        if len(self._tenant_codes) == 1:
+            mask = self._alive[:size]
+        else:
+            mask = self._alive[:size] & (self._tenant_of[:size] == self._tenant_codes[tenant_id])
+        if self._graph is None or count <= _EXACT_MAX_ROWS:
+            rows = np.flatnonzero(mask) if count < size // 2 else None
+            return rows, mask, False
+        return None, mask, True
+
+    def _search(self, queries: np.ndarray, top_ks: list[int], threshold: float, plans: list) -> list[list]:
+        size = len(self._ids)
+        results: list[list[tuple[int, float]]] = [[] for _ in top_ks]
+        full_scan = [i for i, (rows, _, use_graph) in enumerate(plans) if rows is None and not use_graph]
+        if full_scan:
+            # One pass over the matrix for every unfiltered exact search in the batch.
+            scores = self._vectors[:size] @ queries[full_scan].T
+            everything = np.arange(size)
+            for column, i in enumerate(full_scan):
+                s = np.where(plans[i][1], scores[:, column], -np.inf)
+                results[i] = _top(s, everything, top_ks[i], threshold)
+
+        for i, (rows, mask, use_graph) in enumerate(plans):
+            if use_graph:
+                results[i] = self._graph_search(queries[i], top_ks[i], threshold, mask)
+            elif rows is not None and len(rows):
+                results[i] = _top(self._vectors[rows] @ queries[i], rows, top_ks[i], threshold)
+        return results
+
+    def _graph_search(self, query: np.ndarray, k: int, threshold: float, mask: np.ndarray) -> list:
+        # The mask was taken when the search was planned; the graph may have grown since.
+        graph_rows = min(self._graph_rows, len(mask))
+        allowed = int(mask[:graph_rows].sum())
+        # Over-fetch in proportion to how much of the graph the filter excludes.
+        fetch = min(graph_rows, k * max(2, math.ceil(2 * graph_rows / max(allowed, 1))))
+        try:
+            with self._graph_lock:
+                labels, distances = self._graph.knn_query(query, k=fetch)
+            labels, scores = labels[0].astype(np.int64), 1 - distances[0]
+            keep = labels < graph_rows
+            labels, scores = labels[keep], scores[keep]
+            keep = mask[labels]
+            labels, scores = labels[keep], scores[keep]
+        except RuntimeError:
+            labels = None
+        if labels is None or (len(labels) < k and fetch < graph_rows):
+            # Too few allowed rows among the neighbours found: scan exactly.
+            rows = np.flatnonzero(mask)
+            return _top(self._vectors[rows] @ query, rows, k, threshold)
+
+        # Rows added since the graph was last extended.
+        tail = np.arange(graph_rows, len(mask))[mask[graph_rows:]]
+        if len(tail):
+            labels = np.concatenate([labels, tail])
+            scores = np.concatenate([scores, self._vectors[tail] @ query])
+        return _top(scores, labels, k, threshold)
+
+    def _to_chunk(self, hit: tuple[int, float]) -> dict | None:
+        row, score = hit
+        payload = self._payloads[row]
+        if payload is None:
+            # Deleted while the search ran in a thread.
+            return None
+        return {
+            "chunk_id": self._ids[row],
+            "text": payload.get("text", ""),
+            "document_id": payload.get("document_id", ""),
+            "filename": payload.get("filename", ""),
+            "chunk_index": payload.get("chunk_index", 0),
+            "score": score,
+        }
+
+    async def count_chunks(self, tenant_id: str = DEFAULT_TENANT) -> int:
+        return self._tenant_counts.get(tenant_id, 0)
+
+    async def current_corpus_version(self) -> int:
+        # One replica per directory, so every write went through this process.
+        return self.corpus_version
+
+    async def load_lexical_index(self) -> None:
+        """Rebuild the in-process BM25 indexes from the stored payloads."""
+        by_tenant: dict[str, list[dict]] = {}
+        for point_id, row in self._rows.items():
+            payload = self._payloads[row]
+            by_tenant.setdefault(payload["tenant_id"], []).append({
+                "chunk_id": point_id, **{k: v for k, v in payload.items() if k != "content_hash"},
+            })
+        for tenant, chunks in by_tenant.items():
+            get_lexical_index(tenant).add(chunks)
+        finish_lexical_loading()
+        logger.info("Lexical index loaded", chunks=len(self._rows), tenants=len(by_tenant))
+
+    async def ping(self) -> None:
+        if self._log is None or self._log.closed:
+            raise RuntimeError("local vector store is closed")
+
+    async def close(self) -> None:
+        self._closing = True
+        if self._graph_task is not None:
+            # At most one batch of inserts is still running.
+            await self._graph_task
+        if self._graph is not None and self._graph_rows > self._graph_saved_rows:
+            await asyncio.to_thread(self._save_graph)
+        if self._mmap is not None:
+            self._mmap.flush()
+        if self._log is not None:
+            self._log.close()
@@ -1,56 +1,87 @@
 """OpenAI embeddings adapter — wraps embedding API calls."""
+import httpx
 import structlog
-from openai import OpenAI
+from openai import (
+    AsyncOpenAI,
+    APIConnectionError,
+    APIStatusError,
+    RateLimitError,
+    InternalServerError,
+)
 from ..config import get_settings
+from .embedding_base import BaseEmbeddings
+from .embedding_scheduler import EmbeddingScheduler, RateLimiter, RetryableEmbeddingError
 
 logger = structlog.get_logger()
 
 
-class OpenAIEmbeddings:
+class OpenAIEmbeddings(BaseEmbeddings):
     def __init__(self):
         settings = get_settings()
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        # One pooled HTTP client shared by every request, so concurrent
+        # /retrieve calls reuse warm keep-alive connections to the API.
+        self._http = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.EMBEDDING_POOL_SIZE,
+                max_keepalive_connections=settings.EMBEDDING_POOL_SIZE,
+            ),
+            timeout=httpx.Timeout(30.0, connect=5.0),
+        )
+        # Retries are owned by the scheduler, which knows about the rate budget.
+        self.client = AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            base_url=settings.OPENAI_BASE_URL,
+            http_client=self._http,
+            max_retries=0,
+        )
         self.model = settings.EMBEDDING_MODEL
         self.dimensions = settings.EMBEDDING_DIMENSIONS
+        self.scheduler = EmbeddingScheduler(
+            self._request,
+            batch_tokens=settings.EMBEDDING_BATCH_TOKENS,
+            batch_max_items=settings.EMBEDDING_BATCH_MAX_ITEMS,
+            max_in_flight=settings.EMBEDDING_MAX_IN_FLIGHT,
+            rate_limiter=RateLimiter(rpm=settings.EMBEDDING_RPM, tpm=settings.EMBEDDING_TPM),
+            max_retries=settings.EMBEDDING_MAX_RETRIES,
+            query_max_in_flight=settings.EMBEDDING_QUERY_MAX_IN_FLIGHT,
+        )
 
-    def embed_texts(self, texts: list[str]) -> list[list[float]]:
-        """Embed a batch of texts. Returns list of embedding vectors."""
-        if not texts:
-            return []
+    async def _embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return await self.scheduler.embed(texts)
 
-        # Batch in groups of 100 (OpenAI limit is 2048 but 100 is safer)
-        all_embeddings = []
-        batch_size = 100
+    async def _embed_queries(self, texts: list[str]) -> list[list[float]]:
+        # Its own lane, so a live query never queues behind an ingestion batch.
+        return await self.scheduler.embed(texts, priority=True)
 
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i : i + batch_size]
-            response = self.client.embeddings.create(
+    async def _request(self, batch: list[str]) -> list[list[float]]:
+        """Send one embeddings request, classifying transient failures for retry."""
+        try:
+            response = await self.client.embeddings.create(
                 model=self.model,
                 input=batch,
                 dimensions=self.dimensions,
             )
-            batch_embeddings = [item.embedding for item in response.data]
-            all_embeddings.extend(batch_embeddings)
-            logger.info("Embedded batch", batch_num=i // batch_size + 1, count=len(batch))
-
-        return all_embeddings
-
-    def embed_query(self, query: str) -> list[float]:
-        """Embed a single query string."""
-        response = self.client.embeddings.create(
-            model=self.model,
-            input=[query],
-            dimensions=self.dimensions,
-        )
-        return response.data[0].embedding
+        except (RateLimitError, InternalServerError) as e:
+            raise RetryableEmbeddingError(str(e), _retry_after(e)) from e
+        except APIConnectionError as e:
+            # Includes APITimeoutError
+            raise RetryableEmbeddingError(str(e)) from e
+
+        logger.info("Embedded batch", count=len(batch))
+        return [item.embedding for item in response.data]
 
+    async def ping(self) -> None:
+        # Opens a pooled TLS connection without spending tokens.
+        await self.client.models.retrieve(self.model)
 
-# Singleton
-_embeddings: OpenAIEmbeddings | None = None
+    async def close(self) -> None:
+        await self.client.close()
+        await self._http.aclose()
 
 
-def get_embeddings() -> OpenAIEmbeddings:
-    global _embeddings
-    if _embeddings is None:
-        _embeddings = OpenAIEmbeddings()
-    return _embeddings
+def _retry_after(error: APIStatusError) -> float | None:
+    value = error.response.headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
@@ -1,120 +1,496 @@
 """Qdrant vector store adapter — abstracts vector DB operations."""
-import uuid
+import asyncio
+import time
+
+import httpx
 import structlog
-from qdrant_client import QdrantClient
+from qdrant_client import AsyncQdrantClient
 from qdrant_client.models import (
-    Distance,
-    VectorParams,
+    KeywordIndexParams,
+    KeywordIndexType,
+    PayloadSchemaType,
+    PointIdsList,
     PointStruct,
     Filter,
     FieldCondition,
+    IsEmptyCondition,
+    MatchAny,
     MatchValue,
+    PayloadField,
+    QueryRequest,
+    SetPayload,
+    SetPayloadOperation,
 )
 from ..config import get_settings
+from ..models.document import DEFAULT_TENANT, RetrieveFilter
+from .embeddings import get_embeddings
+from .lexical_index import (
+    LexicalIndex,
+    finish_loading as finish_lexical_loading,
+    get_lexical_index,
+    lexical_index_loaded,
+    replace_indexes as replace_lexical_indexes,
+)
+from .redis_store import bump_corpus_version, get_corpus_version
+from .storage_profiles import (
+    get_storage_profile,
+    profile_of,
+    quantization_config,
+    search_params,
+    vectors_config,
+)
+from .vector_store import chunk_point_id, content_hash
 
 logger = structlog.get_logger()
 
+# Payload fields that searches and deletes filter on. The tenant index tells
+# Qdrant to co-locate each tenant's points, so a tenant-scoped search only
+# touches that tenant's segment data.
+PAYLOAD_INDEXES = {
+    "document_id": PayloadSchemaType.KEYWORD,
+    "filename": PayloadSchemaType.KEYWORD,
+    "content_hash": PayloadSchemaType.KEYWORD,
+    "tenant_id": KeywordIndexParams(type=KeywordIndexType.KEYWORD, is_tenant=True),
+}
+
+TENANT_COLLECTION_SEPARATOR = "__"
+
 
 class QdrantVectorStore:
+    """Chunks of every tenant, either in one collection partitioned on ``tenant_id``
+    or, with ``TENANT_ISOLATION=collection``, one collection per tenant.
+
+    The default tenant always lives in ``QDRANT_COLLECTION``; other tenants'
+    collections are named ``{QDRANT_COLLECTION}__{tenant}`` and created on
+    their first write.
+    """
+
     def __init__(self):
         settings = get_settings()
-        self.client = QdrantClient(url=settings.QDRANT_URL)
+        # Explicit limits keep a warm keep-alive pool; qdrant-client disables
+        # keep-alive for localhost URLs by default.
+        self.client = AsyncQdrantClient(
+            url=settings.QDRANT_URL,
+            limits=httpx.Limits(
+                max_connections=settings.QDRANT_POOL_SIZE,
+                max_keepalive_connections=settings.QDRANT_POOL_SIZE,
+            ),
+        )
         self.collection_name = settings.QDRANT_COLLECTION
-        self.dimensions = settings.EMBEDDING_DIMENSIONS
-        self._ensure_collection()
-
-    def _ensure_collection(self):
-        """Create collection if it doesn't exist."""
-        collections = self.client.get_collections().collections
-        exists = any(c.name == self.collection_name for c in collections)
-
-        if not exists:
-            self.client.create_collection(
-                collection_name=self.collection_name,
-                vectors_config=VectorParams(
-                    size=self.dimensions,
-                    distance=Distance.COSINE,
-                ),
+        if settings.TENANT_ISOLATION not in ("payload", "collection"):
+            raise ValueError(f"Unknown TENANT_ISOLATION {settings.TENANT_ISOLATION!r}; use 'payload' or 'collection'")
+        self.collection_per_tenant = settings.TENANT_ISOLATION == "collection"
+        # Sized to whichever embedding backend is configured.
+        self.dimensions = get_embeddings().dimensions
+        self.profile = get_storage_profile(settings.QDRANT_STORAGE_PROFILE)
+        self.search_params = search_params(self.profile, settings.QDRANT_OVERSAMPLING)
+        # Bumped in Redis on every write, by any replica, so caches keyed on corpus
+        # state can invalidate; this is the last value seen.
+        self.corpus_version = 0
+        # The corpus version the in-process BM25 indexes reflect.
+        self._lexical_version: int | None = None
+        self._lexical_refresh: asyncio.Task | None = None
+        self._lexical_refreshed = 0.0
+        self._ready: set[str] = set()
+        self._create_lock = asyncio.Lock()
+
+    def collection_for(self, tenant_id: str) -> str:
+        if self.collection_per_tenant and tenant_id != DEFAULT_TENANT:
+            return f"{self.collection_name}{TENANT_COLLECTION_SEPARATOR}{tenant_id}"
+        return self.collection_name
+
+    async def _writable(self, tenant_id: str) -> str:
+        name = self.collection_for(tenant_id)
+        if name not in self._ready:
+            async with self._create_lock:
+                if name not in self._ready:
+                    await self._ensure_collection(name)
+        return name
+
+    async def _readable(self, tenant_id: str) -> str | None:
+        """The tenant's collection, or ``None`` if nothing was ever written for it."""
+        name = self.collection_for(tenant_id)
+        if name not in self._ready:
+            # Another replica may have created it since we last looked.
+            if not await self.client.collection_exists(name):
+                return None
+            self._ready.add(name)
+        return name
+
+    def _tenant_filter(self, filter: RetrieveFilter | None, tenant_id: str) -> Filter | None:
+        return _to_qdrant_filter(filter, None if self.collection_per_tenant else tenant_id)
+
+    async def _ensure_collection(self, name: str | None = None):
+        """Create collection if it doesn't exist; refuse one sized for another backend."""
+        name = name or self.collection_name
+        if await self.client.collection_exists(name):
+            info = await self.client.get_collection(name)
+            size = info.config.params.vectors.size
+            if size != self.dimensions:
+                raise RuntimeError(
+                    f"Qdrant collection {name!r} holds {size}-d vectors but the "
+                    f"embedding backend produces {self.dimensions}-d; run `python -m src.migrate_storage` "
+                    f"to truncate them, or re-ingest into a new QDRANT_COLLECTION"
+                )
+            current = profile_of(info)
+            if current != self.profile.name:
+                logger.warning(
+                    "Qdrant collection uses a different storage profile; run `python -m src.migrate_storage`",
+                    name=name,
+                    current=current,
+                    configured=self.profile.name,
+                )
+        else:
+            await self.client.create_collection(
+                collection_name=name,
+                vectors_config=vectors_config(self.dimensions, self.profile),
+                quantization_config=quantization_config(self.profile),
             )
-            logger.info("Created Qdrant collection", name=self.collection_name)
+            logger.info("Created Qdrant collection", name=name, profile=self.profile.name)
+        await self._ensure_payload_indexes(name)
+        self._ready.add(name)
+
+    async def _ensure_payload_indexes(self, name: str) -> None:
+        """Index the filtered payload fields; collections from older versions gain them here."""
+        existing = (await self.client.get_collection(name)).payload_schema or {}
+        for field, schema in PAYLOAD_INDEXES.items():
+            if field not in existing:
+                await self.client.create_payload_index(
+                    collection_name=name,
+                    field_name=field,
+                    field_schema=schema,
+                )
+                logger.info("Created payload index", name=name, field=field)
 
-    def upsert_chunks(
+    async def upsert_chunks(
         self,
         texts: list[str],
         embeddings: list[list[float]],
         document_id: str,
         filename: str,
+        start_index: int = 0,
+        tenant_id: str = DEFAULT_TENANT,
+        chunk_indexes: list[int] | None = None,
     ) -> int:
-        """Store text chunks with their embeddings."""
+        """Store text chunks with their embeddings under ``chunk_point_id`` ids.
+
+        ``chunk_index`` runs from ``start_index`` unless ``chunk_indexes`` gives
+        each chunk's position explicitly. Re-upserting a chunk overwrites it.
+        """
+        if chunk_indexes is None:
+            chunk_indexes = range(start_index, start_index + len(texts))
         points = [
             PointStruct(
-                id=str(uuid.uuid4()),
+                id=chunk_point_id(document_id, text),
                 vector=embedding,
                 payload={
                     "text": text,
                     "document_id": document_id,
                     "filename": filename,
                     "chunk_index": i,
+                    "tenant_id": tenant_id,
+                    "content_hash": content_hash(text),
                 },
             )
-            for i, (text, embedding) in enumerate(zip(texts, embeddings))
+            for i, text, embedding in zip(chunk_indexes, texts, embeddings)
         ]
 
-        self.client.upsert(
-            collection_name=self.collection_name,
+        await self.client.upsert(
+            collection_name=await self._writable(tenant_id),
             points=points,
         )
-        logger.info("Upserted chunks", document_id=document_id, count=len(points))
+        get_lexical_index(tenant_id).add([
+            {"chunk_id": p.id, **{k: v for k, v in p.payload.items() if k != "content_hash"}}
+            for p in points
+        ])
+        await self._wrote()
+        logger.info("Upserted chunks", document_id=document_id, tenant_id=tenant_id, count=len(points))
         return len(points)
 
-    def search(
+    async def document_chunks(self, document_id: str, tenant_id: str = DEFAULT_TENANT) -> dict[str, dict]:
+        """Point id -> ``chunk_index`` and ``filename`` for every stored chunk of a document."""
+        collection = await self._readable(tenant_id)
+        if collection is None:
+            return {}
+        chunks, offset = {}, None
+        while True:
+            records, offset = await self.client.scroll(
+                collection_name=collection,
+                scroll_filter=Filter(must=[FieldCondition(key="document_id", match=MatchValue(value=document_id))]),
+                limit=1024,
+                offset=offset,
+                with_payload=["chunk_index", "filename"],
+                with_vectors=False,
+            )
+            chunks.update((str(r.id), r.payload) for r in records)
+            if offset is None:
+                return chunks
+
+    async def vectors_by_content(self, hashes: list[str], tenant_id: str = DEFAULT_TENANT) -> dict[str, list[float]]:
+        """Stored vectors of any of the tenant's chunks whose text hashes to one of ``hashes``."""
+        collection = await self._readable(tenant_id)
+        if collection is None or not hashes:
+            return {}
+        query_filter = self._tenant_filter(None, tenant_id) or Filter()
+        query_filter.must = [
+            *(query_filter.must or []),
+            FieldCondition(key="content_hash", match=MatchAny(any=hashes)),
+        ]
+        found, offset = {}, None
+        while True:
+            records, offset = await self.client.scroll(
+                collection_name=collection,
+                scroll_filter=query_filter,
+                limit=1024,
+                offset=offset,
+                with_payload=["content_hash"],
+                with_vectors=True,
+            )
+            found.update((r.payload["content_hash"], r.vector) for r in records)
+            if offset is None:
+                return found
+
+    async def update_chunks(self, payloads: dict[str, dict], tenant_id: str = DEFAULT_TENANT) -> None:
+        """Overwrite payload fields (``chunk_index``, ``filename``) of stored chunks in one request."""
+        if not payloads:
+            return
+        await self.client.batch_update_points(
+            collection_name=await self._writable(tenant_id),
+            update_operations=[
+                SetPayloadOperation(set_payload=SetPayload(payload=payload, points=[point_id]))
+                for point_id, payload in payloads.items()
+            ],
+        )
+        get_lexical_index(tenant_id).update(payloads)
+        await self._wrote()
+
+    async def delete_chunks(self, chunk_ids: list[str], tenant_id: str = DEFAULT_TENANT) -> None:
+        if not chunk_ids:
+            return
+        collection = await self._readable(tenant_id)
+        if collection is not None:
+            await self.client.delete(collection_name=collection, points_selector=PointIdsList(points=chunk_ids))
+        get_lexical_index(tenant_id).remove_chunks(chunk_ids)
+        await self._wrote()
+        logger.info("Deleted chunks", tenant_id=tenant_id, count=len(chunk_ids))
+
+    async def search(
         self,
         query_vector: list[float],
         top_k: int = 5,
         score_threshold: float = 0.3,
+        filter: RetrieveFilter | None = None,
+        tenant_id: str = DEFAULT_TENANT,
     ) -> list[dict]:
         """Search for similar chunks."""
-        results = self.client.query_points(
-            collection_name=self.collection_name,
+        collection = await self._readable(tenant_id)
+        if collection is None:
+            return []
+        results = await self.client.query_points(
+            collection_name=collection,
             query=query_vector,
+            query_filter=self._tenant_filter(filter, tenant_id),
             limit=top_k,
             score_threshold=score_threshold,
+            search_params=self.search_params,
         )
+        return [_to_chunk(point) for point in results.points]
 
-        return [
-            {
-                "chunk_id": str(point.id),
-                "text": point.payload.get("text", ""),
-                "document_id": point.payload.get("document_id", ""),
-                "filename": point.payload.get("filename", ""),
-                "chunk_index": point.payload.get("chunk_index", 0),
-                "score": point.score,
-            }
-            for point in results.points
-        ]
+    async def search_batch(
+        self,
+        query_vectors: list[list[float]],
+        top_ks: list[int],
+        score_threshold: float = 0.3,
+        filters: list[RetrieveFilter | None] | None = None,
+        tenant_ids: list[str] | None = None,
+    ) -> list[list[dict]]:
+        """Run several searches, one Qdrant request per collection; results are in input order."""
+        filters = filters or [None] * len(query_vectors)
+        tenant_ids = tenant_ids or [DEFAULT_TENANT] * len(query_vectors)
+        groups: dict[str, list[int]] = {}
+        for i, tenant_id in enumerate(tenant_ids):
+            collection = await self._readable(tenant_id)
+            if collection is not None:
+                groups.setdefault(collection, []).append(i)
 
-    def delete_by_document(self, document_id: str) -> None:
-        """Delete all chunks belonging to a document."""
-        self.client.delete(
-            collection_name=self.collection_name,
-            points_selector=Filter(
-                must=[
-                    FieldCondition(
-                        key="document_id",
-                        match=MatchValue(value=document_id),
+        async def run(collection: str, ids: list[int]):
+            return await self.client.query_batch_points(
+                collection_name=collection,
+                requests=[
+                    QueryRequest(
+                        query=query_vectors[i],
+                        filter=self._tenant_filter(filters[i], tenant_ids[i]),
+                        limit=top_ks[i],
+                        score_threshold=score_threshold,
+                        params=self.search_params,
+                        with_payload=True,
                     )
-                ]
-            ),
+                    for i in ids
+                ],
+            )
+
+        results: list[list[dict]] = [[] for _ in query_vectors]
+        responses = await asyncio.gather(*(run(c, ids) for c, ids in groups.items()))
+        for ids, group in zip(groups.values(), responses):
+            for i, response in zip(ids, group):
+                results[i] = [_to_chunk(point) for point in response.points]
+        return results
+
+    async def count_chunks(self, tenant_id: str = DEFAULT_TENANT) -> int:
+        collection = await self._readable(tenant_id)
+        if collection is None:
+            return 0
+        result = await self.client.count(
+            collection_name=collection,
+            count_filter=self._tenant_filter(None, tenant_id),
+            exact=True,
         )
-        logger.info("Deleted chunks for document", document_id=document_id)
+        return result.count
+
+    async def delete_by_document(self, document_id: str, tenant_id: str = DEFAULT_TENANT) -> None:
+        """Delete all chunks belonging to a document."""
+        collection = await self._readable(tenant_id)
+        if collection is not None:
+            await self.client.delete(
+                collection_name=collection,
+                points_selector=Filter(
+                    must=[
+                        FieldCondition(
+                            key="document_id",
+                            match=MatchValue(value=document_id),
+                        )
+                    ]
+                ),
+            )
+        get_lexical_index(tenant_id).remove_document(document_id)
+        await self._wrote()
+        logger.info("Deleted chunks for document", document_id=document_id, tenant_id=tenant_id)
+
+    async def current_corpus_version(self) -> int:
+        """The corpus version shared by every replica.
+
+        If another replica wrote since the BM25 indexes were built, they are
+        rebuilt in the background (at most every LEXICAL_REFRESH_INTERVAL_S);
+        searches use the old ones until the new ones are swapped in.
+        """
+        self.corpus_version = await get_corpus_version()
+        if (
+            lexical_index_loaded()
+            and self._lexical_version != self.corpus_version
+            and self._lexical_refresh is None
+            and time.monotonic() - self._lexical_refreshed >= get_settings().LEXICAL_REFRESH_INTERVAL_S
+        ):
+            self._lexical_refresh = asyncio.create_task(self._refresh_lexical_index())
+        return self.corpus_version
+
+    async def _wrote(self) -> None:
+        version = await bump_corpus_version()
+        # This write went into the BM25 indexes too; they are still current only
+        # if no other replica wrote since they were.
+        if self._lexical_version == version - 1:
+            self._lexical_version = version
+        self.corpus_version = version
+
+    async def load_lexical_index(self, page_size: int = 1024) -> None:
+        """Rebuild the in-process BM25 indexes from the stored payloads."""
+        # Read first: anything written during the scan may be missed, and moves the version on.
+        self._lexical_version = await get_corpus_version()
+        chunks, collections = await self._replay_lexical(get_lexical_index, page_size)
+        finish_lexical_loading()
+        logger.info("Lexical index loaded", chunks=chunks, collections=collections)
+
+    async def _refresh_lexical_index(self) -> None:
+        try:
+            version = await get_corpus_version()
+            indexes: dict[str, LexicalIndex] = {}
+            chunks, _ = await self._replay_lexical(lambda tenant: indexes.setdefault(tenant, LexicalIndex()))
+            replace_lexical_indexes(indexes)
+            self._lexical_version = version
+            logger.info("Lexical index refreshed", chunks=chunks, corpus_version=version)
+        except Exception as e:
+            logger.warning("Could not refresh lexical index", error=str(e))
+        finally:
+            self._lexical_refreshed = time.monotonic()
+            self._lexical_refresh = None
+
+    async def _replay_lexical(self, index_for, page_size: int = 1024) -> tuple[int, int]:
+        """Add every stored chunk to ``index_for(tenant_id)``; returns the chunk and collection counts."""
+        collections = [(self.collection_name, None)]
+        if self.collection_per_tenant:
+            tenants = await tenant_collections(self.client, self.collection_name)
+            collections += [(name, tenant_id) for tenant_id, name in tenants.items()]
+
+        chunks = 0
+        for collection, tenant_id in collections:
+            if not await self.client.collection_exists(collection):
+                continue
+            offset = None
+            while True:
+                records, offset = await self.client.scroll(
+                    collection_name=collection,
+                    limit=page_size,
+                    offset=offset,
+                    with_payload=["text", "document_id", "filename", "chunk_index", "tenant_id"],
+                    with_vectors=False,
+                )
+                by_tenant: dict[str, list[dict]] = {}
+                for r in records:
+                    # Points stored before tenancy have no tenant_id and belong to the default tenant.
+                    tenant = tenant_id or r.payload.get("tenant_id") or DEFAULT_TENANT
+                    by_tenant.setdefault(tenant, []).append({"chunk_id": str(r.id), **r.payload})
+                for tenant, batch in by_tenant.items():
+                    index_for(tenant).add(batch)
+                chunks += len(records)
+                if offset is None:
+                    break
+        return chunks, len(collections)
+
+    async def ping(self) -> None:
+        await self.client.collection_exists(self.collection_name)
+
+    async def close(self) -> None:
+        if self._lexical_refresh is not None:
+            self._lexical_refresh.cancel()
+        await self.client.close()
+
+
+async def tenant_collections(client: AsyncQdrantClient, base: str) -> dict[str, str]:
+    """Per-tenant collections of ``base`` by tenant id.
+
+    A collection that ``migrate_storage`` swapped in sits behind an alias with
+    the tenant's name, so aliases are listed in place of their targets.
+    """
+    prefix = f"{base}{TENANT_COLLECTION_SEPARATOR}"
+    aliases = {a.alias_name: a.collection_name for a in (await client.get_aliases()).aliases}
+    targets = set(aliases.values())
+    names = [c.name for c in (await client.get_collections()).collections if c.name not in targets]
+    names += list(aliases)
+    return {name[len(prefix):]: name for name in names if name.startswith(prefix)}
 
 
-# Singleton
-_store: QdrantVectorStore | None = None
+def _to_chunk(point) -> dict:
+    return {
+        "chunk_id": str(point.id),
+        "text": point.payload.get("text", ""),
+        "document_id": point.payload.get("document_id", ""),
+        "filename": point.payload.get("filename", ""),
+        "chunk_index": point.payload.get("chunk_index", 0),
+        "score": point.score,
+    }
 
 
-def get_vector_store() -> QdrantVectorStore:
-    global _store
-    if _store is None:
-        _store = QdrantVectorStore()
-    return _store
+def _to_qdrant_filter(filter: RetrieveFilter | None, tenant_id: str | None = None) -> Filter | None:
+    must = []
+    if tenant_id == DEFAULT_TENANT:
+        # Points stored before tenancy carry no tenant_id; they belong to the default tenant.
+        must.append(Filter(should=[
+            FieldCondition(key="tenant_id", match=MatchValue(value=tenant_id)),
+            IsEmptyCondition(is_empty=PayloadField(key="tenant_id")),
+        ]))
+    elif tenant_id:
+        must.append(FieldCondition(key="tenant_id", match=MatchValue(value=tenant_id)))
+    if filter is not None and filter.document_ids:
+        must.append(FieldCondition(key="document_id", match=MatchAny(any=filter.document_ids)))
+    if filter is not None and filter.filenames:
+        must.append(FieldCondition(key="filename", match=MatchAny(any=filter.filenames)))
+    return Filter(must=must) if must else None
@@ -1,17 +1,69 @@
-"""Redis-backed document registry — persists document metadata across restarts."""
+"""Redis-backed document registry — persists document metadata across restarts.
+
+Each document is a hash of its fields, so progress updates write only the
+fields that changed. Per tenant, a sorted set indexes every document by
+creation time and one per status indexes just that status; members are
+``<created µs>:<id>`` at score 0, so lexicographic order is creation order
+and the last member of a page is the cursor for the next. Listing a page or
+counting documents never touches the rest of the registry.
+"""
+from datetime import datetime, timezone
+
 import redis.asyncio as aioredis
 import structlog
+from redis.exceptions import WatchError
 
 from ..config import get_settings
-from ..models.document import DocumentInfo
+from ..models.document import DEFAULT_TENANT, DocumentInfo, DocumentStatus, IngestJob, IngestStage
 
 logger = structlog.get_logger()
 
-DOCS_HASH_KEY = "voice-ai:documents"
+REGISTRY_PREFIX = "voice-ai:registry"
+INGEST_JOBS_KEY = "voice-ai:ingest:jobs"
+# Bumped on every write to the stored chunks, by whichever replica made it
+CORPUS_VERSION_KEY = "voice-ai:corpus:version"
+# Before the registry: one hash of document JSON per tenant, moved by migrate_legacy_documents()
+LEGACY_DOCS_KEY = "voice-ai:documents"
+
+_MIGRATE_BATCH = 500
 
 _redis: aioredis.Redis | None = None
 
 
+def _key(tenant_id: str, *parts: str) -> str:
+    # Tenant ids can't contain ':' (see api.tenant), so keys of different tenants never collide.
+    return ":".join((REGISTRY_PREFIX, tenant_id, *parts))
+
+
+def _doc_key(doc_id: str, tenant_id: str) -> str:
+    return _key(tenant_id, "doc", doc_id)
+
+
+def _index_key(tenant_id: str, status: DocumentStatus | None = None) -> str:
+    return _key(tenant_id, "status", status.value) if status else _key(tenant_id, "created")
+
+
+def _index_member(doc_id: str, created_at: datetime) -> str:
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return f"{round(created_at.timestamp() * 1_000_000):020d}:{doc_id}"
+
+
+def _fields(doc: DocumentInfo, names) -> tuple[dict, list[str]]:
+    """Hash values for ``names`` of ``doc``, and the names that are unset (``None``)."""
+    data = doc.model_dump(mode="json", include=set(names))
+    values = {k: v for k, v in data.items() if v is not None}
+    return values, [k for k, v in data.items() if v is None]
+
+
+def _load(raw: dict) -> DocumentInfo | None:
+    try:
+        return DocumentInfo.model_validate(raw)
+    except Exception as e:
+        logger.warning("Skipping corrupt document entry", doc_id=raw.get("id"), error=str(e))
+        return None
+
+
 async def get_redis() -> aioredis.Redis:
     global _redis
     if _redis is None:
@@ -27,36 +79,233 @@ async def close_redis() -> None:
         _redis = None
 
 
+def _queue_save(pipe, doc: DocumentInfo) -> None:
+    key = _doc_key(doc.id, doc.tenant_id)
+    member = _index_member(doc.id, doc.created_at)
+    values, unset = _fields(doc, DocumentInfo.model_fields)
+    pipe.hset(key, mapping=values)
+    if unset:
+        pipe.hdel(key, *unset)
+    pipe.zadd(_index_key(doc.tenant_id), {member: 0})
+    _queue_status(pipe, doc, member)
+
+
+def _queue_status(pipe, doc: DocumentInfo, member: str) -> None:
+    for status in DocumentStatus:
+        if status != doc.status:
+            pipe.zrem(_index_key(doc.tenant_id, status), member)
+    pipe.zadd(_index_key(doc.tenant_id, doc.status), {member: 0})
+
+
 async def save_document(doc: DocumentInfo) -> None:
+    """Write every field of ``doc`` and index it, in one transaction."""
+    r = await get_redis()
+    async with r.pipeline() as pipe:
+        _queue_save(pipe, doc)
+        await pipe.execute()
+
+
+async def register_document(doc: DocumentInfo, job: IngestJob) -> None:
+    """Save a document and its pending ingest job in one round trip."""
+    r = await get_redis()
+    async with r.pipeline() as pipe:
+        _queue_save(pipe, doc)
+        pipe.hset(INGEST_JOBS_KEY, job.doc_id, job.model_dump_json())
+        await pipe.execute()
+
+
+async def update_document_fields(doc: DocumentInfo, *fields: str) -> None:
+    """Write only ``fields`` of an already saved ``doc``; the status index follows ``status``.
+
+    Nothing is written back if the document was deleted in the meantime.
+    """
+    r = await get_redis()
+    key = _doc_key(doc.id, doc.tenant_id)
+    member = _index_member(doc.id, doc.created_at)
+    values, unset = _fields(doc, fields)
+    async with r.pipeline() as pipe:
+        # created_at is only ever written by save_document, so it tells whether the
+        # document still existed before this update.
+        pipe.hexists(key, "created_at")
+        if values:
+            pipe.hset(key, mapping=values)
+        if unset:
+            pipe.hdel(key, *unset)
+        if "status" in fields:
+            _queue_status(pipe, doc, member)
+        existed = (await pipe.execute())[0]
+    if not existed:
+        await _remove(r, doc.id, doc.tenant_id, member)
+
+
+async def claim_document(doc_id: str, tenant_id: str = DEFAULT_TENANT) -> DocumentInfo | None:
+    """Mark a document PROCESSING and QUEUED unless it already is PROCESSING.
+
+    Returns the document as it was before, or ``None`` if there is none; the
+    claim was made only if that document wasn't PROCESSING. Of concurrent
+    claims on one document, exactly one succeeds.
+    """
+    r = await get_redis()
+    key = _doc_key(doc_id, tenant_id)
+    async with r.pipeline() as pipe:
+        while True:
+            try:
+                await pipe.watch(key)
+                data = await pipe.hgetall(key)
+                doc = _load(data) if data else None
+                if doc is None or doc.status == DocumentStatus.PROCESSING:
+                    return doc
+                claimed = doc.model_copy(
+                    update={"status": DocumentStatus.PROCESSING, "stage": IngestStage.QUEUED, "error": None}
+                )
+                values, unset = _fields(claimed, ("status", "stage", "error"))
+                pipe.multi()
+                pipe.hset(key, mapping=values)
+                if unset:
+                    pipe.hdel(key, *unset)
+                _queue_status(pipe, claimed, _index_member(doc.id, doc.created_at))
+                await pipe.execute()
+                return doc
+            except WatchError:
+                # The document changed between the read and the write; look again.
+                continue
+
+
+async def get_document(doc_id: str, tenant_id: str = DEFAULT_TENANT) -> DocumentInfo | None:
+    r = await get_redis()
+    data = await r.hgetall(_doc_key(doc_id, tenant_id))
+    return _load(data) if data else None
+
+
+async def list_documents(
+    tenant_id: str = DEFAULT_TENANT,
+    limit: int = 100,
+    cursor: str | None = None,
+    status: DocumentStatus | None = None,
+    descending: bool = False,
+) -> tuple[list[DocumentInfo], str | None, int]:
+    """One page of documents in creation order, optionally of one status.
+
+    Returns the page, the cursor of the next page (``None`` after the last)
+    and how many documents match in total.
+    """
+    r = await get_redis()
+    index = _index_key(tenant_id, status)
+    async with r.pipeline(transaction=False) as pipe:
+        if descending:
+            pipe.zrevrangebylex(index, f"({cursor}" if cursor else "+", "-", start=0, num=limit + 1)
+        else:
+            pipe.zrangebylex(index, f"({cursor}" if cursor else "-", "+", start=0, num=limit + 1)
+        pipe.zcard(index)
+        members, total = await pipe.execute()
+
+    next_cursor = members[limit - 1] if len(members) > limit else None
+    members = members[:limit]
+    async with r.pipeline(transaction=False) as pipe:
+        for member in members:
+            pipe.hgetall(_doc_key(member.partition(":")[2], tenant_id))
+        rows = await pipe.execute()
+    docs = [doc for doc in map(_load, filter(None, rows)) if doc is not None]
+    return docs, next_cursor, total
+
+
+async def _remove(r: aioredis.Redis, doc_id: str, tenant_id: str, member: str) -> None:
+    async with r.pipeline() as pipe:
+        pipe.delete(_doc_key(doc_id, tenant_id))
+        pipe.zrem(_index_key(tenant_id), member)
+        for status in DocumentStatus:
+            pipe.zrem(_index_key(tenant_id, status), member)
+        await pipe.execute()
+
+
+async def delete_document(doc_id: str, tenant_id: str = DEFAULT_TENANT) -> None:
+    r = await get_redis()
+    created_at = await r.hget(_doc_key(doc_id, tenant_id), "created_at")
+    if created_at is not None:
+        await _remove(r, doc_id, tenant_id, _index_member(doc_id, datetime.fromisoformat(created_at)))
+
+
+async def document_exists(doc_id: str, tenant_id: str = DEFAULT_TENANT) -> bool:
+    r = await get_redis()
+    return bool(await r.exists(_doc_key(doc_id, tenant_id)))
+
+
+async def count_documents(tenant_id: str = DEFAULT_TENANT) -> int:
+    r = await get_redis()
+    return await r.zcard(_index_key(tenant_id))
+
+
+async def count_documents_by_status(tenant_id: str = DEFAULT_TENANT) -> dict[DocumentStatus, int]:
+    r = await get_redis()
+    async with r.pipeline(transaction=False) as pipe:
+        for status in DocumentStatus:
+            pipe.zcard(_index_key(tenant_id, status))
+        counts = await pipe.execute()
+    return dict(zip(DocumentStatus, counts))
+
+
+async def migrate_legacy_documents() -> int:
+    """Move documents from the pre-registry JSON hashes into the registry; returns how many.
+
+    Safe to run on every startup: once moved, the old hashes are deleted.
+    """
+    r = await get_redis()
+    moved = 0
+    async for key in r.scan_iter(match=f"{LEGACY_DOCS_KEY}*", _type="HASH"):
+        if key != LEGACY_DOCS_KEY and key.count(":") != LEGACY_DOCS_KEY.count(":") + 1:
+            continue
+        batch: list[DocumentInfo] = []
+        async for _, raw in r.hscan_iter(key, count=_MIGRATE_BATCH):
+            try:
+                batch.append(DocumentInfo.model_validate_json(raw))
+            except Exception as e:
+                logger.warning("Skipping corrupt legacy document entry", error=str(e))
+            if len(batch) >= _MIGRATE_BATCH:
+                moved += await _save_many(r, batch)
+                batch = []
+        moved += await _save_many(r, batch)
+        await r.delete(key)
+    if moved:
+        logger.info("Migrated documents to the registry", documents=moved)
+    return moved
+
+
+async def _save_many(r: aioredis.Redis, docs: list[DocumentInfo]) -> int:
+    async with r.pipeline(transaction=False) as pipe:
+        for doc in docs:
+            _queue_save(pipe, doc)
+        await pipe.execute()
+    return len(docs)
+
+
+async def save_ingest_job(job: IngestJob) -> None:
     r = await get_redis()
-    await r.hset(DOCS_HASH_KEY, doc.id, doc.model_dump_json())
+    await r.hset(INGEST_JOBS_KEY, job.doc_id, job.model_dump_json())
 
 
-async def get_document(doc_id: str) -> DocumentInfo | None:
+async def delete_ingest_job(doc_id: str) -> None:
     r = await get_redis()
-    data = await r.hget(DOCS_HASH_KEY, doc_id)
-    if data:
-        return DocumentInfo.model_validate_json(data)
-    return None
+    await r.hdel(INGEST_JOBS_KEY, doc_id)
 
 
-async def get_all_documents() -> list[DocumentInfo]:
+async def get_pending_ingest_jobs() -> list[IngestJob]:
     r = await get_redis()
-    all_data = await r.hgetall(DOCS_HASH_KEY)
-    docs = []
+    all_data = await r.hgetall(INGEST_JOBS_KEY)
+    jobs = []
     for raw in all_data.values():
         try:
-            docs.append(DocumentInfo.model_validate_json(raw))
+            jobs.append(IngestJob.model_validate_json(raw))
         except Exception as e:
-            logger.warning("Skipping corrupt document entry", error=str(e))
-    return sorted(docs, key=lambda d: d.created_at)
+            logger.warning("Skipping corrupt ingest job entry", error=str(e))
+    return jobs
 
 
-async def delete_document(doc_id: str) -> None:
+async def get_corpus_version() -> int:
     r = await get_redis()
-    await r.hdel(DOCS_HASH_KEY, doc_id)
+    return int(await r.get(CORPUS_VERSION_KEY) or 0)
 
 
-async def document_exists(doc_id: str) -> bool:
+async def bump_corpus_version() -> int:
+    """Count a write to the stored chunks; returns the new version."""
     r = await get_redis()
-    return bool(await r.hexists(DOCS_HASH_KEY, doc_id))
+    return await r.incr(CORPUS_VERSION_KEY)
@@ -0,0 +1,111 @@
+"""Qdrant storage profiles — how vectors are laid out in RAM and on disk.
+
+``float`` keeps full float32 vectors in RAM (the original layout). ``int8``
+and ``binary`` keep a quantized copy in RAM for the HNSW search and leave
+the float32 originals memory-mapped on disk, where they are only read to
+rescore the oversampled candidates. Dimension truncation is orthogonal:
+``EMBEDDING_DIMENSIONS`` below the model's native size stores Matryoshka-
+shortened vectors (text-embedding-3 models are trained for this).
+"""
+import math
+from typing import NamedTuple
+
+from qdrant_client.models import (
+    BinaryQuantization,
+    BinaryQuantizationConfig,
+    Distance,
+    QuantizationSearchParams,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    SearchParams,
+    VectorParams,
+)
+
+
+class StorageProfile(NamedTuple):
+    name: str
+    quantization: str | None  # None, "int8" or "binary"
+    on_disk: bool  # float32 originals memory-mapped instead of held in RAM
+    oversampling: float  # candidates fetched per result before rescoring
+
+
+STORAGE_PROFILES = {
+    "float": StorageProfile("float", None, False, 1.0),
+    "int8": StorageProfile("int8", "int8", True, 2.0),
+    "binary": StorageProfile("binary", "binary", True, 3.0),
+}
+
+
+def get_storage_profile(name: str) -> StorageProfile:
+    try:
+        return STORAGE_PROFILES[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown QDRANT_STORAGE_PROFILE: {name!r} (expected one of {', '.join(STORAGE_PROFILES)})"
+        ) from None
+
+
+def vectors_config(dimensions: int, profile: StorageProfile) -> VectorParams:
+    return VectorParams(size=dimensions, distance=Distance.COSINE, on_disk=profile.on_disk)
+
+
+def quantization_config(profile: StorageProfile) -> ScalarQuantization | BinaryQuantization | None:
+    if profile.quantization == "int8":
+        return ScalarQuantization(
+            scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)
+        )
+    if profile.quantization == "binary":
+        return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True))
+    return None
+
+
+def search_params(profile: StorageProfile, oversampling: float | None = None) -> SearchParams | None:
+    """Rescore quantized candidates against the float32 originals."""
+    if profile.quantization is None:
+        return None
+    return SearchParams(
+        quantization=QuantizationSearchParams(
+            rescore=True,
+            oversampling=oversampling or profile.oversampling,
+        )
+    )
+
+
+def profile_of(collection_info) -> str | None:
+    """Name of the profile an existing collection matches, or ``None`` for a custom layout."""
+    on_disk = bool(collection_info.config.params.vectors.on_disk)
+    quantization = collection_info.config.quantization_config
+    if isinstance(quantization, ScalarQuantization):
+        kind = "int8"
+    elif isinstance(quantization, BinaryQuantization):
+        kind = "binary"
+    elif quantization is None:
+        kind = None
+    else:
+        return None
+    for profile in STORAGE_PROFILES.values():
+        if profile.quantization == kind and profile.on_disk == on_disk:
+            return profile.name
+    return None
+
+
+def bytes_per_vector(dimensions: int, profile: StorageProfile) -> tuple[int, int]:
+    """``(ram, disk)`` bytes one vector costs, excluding the HNSW graph and payload."""
+    original = dimensions * 4
+    if profile.quantization == "int8":
+        quantized = dimensions
+    elif profile.quantization == "binary":
+        quantized = math.ceil(dimensions / 8)
+    else:
+        quantized = 0
+    if profile.on_disk:
+        return quantized, original
+    return original + quantized, 0
+
+
+def truncate(vector: list[float], dimensions: int) -> list[float]:
+    """Matryoshka-shorten a vector: keep the leading dimensions and re-normalise."""
+    head = vector[:dimensions]
+    norm = math.sqrt(sum(v * v for v in head)) or 1.0
+    return [v / norm for v in head]
@@ -0,0 +1,63 @@
+"""Vector store selection — one shared store chosen by ``VECTOR_BACKEND``.
+
+Both backends key chunks by ``chunk_point_id`` and expose the same methods
+(``upsert_chunks``, ``search``, ``search_batch``, ``delete_by_document``,
+...), so ingestion and retrieval don't depend on which one is configured.
+"""
+import asyncio
+import hashlib
+import uuid
+from typing import TYPE_CHECKING
+
+from ..config import get_settings
+
+if TYPE_CHECKING:
+    from .local_vector_store import LocalVectorStore
+    from .qdrant_store import QdrantVectorStore
+
+# Namespace for chunk point ids; changing it would orphan every stored point.
+_CHUNK_NAMESPACE = uuid.UUID("5b7f6c1e-3d0a-4f43-9a55-2c6f0e8d9b14")
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def chunk_point_id(document_id: str, text: str) -> str:
+    """Deterministic point id: the same text in the same document is always the same point."""
+    return str(uuid.uuid5(_CHUNK_NAMESPACE, f"{document_id}\x00{content_hash(text)}"))
+
+
+async def _create_store(name: str) -> "QdrantVectorStore | LocalVectorStore":
+    if name == "qdrant":
+        from .qdrant_store import QdrantVectorStore
+
+        store = QdrantVectorStore()
+        await store._ensure_collection()
+        return store
+    if name == "local":
+        from .local_vector_store import LocalVectorStore
+
+        return await LocalVectorStore.open()
+    raise ValueError(f"Unknown VECTOR_BACKEND: {name!r} (expected 'qdrant' or 'local')")
+
+
+# Singleton
+_store: "QdrantVectorStore | LocalVectorStore | None" = None
+_store_lock = asyncio.Lock()
+
+
+async def get_vector_store() -> "QdrantVectorStore | LocalVectorStore":
+    global _store
+    if _store is None:
+        async with _store_lock:
+            if _store is None:
+                _store = await _create_store(get_settings().VECTOR_BACKEND)
+    return _store
+
+
+async def close_vector_store() -> None:
+    global _store
+    if _store is not None:
+        await _store.close()
+        _store = None
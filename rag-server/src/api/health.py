@@ -1,5 +1,13 @@
-"""Health check endpoint."""
+"""Liveness (/health), readiness (/ready) and Prometheus (/metrics) endpoints."""
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from ..adapters.embedding_cache import get_embedding_cache
+from ..adapters.lexical_index import lexical_index_loaded, lexical_index_stats
+from ..core.ingestion import get_ingest_savings
+from ..core.result_cache import get_result_cache
+from ..core.warmup import check_readiness
 
 router = APIRouter()
 
@@ -9,4 +17,30 @@ async def health_check():
     return {
         "status": "ok",
         "service": "rag-server",
+        "embedding_cache": get_embedding_cache().stats(),
+        "result_cache": get_result_cache().stats(),
+        "lexical_index": lexical_index_stats(),
+        "ingest_savings": get_ingest_savings().stats(),
     }
+
+
+@router.get("/ready")
+async def readiness_check():
+    """503 until startup warmup is done and Redis, the vector store and the embedder are all up.
+
+    Redis and the vector store are probed on each call; the embedder reports its warmup result.
+    """
+    ready, checks = await check_readiness()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "ready" if ready else "not_ready",
+            "checks": checks,
+            "lexical_index_loaded": lexical_index_loaded(),
+        },
+    )
+
+
+@router.get("/metrics")
+async def metrics():
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
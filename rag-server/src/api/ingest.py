@@ -1,114 +1,265 @@
 """Document ingestion API endpoint."""
+import asyncio
+import posixpath
 import uuid
+import zipfile
+from contextlib import AbstractContextManager, nullcontext
+from typing import BinaryIO, Callable, Literal, NamedTuple
+
 import structlog
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Query, Response
 
-from ..adapters.document_parser import parse_document, SUPPORTED_EXTENSIONS
-from ..adapters.openai_embeddings import get_embeddings
-from ..adapters.qdrant_store import get_vector_store
+from ..adapters.document_parser import SUPPORTED_EXTENSIONS, get_extension
+from ..adapters.vector_store import get_vector_store
 from ..adapters.redis_store import (
-    save_document,
+    claim_document,
+    count_documents,
+    count_documents_by_status,
     get_document,
-    get_all_documents,
+    list_documents as list_registry,
     delete_document as redis_delete_document,
     document_exists,
+    update_document_fields,
+)
+from ..config import get_settings
+from ..core.bulk_ingestion import get_bulk_pipeline
+from ..core.ingestion import get_ingestion_queue, IngestQueueFull
+from ..models.document import (
+    BulkIngestResponse,
+    DocumentCounts,
+    DocumentInfo,
+    DocumentStatus,
+    IngestStage,
+    SkippedFile,
 )
-from ..core.chunker import chunk_text
-from ..models.document import DocumentInfo, DocumentStatus
+from .tenant import get_tenant_id
 
 logger = structlog.get_logger()
 
 router = APIRouter()
 
 
-@router.post("/ingest", status_code=201, response_model=DocumentInfo)
-async def ingest_document(file: UploadFile = File(...)):
-    """Upload and process a document: parse → chunk → embed → store."""
-    if not file.filename:
-        raise HTTPException(status_code=400, detail="No filename provided")
-
-    ext = "." + file.filename.rsplit(".", 1)[-1].lower() if "." in file.filename else ""
+def _unsupported(filename: str | None) -> str | None:
+    """Why a file can't be ingested, or ``None`` if it can."""
+    if not filename:
+        return "No filename provided"
+    ext = get_extension(filename)
     if ext not in SUPPORTED_EXTENSIONS:
+        return f"Unsupported file type: {ext}. Supported: {list(SUPPORTED_EXTENSIONS)}"
+    return None
+
+
+def _check_upload(file: UploadFile) -> None:
+    reason = _unsupported(file.filename)
+    if reason:
+        raise HTTPException(status_code=400, detail=reason)
+
+
+async def _check_document_quota(tenant_id: str, new_documents: int) -> None:
+    max_documents = get_settings().TENANT_MAX_DOCUMENTS
+    if max_documents and await count_documents(tenant_id) + new_documents > max_documents:
+        raise HTTPException(
+            status_code=403,
+            detail=f"Tenant document quota reached ({max_documents} documents)",
+        )
+
+
+class _BulkEntry(NamedTuple):
+    filename: str
+    size: int
+    open: Callable[[], AbstractContextManager[BinaryIO]]
+
+
+async def _bulk_entries(files: list[UploadFile], skipped: list[SkippedFile]) -> tuple[list[_BulkEntry], list]:
+    """Every file to ingest, with .zip archives expanded; returns the entries and the open archives."""
+    entries, archives = [], []
+    for file in files:
+        if not file.filename:
+            skipped.append(SkippedFile(filename="", reason="No filename provided"))
+            continue
+        if get_extension(file.filename) != ".zip":
+            entries.append(_BulkEntry(file.filename, file.size or 0, lambda f=file: nullcontext(f.file)))
+            continue
+        try:
+            archive = await asyncio.to_thread(zipfile.ZipFile, file.file)
+        except zipfile.BadZipFile:
+            skipped.append(SkippedFile(filename=file.filename, reason="Not a valid zip archive"))
+            continue
+        archives.append(archive)
+        for info in archive.infolist():
+            if info.is_dir():
+                continue
+            if posixpath.basename(info.filename).startswith(".") or info.filename.startswith("__MACOSX/"):
+                skipped.append(SkippedFile(filename=info.filename, reason="Hidden file"))
+                continue
+            entries.append(_BulkEntry(info.filename, info.file_size, lambda a=archive, i=info: a.open(i)))
+    return entries, archives
+
+
+async def _submit(doc: DocumentInfo, file: UploadFile) -> DocumentInfo:
+    try:
+        await get_ingestion_queue().submit(doc, file.file)
+    except IngestQueueFull:
         raise HTTPException(
-            status_code=400,
-            detail=f"Unsupported file type: {ext}. Supported: {list(SUPPORTED_EXTENSIONS)}",
+            status_code=503,
+            detail="Ingestion queue is full, retry shortly",
+            headers={"Retry-After": "5"},
         )
+    return doc
 
-    doc_id = str(uuid.uuid4())
-    content = await file.read()
+
+@router.post("/ingest", status_code=202, response_model=DocumentInfo)
+async def ingest_document(file: UploadFile = File(...), tenant_id: str = Depends(get_tenant_id)):
+    """Accept a document and queue it for background parse → chunk → embed → store.
+
+    Poll ``GET /documents/{doc_id}`` for stage and progress.
+    """
+    _check_upload(file)
+    await _check_document_quota(tenant_id, 1)
 
     doc = DocumentInfo(
-        id=doc_id,
+        id=str(uuid.uuid4()),
         filename=file.filename,
         status=DocumentStatus.PROCESSING,
-        file_size=len(content),
+        tenant_id=tenant_id,
     )
-    await save_document(doc)
+    return await _submit(doc, file)
 
-    try:
-        # 1. Parse document to text
-        text = parse_document(content, file.filename)
 
-        if not text.strip():
-            raise ValueError("Document is empty or could not be parsed")
+@router.post("/ingest/bulk", status_code=202, response_model=BulkIngestResponse)
+async def ingest_bulk(files: list[UploadFile] = File(...), tenant_id: str = Depends(get_tenant_id)):
+    """Accept many documents at once: files, .zip archives of them, or both.
 
-        # 2. Chunk text
-        chunks = chunk_text(text)
+    Each supported file becomes its own document, run through the staged
+    bulk pipeline; the rest are listed under ``skipped``. Poll
+    ``GET /documents/{doc_id}`` for each document's progress.
+    """
+    settings = get_settings()
+    skipped: list[SkippedFile] = []
+    entries, archives = await _bulk_entries(files, skipped)
+    try:
+        accepted = []
+        for entry in entries:
+            reason = _unsupported(entry.filename)
+            if reason:
+                skipped.append(SkippedFile(filename=entry.filename, reason=reason))
+            else:
+                accepted.append(entry)
+        if not accepted:
+            raise HTTPException(status_code=400, detail="No supported files in the request")
+        if len(accepted) > settings.INGEST_BULK_MAX_FILES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Too many files ({len(accepted)}); the limit is {settings.INGEST_BULK_MAX_FILES}",
+            )
+        # Archive members are checked by their declared size before anything is extracted.
+        if sum(e.size for e in accepted) > settings.INGEST_BULK_MAX_BYTES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Request expands to more than {settings.INGEST_BULK_MAX_BYTES} bytes",
+            )
+        await _check_document_quota(tenant_id, len(accepted))
 
-        if not chunks:
-            raise ValueError("No valid chunks generated from document")
+        pipeline = get_bulk_pipeline()
+        documents = []
+        for entry in accepted:
+            doc = DocumentInfo(
+                id=str(uuid.uuid4()),
+                filename=entry.filename,
+                status=DocumentStatus.PROCESSING,
+                tenant_id=tenant_id,
+            )
+            with entry.open() as upload:
+                await pipeline.submit(doc, upload)
+            documents.append(doc)
+    finally:
+        for archive in archives:
+            archive.close()
 
-        # 3. Generate embeddings
-        embeddings = get_embeddings()
-        vectors = embeddings.embed_texts(chunks)
+    logger.info("Bulk ingestion queued", documents=len(documents), skipped=len(skipped))
+    return BulkIngestResponse(documents=documents, skipped=skipped)
 
-        # 4. Store in Qdrant
-        store = get_vector_store()
-        num_stored = store.upsert_chunks(
-            texts=chunks,
-            embeddings=vectors,
-            document_id=doc_id,
-            filename=file.filename,
-        )
 
-        # 5. Update document status in Redis
-        doc.status = DocumentStatus.READY
-        doc.chunks = num_stored
-        await save_document(doc)
+@router.put("/documents/{doc_id}", status_code=202, response_model=DocumentInfo)
+async def update_document(doc_id: str, file: UploadFile = File(...), tenant_id: str = Depends(get_tenant_id)):
+    """Replace a document's content, re-embedding only the chunks that changed.
 
-        logger.info(
-            "Document ingested successfully",
-            doc_id=doc_id,
-            filename=file.filename,
-            chunks=num_stored,
-        )
+    The new version is diffed against the stored chunks by content hash;
+    until it finishes, searches see a mix of both versions.
+    """
+    _check_upload(file)
 
-        return doc
+    # Claimed in one step, so of two concurrent updates only one gets past here.
+    previous = await claim_document(doc_id, tenant_id)
+    if previous is None:
+        raise HTTPException(status_code=404, detail="Document not found")
+    if previous.status == DocumentStatus.PROCESSING:
+        raise HTTPException(status_code=409, detail="Document is still being ingested")
 
-    except Exception as e:
-        doc.status = DocumentStatus.FAILED
-        doc.error = str(e)
-        await save_document(doc)
-        logger.error("Ingestion failed", doc_id=doc_id, error=str(e))
-        raise HTTPException(status_code=500, detail=f"Ingestion failed: {str(e)}")
+    doc = previous.model_copy(update={
+        "filename": file.filename,
+        "status": DocumentStatus.PROCESSING,
+        "stage": IngestStage.QUEUED,
+        "error": None,
+    })
+    try:
+        return await _submit(doc, file)
+    except BaseException:
+        # Nothing was queued; hand the document back so it can be updated again.
+        await update_document_fields(previous, "status", "stage", "error")
+        raise
 
 
 @router.get("/documents", response_model=list[DocumentInfo])
-async def list_documents():
-    """List all ingested documents."""
-    return await get_all_documents()
+async def list_documents(
+    response: Response,
+    limit: int | None = Query(None, ge=1),
+    cursor: str | None = None,
+    status: DocumentStatus | None = None,
+    order: Literal["asc", "desc"] = "desc",
+    tenant_id: str = Depends(get_tenant_id),
+):
+    """List the tenant's documents a page at a time, newest first unless ``order=asc``.
+
+    ``limit`` defaults to DOCUMENTS_PAGE_SIZE and is capped at
+    DOCUMENTS_PAGE_MAX. The ``X-Next-Cursor`` header, when present, is the
+    ``cursor`` of the next page; ``X-Total-Count`` is how many documents match.
+    """
+    settings = get_settings()
+    limit = min(limit or settings.DOCUMENTS_PAGE_SIZE, settings.DOCUMENTS_PAGE_MAX)
+    docs, next_cursor, total = await list_registry(tenant_id, limit, cursor, status, descending=order == "desc")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    response.headers["X-Total-Count"] = str(total)
+    return docs
+
+
+@router.get("/documents/counts", response_model=DocumentCounts)
+async def document_counts(tenant_id: str = Depends(get_tenant_id)):
+    """How many of the tenant's documents there are, in total and per status."""
+    counts = await count_documents_by_status(tenant_id)
+    return DocumentCounts(total=sum(counts.values()), **{status.value: n for status, n in counts.items()})
+
+
+@router.get("/documents/{doc_id}", response_model=DocumentInfo)
+async def get_document_status(doc_id: str, tenant_id: str = Depends(get_tenant_id)):
+    """Get a single document, including ingestion progress."""
+    doc = await get_document(doc_id, tenant_id)
+    if doc is None:
+        raise HTTPException(status_code=404, detail="Document not found")
+    return doc
 
 
 @router.delete("/documents/{doc_id}", status_code=204)
-async def delete_document(doc_id: str):
+async def delete_document(doc_id: str, tenant_id: str = Depends(get_tenant_id)):
     """Delete a document and its vector embeddings."""
-    if not await document_exists(doc_id):
+    if not await document_exists(doc_id, tenant_id):
         raise HTTPException(status_code=404, detail="Document not found")
 
     try:
-        store = get_vector_store()
-        store.delete_by_document(doc_id)
-        await redis_delete_document(doc_id)
+        store = await get_vector_store()
+        await store.delete_by_document(doc_id, tenant_id)
+        await redis_delete_document(doc_id, tenant_id)
         logger.info("Document deleted", doc_id=doc_id)
     except Exception as e:
         logger.error("Deletion failed", doc_id=doc_id, error=str(e))
@@ -1,8 +1,15 @@
 """RAG retrieval API endpoint."""
 import structlog
-from fastapi import APIRouter, HTTPException
-from ..models.document import RetrieveRequest, RetrieveResponse
-from ..core.retriever import retrieve_context
+from fastapi import APIRouter, Depends, HTTPException
+from ..models.document import (
+    BatchRetrieveRequest,
+    BatchRetrieveResponse,
+    RetrieveRequest,
+    RetrieveResponse,
+)
+from ..metrics import ERRORS, timed
+from ..core.retriever import QuerySpec, merge_results, resolve_mode, retrieve_context, retrieve_many
+from .tenant import get_tenant_id
 
 logger = structlog.get_logger()
 
@@ -10,16 +17,20 @@ router = APIRouter()
 
 
 @router.post("/retrieve", response_model=RetrieveResponse)
-async def retrieve_documents(request: RetrieveRequest):
+async def retrieve_documents(request: RetrieveRequest, tenant_id: str = Depends(get_tenant_id)):
     """Retrieve relevant document chunks for a query."""
     if not request.query.strip():
         raise HTTPException(status_code=400, detail="Query cannot be empty")
 
     try:
-        chunks = await retrieve_context(
-            query=request.query,
-            top_k=request.top_k,
-        )
+        with timed("retrieve"):
+            chunks = await retrieve_context(
+                query=request.query,
+                top_k=request.top_k,
+                mode=request.mode,
+                filter=request.filter,
+                tenant_id=tenant_id,
+            )
 
         return RetrieveResponse(
             query=request.query,
@@ -28,5 +39,32 @@ async def retrieve_documents(request: RetrieveRequest):
         )
 
     except Exception as e:
+        ERRORS.labels("retrieve").inc()
         logger.error("Retrieval failed", query=request.query[:100], error=str(e))
         raise HTTPException(status_code=500, detail=f"Retrieval failed: {str(e)}")
+
+
+@router.post("/retrieve/batch", response_model=BatchRetrieveResponse)
+async def retrieve_batch(request: BatchRetrieveRequest, tenant_id: str = Depends(get_tenant_id)):
+    """Retrieve chunks for many queries with one embedding call and one vector search batch."""
+    if any(not q.query.strip() for q in request.queries):
+        raise HTTPException(status_code=400, detail="Queries cannot be empty")
+
+    mode = resolve_mode(request.mode)
+    specs = [QuerySpec(q.query, q.top_k or request.top_k, mode, q.filter, tenant_id) for q in request.queries]
+    try:
+        with timed("retrieve_batch"):
+            results = await retrieve_many(specs)
+    except Exception as e:
+        ERRORS.labels("retrieve_batch").inc()
+        logger.error("Batch retrieval failed", queries=len(specs), error=str(e))
+        raise HTTPException(status_code=500, detail=f"Retrieval failed: {str(e)}")
+
+    logger.info("Retrieved batch", queries=len(specs), mode=mode.value)
+    return BatchRetrieveResponse(
+        results=[
+            RetrieveResponse(query=q.query, chunks=chunks, total_found=len(chunks))
+            for q, chunks in zip(request.queries, results)
+        ],
+        merged=merge_results(results, request.merge_top_k) if request.merge else None,
+    )
@@ -0,0 +1,21 @@
+"""Tenant resolution — every data endpoint is scoped to the caller's ``X-Tenant-ID``."""
+import re
+
+from fastapi import Header, HTTPException
+
+from ..models.document import DEFAULT_TENANT
+
+# Tenant ids become Redis keys and Qdrant collection names.
+_TENANT_ID = re.compile(r"[a-z0-9][a-z0-9_-]{0,62}")
+
+
+def get_tenant_id(x_tenant_id: str | None = Header(None)) -> str:
+    """Requests without the header belong to the default tenant."""
+    if x_tenant_id is None:
+        return DEFAULT_TENANT
+    if not _TENANT_ID.fullmatch(x_tenant_id):
+        raise HTTPException(
+            status_code=400,
+            detail="X-Tenant-ID must be 1-63 lowercase letters, digits, '-' or '_'",
+        )
+    return x_tenant_id
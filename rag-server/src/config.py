@@ -5,22 +5,118 @@ from functools import lru_cache
 class Settings(BaseSettings):
     # OpenAI
     OPENAI_API_KEY: str = ""
+    OPENAI_BASE_URL: str | None = None
 
     # Qdrant
     QDRANT_URL: str = "http://localhost:6333"
     QDRANT_COLLECTION: str = "voice_ai_docs"
+    QDRANT_POOL_SIZE: int = 64
+    # "float" (all in RAM), "int8" or "binary" (quantized in RAM, originals on disk,
+    # rescored); existing collections are converted by `python -m src.migrate_storage`
+    QDRANT_STORAGE_PROFILE: str = "float"
+    QDRANT_OVERSAMPLING: float | None = None
+
+    # Vector store ("qdrant", or "local": an in-process index memory-mapped under
+    # LOCAL_VECTOR_DIR; exact NumPy search, plus an HNSW graph from
+    # LOCAL_VECTOR_GRAPH_MIN_CHUNKS chunks when the `local-index` extra is installed)
+    VECTOR_BACKEND: str = "qdrant"
+    LOCAL_VECTOR_DIR: str = "data/vectors"
+    LOCAL_VECTOR_GRAPH_MIN_CHUNKS: int = 50_000
+    LOCAL_VECTOR_GRAPH_M: int = 16
+    LOCAL_VECTOR_GRAPH_EF_CONSTRUCTION: int = 200
+    LOCAL_VECTOR_GRAPH_EF_SEARCH: int = 128
 
     # Chunking
     CHUNK_SIZE: int = 800
     CHUNK_OVERLAP: int = 200
 
+    # Ingestion
+    INGEST_WORKERS: int = 2
+    INGEST_QUEUE_SIZE: int = 32
+    INGEST_BATCH_SIZE: int = 500
+    INGEST_MAX_ATTEMPTS: int = 3
+    INGEST_SPOOL_DIR: str = "/tmp/rag-ingest"
+    # Copy the stored vector of an identical chunk from any of the tenant's documents
+    # instead of embedding it again
+    INGEST_DEDUP_ACROSS_DOCUMENTS: bool = False
+
+    # Bulk ingestion (/ingest/bulk): files and uncompressed bytes per request, documents
+    # parsed at once (0 = one per parse process), chunks buffered between parsing and
+    # embedding, and how long a part-filled embedding batch waits for more chunks
+    INGEST_BULK_MAX_FILES: int = 5000
+    INGEST_BULK_MAX_BYTES: int = 2 * 1024 * 1024 * 1024
+    INGEST_BULK_PARSERS: int = 0
+    INGEST_BULK_QUEUE_CHUNKS: int = 4096
+    INGEST_BULK_LINGER_MS: float = 20.0
+
+    # Document listing (GET /documents pages; larger limits are capped)
+    DOCUMENTS_PAGE_SIZE: int = 100
+    DOCUMENTS_PAGE_MAX: int = 1000
+
+    # Parse/chunk process pool (0 = one worker per CPU)
+    PARSE_PROCESSES: int = 0
+    PDF_PAGES_PER_TASK: int = 8
+    TEXT_BYTES_PER_TASK: int = 1024 * 1024
+
     # Retrieval
     TOP_K: int = 5
     SCORE_THRESHOLD: float = 0.15
+    # "dense", "lexical" (BM25) or "hybrid" (reciprocal rank fusion of both)
+    RETRIEVAL_MODE: str = "dense"
+    HYBRID_CANDIDATES: int = 20
+    # Least time between BM25 index rebuilds after another replica writes (Qdrant backend)
+    LEXICAL_REFRESH_INTERVAL_S: float = 30.0
+    RRF_K: int = 60
+    # Concurrent /retrieve calls within this window share one embed + search batch (0 = off)
+    RETRIEVE_BATCH_WINDOW_MS: float = 2.0
+    RETRIEVE_BATCH_MAX: int = 64
+
+    # Semantic result cache (cosine similarity at which a cached query is reused)
+    RESULT_CACHE_ENABLED: bool = True
+    RESULT_CACHE_SIMILARITY: float = 0.97
+    RESULT_CACHE_MAX_MB: int = 64
 
-    # Embedding
+    # Embedding ("openai" or "local"; the Qdrant collection is sized to the backend).
+    # text-embedding-3 vectors can be shortened (e.g. 1024, 256) with little recall loss.
+    EMBEDDING_BACKEND: str = "openai"
     EMBEDDING_MODEL: str = "text-embedding-3-large"
     EMBEDDING_DIMENSIONS: int = 3072
+    EMBEDDING_POOL_SIZE: int = 64
+
+    # Local embedding backend (fastembed/ONNX on CPU; 0 threads = ONNX Runtime default)
+    LOCAL_EMBEDDING_MODEL: str = "BAAI/bge-small-en-v1.5"
+    LOCAL_EMBEDDING_THREADS: int = 0
+    LOCAL_EMBEDDING_BATCH_SIZE: int = 64
+    LOCAL_EMBEDDING_CACHE_DIR: str | None = None
+
+    # Embedding scheduler (batches sized by estimated tokens, shared rate budget)
+    EMBEDDING_BATCH_TOKENS: int = 16_000
+    EMBEDDING_BATCH_MAX_ITEMS: int = 2048
+    EMBEDDING_MAX_IN_FLIGHT: int = 8
+    # Requests reserved for queries, on top of EMBEDDING_MAX_IN_FLIGHT
+    EMBEDDING_QUERY_MAX_IN_FLIGHT: int = 2
+    EMBEDDING_RPM: int = 3000
+    EMBEDDING_TPM: int = 1_000_000
+    EMBEDDING_MAX_RETRIES: int = 5
+
+    # Embedding cache (in-process LRU entries, shared Redis tier TTL in seconds)
+    EMBEDDING_CACHE_SIZE: int = 2000
+    EMBEDDING_CACHE_TTL: int = 7 * 24 * 3600
+    EMBEDDING_CACHE_REDIS: bool = True
+
+    # Tenancy ("payload": one collection partitioned on an is_tenant index; "collection":
+    # one collection per tenant, created on its first ingest). Quotas: 0 = unlimited.
+    TENANT_ISOLATION: str = "payload"
+    TENANT_MAX_DOCUMENTS: int = 0
+    TENANT_MAX_CHUNKS: int = 0
+
+    # Startup warmup (dependency clients created and this many pooled connections opened
+    # per dependency before serving), /ready probe timeout, and how often /ready retries
+    # an embedder that failed its warmup (it is otherwise never called by /ready)
+    WARMUP_CONNECTIONS: int = 4
+    WARMUP_TIMEOUT_S: float = 15.0
+    READY_CHECK_TIMEOUT_S: float = 2.0
+    READY_RECHECK_S: float = 30.0
 
     # Redis
     REDIS_URL: str = "redis://localhost:6379"
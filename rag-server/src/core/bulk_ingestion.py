@@ -0,0 +1,418 @@
+"""Bulk ingestion — many documents through one staged pipeline.
+
+Documents submitted through ``/ingest/bulk`` are not ingested one after
+another. Each stage runs on its own and hands work to the next through a
+bounded queue:
+
+  parse    up to ``INGEST_BULK_PARSERS`` documents at once on the parse
+           process pool; chunks are queued as each segment finishes
+  embed    chunks from any mix of documents are packed into token-sized
+           batches (``EMBEDDING_BATCH_TOKENS``), up to
+           ``EMBEDDING_MAX_IN_FLIGHT`` batches embedding at once
+  upsert   each embedded batch is written to the vector store, one request
+           per document in it
+
+A full queue holds back the stage before it, so memory stays bounded
+however many documents are waiting, while the embedder works through one
+document's chunks as the next is still being parsed. Every document keeps
+its own ``DocumentInfo`` in Redis and becomes ready (or fails) on its own.
+
+Bulk documents are always new, so nothing is diffed against stored chunks.
+Their jobs are recorded like single uploads; any a restart interrupts are
+resumed by the regular ingestion queue.
+"""
+import asyncio
+import time
+from contextlib import contextmanager
+from typing import BinaryIO, NamedTuple
+
+import structlog
+
+from ..adapters.embedding_scheduler import estimate_tokens
+from ..adapters.embeddings import get_embeddings
+from ..adapters.redis_store import get_document, save_ingest_job, update_document_fields
+from ..adapters.vector_store import chunk_point_id, content_hash, get_vector_store
+from ..config import get_settings
+from ..metrics import ERRORS, observe_stage, timed
+from ..models.document import DocumentInfo, DocumentStatus, IngestJob, IngestStage
+from .ingestion import PROGRESS_FIELDS, TenantQuotaExceeded, finish_job, spool_upload
+from .parse_pool import iter_segment_results, pool_size
+
+logger = structlog.get_logger()
+
+# Concurrent upsert requests; each is one document's share of an embedded batch.
+_UPSERT_WORKERS = 2
+
+
+class StageClock:
+    """How long a stage had work in flight, for utilisation figures."""
+
+    def __init__(self):
+        self.active_s = 0.0
+        self.operations = 0
+        self._running = 0
+        self._since = 0.0
+
+    @contextmanager
+    def running(self):
+        if self._running == 0:
+            self._since = time.perf_counter()
+        self._running += 1
+        try:
+            yield
+        finally:
+            self._running -= 1
+            self.operations += 1
+            if self._running == 0:
+                self.active_s += time.perf_counter() - self._since
+
+
+class _Document:
+    """A document in the pipeline and how many of its chunks are still on their way."""
+
+    def __init__(self, job: IngestJob, doc: DocumentInfo):
+        self.job = job
+        self.doc = doc
+        self.seen: set[str] = set()
+        self.pending = 0  # queued chunks not yet upserted; counted in the tenant's reservation
+        self.parsed = False
+        self.failed = False
+
+
+class _Chunk(NamedTuple):
+    document: _Document
+    text: str
+    position: int
+
+
+class BulkIngestionPipeline:
+    """Parse, embed and upsert stages joined by bounded queues; see the module docstring."""
+
+    def __init__(self, parsers: int, queue_chunks: int, linger_s: float, embed_in_flight: int):
+        self._num_parsers = parsers
+        self.linger_s = linger_s
+        self._documents: asyncio.Queue[IngestJob] = asyncio.Queue()
+        self._chunks: asyncio.Queue[_Chunk] = asyncio.Queue(maxsize=queue_chunks)
+        self._embedded: asyncio.Queue[tuple[list[_Chunk], list[list[float]]]] = asyncio.Queue(
+            maxsize=embed_in_flight
+        )
+        self._embed_slots = asyncio.Semaphore(embed_in_flight)
+        # Per tenant, chunks queued but not yet upserted. Documents parsing at the same time
+        # check the quota against stored chunks plus these, not just their own.
+        self._reserved: dict[str, int] = {}
+        self._tasks: list[asyncio.Task] = []
+        self._embedding: set[asyncio.Task] = set()
+        self.clocks = {"parse": StageClock(), "embed": StageClock(), "upsert": StageClock()}
+        self.documents_ready = 0
+        self.documents_failed = 0
+        self.chunks_upserted = 0
+
+    def start(self) -> None:
+        self._tasks = [
+            *(asyncio.create_task(self._parse_worker(), name=f"bulk-parse-{i}") for i in range(self._num_parsers)),
+            asyncio.create_task(self._pack_batches(), name="bulk-embed"),
+            *(asyncio.create_task(self._upsert_worker(), name=f"bulk-upsert-{i}") for i in range(_UPSERT_WORKERS)),
+        ]
+        logger.info("Bulk ingestion pipeline started", parsers=self._num_parsers)
+
+    async def stop(self) -> None:
+        # Unfinished documents keep their job records and are resumed on restart.
+        tasks = self._tasks + list(self._embedding)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    async def submit(self, doc: DocumentInfo, upload: BinaryIO) -> None:
+        """Spool an upload to disk, persist the job, and queue it for the pipeline."""
+        job = await spool_upload(doc, upload)
+        self._documents.put_nowait(job)
+
+    def stats(self) -> dict:
+        return {
+            "documents_waiting": self._documents.qsize(),
+            "chunks_queued": self._chunks.qsize(),
+            "batches_queued": self._embedded.qsize(),
+            "documents_ready": self.documents_ready,
+            "documents_failed": self.documents_failed,
+            "chunks_upserted": self.chunks_upserted,
+            "embed_batches": self.clocks["embed"].operations,
+        }
+
+    # --- parse ------------------------------------------------------------
+
+    async def _parse_worker(self) -> None:
+        while True:
+            job = await self._documents.get()
+            with structlog.contextvars.bound_contextvars(trace_id=job.trace_id):
+                try:
+                    await self._parse(job)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error("Bulk parse worker error", doc_id=job.doc_id, error=str(e))
+
+    async def _parse(self, job: IngestJob) -> None:
+        doc = await get_document(job.doc_id, job.tenant_id)
+        if doc is None:
+            # Document was deleted while queued.
+            await finish_job(job)
+            return
+        job.attempts += 1
+        await save_ingest_job(job)
+
+        document = _Document(job, doc)
+        settings = get_settings()
+        max_chunks = settings.TENANT_MAX_CHUNKS
+        store = await get_vector_store()
+        doc.stage = IngestStage.PARSING
+
+        results = iter_segment_results(job.path, job.filename)
+        try:
+            await update_document_fields(doc, *PROGRESS_FIELDS)
+            while not document.failed:
+                with self.clocks["parse"].running():
+                    result = await anext(results, None)
+                if result is None:
+                    break
+                # Re-read per segment: other documents' chunks land in the store meanwhile.
+                used = await store.count_chunks(doc.tenant_id) if max_chunks else 0
+                doc.pages_parsed += result.sections
+                doc.chunks += len(result.chunks)
+                observe_stage("parse", result.parse_s)
+                observe_stage("chunk", result.chunk_s)
+                for text in result.chunks:
+                    if document.failed:
+                        break
+                    point_id = chunk_point_id(doc.id, text)
+                    if point_id in document.seen:
+                        # A repeated chunk adds nothing a search could use.
+                        continue
+                    document.seen.add(point_id)
+                    if max_chunks and used + self._reserved.get(doc.tenant_id, 0) >= max_chunks:
+                        raise TenantQuotaExceeded(
+                            f"Tenant {doc.tenant_id!r} would exceed its quota of {max_chunks} chunks"
+                        )
+                    document.pending += 1
+                    self._reserve(doc.tenant_id, 1)
+                    # Waits while the embedder is behind.
+                    await self._chunks.put(_Chunk(document, text, len(document.seen) - 1))
+            if doc.chunks == 0:
+                raise ValueError("Document is empty or no valid chunks could be generated")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await self._fail(document, e)
+            return
+        finally:
+            await results.aclose()
+
+        if document.failed:
+            return
+        document.parsed = True
+        if document.pending == 0:
+            await self._complete(document)
+        else:
+            doc.stage = IngestStage.EMBEDDING
+            try:
+                await update_document_fields(doc, *PROGRESS_FIELDS)
+            except Exception as e:
+                await self._fail(document, e)
+
+    # --- embed ------------------------------------------------------------
+
+    async def _pack_batches(self) -> None:
+        """Fill embedding batches from the chunk queue, across documents, and start each one."""
+        settings = get_settings()
+        budget = settings.EMBEDDING_BATCH_TOKENS
+        max_items = settings.EMBEDDING_BATCH_MAX_ITEMS
+        loop = asyncio.get_running_loop()
+        carry: _Chunk | None = None
+        while True:
+            first = carry or await self._chunks.get()
+            carry = None
+            batch = [first]
+            try:
+                tokens = estimate_tokens(first.text)
+                # A part-filled batch waits up to linger_s for more chunks, then goes as it is.
+                deadline = loop.time() + self.linger_s
+                while tokens < budget and len(batch) < max_items:
+                    try:
+                        chunk = self._chunks.get_nowait()
+                    except asyncio.QueueEmpty:
+                        try:
+                            chunk = await asyncio.wait_for(self._chunks.get(), max(0.0, deadline - loop.time()))
+                        except TimeoutError:
+                            break
+                    cost = estimate_tokens(chunk.text)
+                    if tokens + cost > budget:
+                        carry = chunk
+                        break
+                    batch.append(chunk)
+                    tokens += cost
+            except Exception as e:
+                # Keep draining: a dead packer would leave the parse stage blocked on a full queue.
+                await self._fail_all(batch, e)
+                continue
+
+            await self._embed_slots.acquire()
+            task = asyncio.create_task(self._embed(batch))
+            self._embedding.add(task)
+            task.add_done_callback(self._embedding.discard)
+
+    async def _embed(self, batch: list[_Chunk]) -> None:
+        try:
+            live = [c for c in batch if not c.document.failed]
+            if not live:
+                return
+            try:
+                with self.clocks["embed"].running():
+                    vectors = await self._vectors(live)
+            except Exception as e:
+                await self._fail_all(live, e)
+                return
+            await self._embedded.put((live, vectors))
+        finally:
+            self._embed_slots.release()
+
+    async def _vectors(self, chunks: list[_Chunk]) -> list[list[float]]:
+        reused: dict[tuple[str, str], list[float]] = {}
+        if get_settings().INGEST_DEDUP_ACROSS_DOCUMENTS:
+            store = await get_vector_store()
+            by_tenant: dict[str, list[str]] = {}
+            for c in chunks:
+                by_tenant.setdefault(c.document.doc.tenant_id, []).append(content_hash(c.text))
+            for tenant, hashes in by_tenant.items():
+                found = await store.vectors_by_content(hashes, tenant)
+                reused.update(((tenant, h), v) for h, v in found.items())
+
+        keys = [(c.document.doc.tenant_id, content_hash(c.text)) for c in chunks]
+        missing = [c.text for c, key in zip(chunks, keys) if key not in reused]
+        embedded = iter(await get_embeddings().embed_texts(missing) if missing else [])
+        vectors = []
+        for c, key in zip(chunks, keys):
+            if key in reused:
+                vectors.append(reused[key])
+                c.document.doc.chunks_reused += 1
+            else:
+                vectors.append(next(embedded))
+                c.document.doc.chunks_embedded += 1
+        return vectors
+
+    # --- upsert -----------------------------------------------------------
+
+    async def _upsert_worker(self) -> None:
+        while True:
+            chunks, vectors = await self._embedded.get()
+            by_document: dict[_Document, tuple[list[_Chunk], list[list[float]]]] = {}
+            for chunk, vector in zip(chunks, vectors):
+                group = by_document.setdefault(chunk.document, ([], []))
+                group[0].append(chunk)
+                group[1].append(vector)
+            live = [(document, group) for document, group in by_document.items() if not document.failed]
+            # One document's error (a Redis write, say) fails that document; the worker keeps draining.
+            results = await asyncio.gather(
+                *(self._upsert(document, *group) for document, group in live),
+                return_exceptions=True,
+            )
+            for (document, _), result in zip(live, results):
+                if isinstance(result, Exception):
+                    await self._fail(document, result)
+
+    async def _upsert(self, document: _Document, chunks: list[_Chunk], vectors: list[list[float]]) -> None:
+        doc = document.doc
+        store = await get_vector_store()
+        try:
+            with self.clocks["upsert"].running(), timed("upsert"):
+                upserted = await store.upsert_chunks(
+                    texts=[c.text for c in chunks],
+                    embeddings=vectors,
+                    document_id=doc.id,
+                    filename=document.job.filename,
+                    tenant_id=doc.tenant_id,
+                    chunk_indexes=[c.position for c in chunks],
+                )
+        except Exception as e:
+            await self._fail(document, e)
+            return
+        if document.failed:
+            # Failed while this request was in flight; don't leave its chunks behind.
+            await store.delete_chunks([chunk_point_id(doc.id, c.text) for c in chunks], doc.tenant_id)
+            return
+
+        doc.points_upserted += upserted
+        self.chunks_upserted += upserted
+        document.pending -= len(chunks)
+        self._reserve(doc.tenant_id, -len(chunks))
+        if document.parsed and document.pending == 0:
+            await self._complete(document)
+        else:
+            await update_document_fields(doc, *PROGRESS_FIELDS)
+
+    # --- outcome ----------------------------------------------------------
+
+    def _reserve(self, tenant_id: str, chunks: int) -> None:
+        reserved = self._reserved.get(tenant_id, 0) + chunks
+        if reserved:
+            self._reserved[tenant_id] = reserved
+        else:
+            self._reserved.pop(tenant_id, None)
+
+    async def _complete(self, document: _Document) -> None:
+        doc = document.doc
+        doc.status = DocumentStatus.READY
+        doc.stage = IngestStage.DONE
+        try:
+            await update_document_fields(doc, "status", *PROGRESS_FIELDS)
+            await finish_job(document.job)
+        except Exception as e:
+            await self._fail(document, e)
+            return
+        self.documents_ready += 1
+        logger.info("Document ingested successfully", doc_id=doc.id, filename=doc.filename,
+                    chunks=doc.points_upserted)
+
+    async def _fail(self, document: _Document, error: Exception) -> None:
+        """Mark a document failed and drop its chunks. Never raises, so callers keep draining."""
+        if document.failed:
+            return
+        document.failed = True
+        doc = document.doc
+        self._reserve(doc.tenant_id, -document.pending)
+        self.documents_failed += 1
+        ERRORS.labels("ingest").inc()
+        doc.status = DocumentStatus.FAILED
+        doc.error = str(error)
+        logger.error("Ingestion failed", doc_id=doc.id, error=str(error))
+        try:
+            store = await get_vector_store()
+            await store.delete_by_document(doc.id, doc.tenant_id)
+        except Exception as e:
+            logger.error("Could not remove chunks of failed document", doc_id=doc.id, error=str(e))
+        try:
+            await update_document_fields(doc, "status", "error")
+            await finish_job(document.job)
+        except Exception as e:
+            # The job record stays, so the document is retried on restart.
+            logger.error("Could not record failed document", doc_id=doc.id, error=str(e))
+
+    async def _fail_all(self, chunks: list[_Chunk], error: Exception) -> None:
+        for document in {c.document for c in chunks}:
+            await self._fail(document, error)
+
+
+# Singleton
+_pipeline: BulkIngestionPipeline | None = None
+
+
+def get_bulk_pipeline() -> BulkIngestionPipeline:
+    global _pipeline
+    if _pipeline is None:
+        settings = get_settings()
+        _pipeline = BulkIngestionPipeline(
+            parsers=settings.INGEST_BULK_PARSERS or pool_size(),
+            queue_chunks=settings.INGEST_BULK_QUEUE_CHUNKS,
+            linger_s=settings.INGEST_BULK_LINGER_MS / 1000,
+            embed_in_flight=settings.EMBEDDING_MAX_IN_FLIGHT,
+        )
+    return _pipeline
@@ -1,16 +1,27 @@
-"""Text chunking engine using LangChain's RecursiveCharacterTextSplitter."""
+"""Text chunking engine using LangChain's RecursiveCharacterTextSplitter.
+
+LangChain is imported on first use, inside the ingestion process pool,
+keeping it out of the server's startup path.
+"""
+from typing import TYPE_CHECKING, Iterable, Iterator
+
 import structlog
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 from ..config import get_settings
 
+if TYPE_CHECKING:
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
 logger = structlog.get_logger()
 
+# Text accumulated before an incremental split, in multiples of CHUNK_SIZE
+_WINDOW_CHUNKS = 16
 
-def chunk_text(text: str) -> list[str]:
-    """Split text into overlapping chunks optimized for embedding."""
-    settings = get_settings()
 
-    splitter = RecursiveCharacterTextSplitter(
+def _make_splitter() -> "RecursiveCharacterTextSplitter":
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    settings = get_settings()
+    return RecursiveCharacterTextSplitter(
         chunk_size=settings.CHUNK_SIZE,
         chunk_overlap=settings.CHUNK_OVERLAP,
         length_function=len,
@@ -18,9 +29,48 @@ def chunk_text(text: str) -> list[str]:
         is_separator_regex=False,
     )
 
-    chunks = splitter.split_text(text)
+
+def _keep(chunks: list[str]) -> list[str]:
     # Filter out very short/empty chunks
-    chunks = [c.strip() for c in chunks if len(c.strip()) > 50]
+    return [c.strip() for c in chunks if len(c.strip()) > 50]
 
+
+def chunk_text(text: str) -> list[str]:
+    """Split text into overlapping chunks optimized for embedding."""
+    chunks = _keep(_make_splitter().split_text(text))
     logger.info("Chunked text", total_chars=len(text), chunks=len(chunks))
     return chunks
+
+
+def iter_chunks(sections: Iterable[str]) -> Iterator[str]:
+    """Chunk a stream of text sections incrementally, with bounded buffering.
+
+    Sections are joined with blank lines and split once enough text has
+    accumulated. The last chunk of each split is carried into the next
+    window, so no text is lost and overlap is kept across window edges;
+    boundaries can differ slightly from splitting the whole text at once.
+    """
+    splitter = _make_splitter()
+    window = get_settings().CHUNK_SIZE * _WINDOW_CHUNKS
+    buffer = ""
+    total_chars = total_chunks = 0
+
+    for section in sections:
+        total_chars += len(section)
+        buffer = f"{buffer}\n\n{section}" if buffer else section
+        if len(buffer) < window:
+            continue
+        pieces = splitter.split_text(buffer)
+        if len(pieces) < 2:
+            continue
+        for chunk in _keep(pieces[:-1]):
+            total_chunks += 1
+            yield chunk
+        buffer = pieces[-1]
+
+    if buffer:
+        for chunk in _keep(splitter.split_text(buffer)):
+            total_chunks += 1
+            yield chunk
+
+    logger.info("Chunked text", total_chars=total_chars, chunks=total_chunks)
@@ -0,0 +1,371 @@
+"""Background ingestion — bounded worker pool that runs parse → chunk → embed → store.
+
+Uploads are spooled to disk and recorded as an ``IngestJob`` in Redis before
+they are queued, so a job survives a worker crash or restart and is resumed
+by ``IngestionQueue.resume()`` on the next startup.
+"""
+import asyncio
+import os
+import shutil
+from pathlib import Path
+from typing import BinaryIO
+
+import structlog
+
+from ..adapters.embeddings import get_embeddings
+from ..adapters.vector_store import chunk_point_id, content_hash, get_vector_store
+from ..adapters.redis_store import (
+    get_document,
+    register_document,
+    save_ingest_job,
+    update_document_fields,
+    delete_ingest_job,
+    get_pending_ingest_jobs,
+)
+from ..config import get_settings
+from ..metrics import ERRORS, observe_stage, timed
+from ..models.document import DocumentInfo, DocumentStatus, IngestJob, IngestStage
+from .parse_pool import iter_segment_results
+
+logger = structlog.get_logger()
+
+# Document fields that change while a document is ingested
+PROGRESS_FIELDS = (
+    "stage",
+    "pages_parsed",
+    "chunks",
+    "chunks_embedded",
+    "points_upserted",
+    "chunks_unchanged",
+    "chunks_reused",
+    "chunks_removed",
+)
+
+
+class IngestQueueFull(Exception):
+    """Raised when the ingestion backlog is at capacity."""
+
+
+class TenantQuotaExceeded(Exception):
+    """Raised when a tenant is at its document or chunk quota."""
+
+
+def _spool(upload: BinaryIO, spool_dir: Path, path: Path) -> int:
+    spool_dir.mkdir(parents=True, exist_ok=True)
+    upload.seek(0)
+    with open(path, "wb") as out:
+        shutil.copyfileobj(upload, out, length=1024 * 1024)
+        return out.tell()
+
+
+async def spool_upload(doc: DocumentInfo, upload: BinaryIO) -> IngestJob:
+    """Copy an upload to the spool directory and persist the document and its job record.
+
+    The upload is copied in fixed-size blocks, never read whole into memory.
+    """
+    spool_dir = Path(get_settings().INGEST_SPOOL_DIR)
+    path = spool_dir / doc.id
+    doc.file_size = await asyncio.to_thread(_spool, upload, spool_dir, path)
+
+    job = IngestJob(
+        doc_id=doc.id,
+        filename=doc.filename,
+        path=str(path),
+        tenant_id=doc.tenant_id,
+        trace_id=structlog.contextvars.get_contextvars().get("trace_id"),
+    )
+    await register_document(doc, job)
+    return job
+
+
+async def finish_job(job: IngestJob) -> None:
+    """Drop a finished job's record and spooled file."""
+    await delete_ingest_job(job.doc_id)
+    try:
+        await asyncio.to_thread(os.remove, job.path)
+    except FileNotFoundError:
+        pass
+
+
+class IngestSavings:
+    """Work skipped by content-hash diffing, summed over every ingestion since startup."""
+
+    def __init__(self):
+        self.embeddings_skipped = 0
+        self.upserts_skipped = 0
+        self.upsert_bytes_saved = 0
+        self.chunks_deleted = 0
+
+    def stats(self) -> dict:
+        return {
+            "embeddings_skipped": self.embeddings_skipped,
+            "upserts_skipped": self.upserts_skipped,
+            "upsert_bytes_saved": self.upsert_bytes_saved,
+            "chunks_deleted": self.chunks_deleted,
+        }
+
+
+async def run_ingestion(job: IngestJob, doc: DocumentInfo) -> None:
+    """Stream one spooled upload through parse → chunk → embed → store.
+
+    Parsing and chunking run in the process pool, segment by segment; chunk
+    batches are embedded and upserted while later segments are still being
+    parsed, so peak memory is bounded by the in-flight window, not the file.
+
+    Point ids are derived from chunk content, so the upload is diffed against
+    whatever the document already has stored: unchanged chunks are kept (their
+    ``chunk_index`` and ``filename`` rewritten if needed), new ones are
+    embedded and upserted, and chunks no longer present are deleted at the
+    end. The same path serves first ingestion, updates and retried attempts.
+    If the attempt fails, the points it added are deleted and rewritten
+    payloads restored, so searches keep seeing the stored version.
+    """
+    settings = get_settings()
+    store = await get_vector_store()
+    savings = get_ingest_savings()
+
+    existing = await store.document_chunks(doc.id, doc.tenant_id)
+    doc.pages_parsed = doc.chunks = doc.chunks_embedded = doc.points_upserted = 0
+    doc.chunks_unchanged = doc.chunks_reused = doc.chunks_removed = 0
+
+    max_chunks = settings.TENANT_MAX_CHUNKS
+    used = await store.count_chunks(doc.tenant_id) - len(existing) if max_chunks else 0
+    dedup = settings.INGEST_DEDUP_ACROSS_DOCUMENTS
+    vector_bytes = 4 * store.dimensions
+
+    doc.stage = IngestStage.PARSING
+    await update_document_fields(doc, *PROGRESS_FIELDS)
+
+    embeddings = get_embeddings()
+    batch_size = settings.INGEST_BATCH_SIZE
+    seen: set[str] = set()
+    added: list[str] = []
+    rewritten: dict[str, dict] = {}  # point id -> payload fields before this attempt
+
+    async def flush(batch: list[str]) -> None:
+        fresh: list[str] = []
+        positions: list[int] = []
+        changed: dict[str, dict] = {}
+        for text in batch:
+            point_id = chunk_point_id(doc.id, text)
+            if point_id in seen:
+                # A repeated chunk adds nothing a search could use.
+                continue
+            position = len(seen)
+            seen.add(point_id)
+            if point_id in existing:
+                stored = existing[point_id]
+                if stored.get("chunk_index") != position or stored.get("filename") != job.filename:
+                    changed[point_id] = {"chunk_index": position, "filename": job.filename}
+                    rewritten[point_id] = stored
+                doc.chunks_unchanged += 1
+                savings.embeddings_skipped += 1
+                savings.upserts_skipped += 1
+                savings.upsert_bytes_saved += vector_bytes + len(text.encode())
+            else:
+                fresh.append(text)
+                positions.append(position)
+
+        if max_chunks and used + len(seen) > max_chunks:
+            raise TenantQuotaExceeded(f"Tenant {doc.tenant_id!r} would exceed its quota of {max_chunks} chunks")
+        await store.update_chunks(changed, doc.tenant_id)
+        if fresh:
+            reused = await store.vectors_by_content([content_hash(t) for t in fresh], doc.tenant_id) if dedup else {}
+            missing = [t for t in fresh if content_hash(t) not in reused]
+            embedded = dict(zip(missing, await embeddings.embed_texts(missing))) if missing else {}
+            vectors = [reused.get(content_hash(t)) or embedded[t] for t in fresh]
+            doc.chunks_embedded += len(missing)
+            doc.chunks_reused += len(fresh) - len(missing)
+            savings.embeddings_skipped += len(fresh) - len(missing)
+            # Recorded first: a failed upsert may still have written some of them.
+            added.extend(chunk_point_id(doc.id, t) for t in fresh)
+            with timed("upsert"):
+                doc.points_upserted += await store.upsert_chunks(
+                    texts=fresh,
+                    embeddings=vectors,
+                    document_id=doc.id,
+                    filename=job.filename,
+                    tenant_id=doc.tenant_id,
+                    chunk_indexes=positions,
+                )
+        await update_document_fields(doc, *PROGRESS_FIELDS)
+
+    batch: list[str] = []
+    try:
+        async for result in iter_segment_results(job.path, job.filename):
+            doc.pages_parsed += result.sections
+            doc.chunks += len(result.chunks)
+            observe_stage("parse", result.parse_s)
+            observe_stage("chunk", result.chunk_s)
+            for chunk in result.chunks:
+                batch.append(chunk)
+                if len(batch) >= batch_size:
+                    await flush(batch)
+                    batch = []
+
+        doc.stage = IngestStage.EMBEDDING
+        if batch:
+            await flush(batch)
+
+        if doc.chunks == 0:
+            raise ValueError("Document is empty or no valid chunks could be generated")
+    except Exception:
+        try:
+            await store.delete_chunks(added, doc.tenant_id)
+            await store.update_chunks(rewritten, doc.tenant_id)
+        except Exception as e:
+            logger.error("Could not roll back failed ingestion", doc_id=doc.id, error=str(e))
+        raise
+
+    stale = [point_id for point_id in existing if point_id not in seen]
+    await store.delete_chunks(stale, doc.tenant_id)
+    doc.chunks_removed = len(stale)
+    savings.chunks_deleted += len(stale)
+    logger.info(
+        "Document diffed against stored chunks",
+        doc_id=doc.id,
+        new=doc.points_upserted,
+        unchanged=doc.chunks_unchanged,
+        reused=doc.chunks_reused,
+        removed=doc.chunks_removed,
+    )
+
+
+class IngestionQueue:
+    """Bounded queue of ingestion jobs drained by a fixed pool of workers."""
+
+    def __init__(self, workers: int, max_size: int):
+        self._num_workers = workers
+        self._queue: asyncio.Queue[IngestJob] = asyncio.Queue()
+        # Backlog capacity, taken before a job is spooled and given back when a
+        # worker picks it up, so concurrent submits can't overfill the queue.
+        self._slots = asyncio.Semaphore(max_size)
+        self._workers: list[asyncio.Task] = []
+        self._resume_task: asyncio.Task | None = None
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        for i in range(self._num_workers):
+            self._workers.append(asyncio.create_task(self._worker(i), name=f"ingest-worker-{i}"))
+        logger.info("Ingestion workers started", workers=self._num_workers)
+
+    async def stop(self) -> None:
+        tasks = self._workers + ([self._resume_task] if self._resume_task else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers.clear()
+        self._resume_task = None
+
+    async def submit(self, doc: DocumentInfo, upload: BinaryIO) -> None:
+        """Spool an upload to disk, persist the job, and queue it.
+
+        Raises ``IngestQueueFull`` without side effects when the backlog is full.
+        """
+        if self._slots.locked():
+            raise IngestQueueFull()
+        await self._slots.acquire()
+
+        try:
+            job = await spool_upload(doc, upload)
+        except BaseException:
+            self._slots.release()
+            raise
+        self._queue.put_nowait(job)
+        logger.info("Ingestion queued", doc_id=doc.id, depth=self.depth)
+
+    async def resume(self) -> None:
+        """Re-queue jobs left unfinished by a previous process.
+
+        Call before serving requests so resumed and new jobs can't overlap.
+        """
+        try:
+            jobs = await get_pending_ingest_jobs()
+        except Exception as e:
+            logger.error("Could not load pending ingestion jobs", error=str(e))
+            return
+        if jobs:
+            logger.info("Resuming pending ingestion jobs", count=len(jobs))
+            self._resume_task = asyncio.create_task(self._requeue(jobs))
+
+    async def _requeue(self, jobs: list[IngestJob]) -> None:
+        for job in jobs:
+            # A large backlog waits for space rather than failing.
+            await self._slots.acquire()
+            self._queue.put_nowait(job)
+
+    async def _worker(self, worker_id: int) -> None:
+        while True:
+            job = await self._queue.get()
+            self._slots.release()
+            try:
+                # Log lines from the worker carry the trace id of the upload request.
+                with structlog.contextvars.bound_contextvars(trace_id=job.trace_id):
+                    await self._process(job)
+            except asyncio.CancelledError:
+                # Leave the job record in Redis; it is resumed on restart.
+                raise
+            except Exception as e:
+                logger.error("Ingestion worker error", worker=worker_id, doc_id=job.doc_id, error=str(e))
+            finally:
+                self._queue.task_done()
+
+    async def _process(self, job: IngestJob) -> None:
+        doc = await get_document(job.doc_id, job.tenant_id)
+        if doc is None:
+            # Document was deleted while queued.
+            await finish_job(job)
+            return
+
+        job.attempts += 1
+        await save_ingest_job(job)
+
+        try:
+            if job.attempts > get_settings().INGEST_MAX_ATTEMPTS:
+                raise RuntimeError(f"Gave up after {job.attempts - 1} attempts")
+
+            with timed("ingest"):
+                await run_ingestion(job, doc)
+
+            doc.status = DocumentStatus.READY
+            doc.stage = IngestStage.DONE
+            await update_document_fields(doc, "status", *PROGRESS_FIELDS)
+            logger.info(
+                "Document ingested successfully",
+                doc_id=doc.id,
+                filename=doc.filename,
+                chunks=doc.points_upserted,
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            ERRORS.labels("ingest").inc()
+            doc.status = DocumentStatus.FAILED
+            doc.error = str(e)
+            await update_document_fields(doc, "status", "error")
+            logger.error("Ingestion failed", doc_id=doc.id, error=str(e))
+
+        await finish_job(job)
+
+
+# Singletons
+_queue: IngestionQueue | None = None
+_savings: IngestSavings | None = None
+
+
+def get_ingest_savings() -> IngestSavings:
+    global _savings
+    if _savings is None:
+        _savings = IngestSavings()
+    return _savings
+
+
+def get_ingestion_queue() -> IngestionQueue:
+    global _queue
+    if _queue is None:
+        settings = get_settings()
+        _queue = IngestionQueue(workers=settings.INGEST_WORKERS, max_size=settings.INGEST_QUEUE_SIZE)
+    return _queue
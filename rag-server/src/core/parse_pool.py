@@ -0,0 +1,189 @@
+"""Process-pool parsing — moves CPU-bound parse and chunk work off the event loop.
+
+Documents are cut into segments (page ranges for PDF, byte ranges for
+plain text, the whole file for DOCX). Each segment is parsed and chunked
+in a worker process, and results come back in document order. At most a
+few segments per worker are in flight, so memory stays bounded. A worker
+keeps the reader of the PDF it is parsing across segments, so each process
+parses a file's cross-reference table once rather than once per segment; the
+file itself is only open while a segment is being parsed.
+"""
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, NamedTuple
+
+import structlog
+
+from ..adapters.document_parser import count_pdf_pages, get_extension, iter_pdf_pages, iter_sections, open_pdf
+from ..config import get_settings
+from .chunker import iter_chunks
+
+logger = structlog.get_logger()
+
+
+class Segment(NamedTuple):
+    start: int
+    stop: int | None
+
+
+class SegmentResult(NamedTuple):
+    sections: int
+    chunks: list[str]
+    parse_s: float = 0.0
+    chunk_s: float = 0.0
+
+
+def plan_segments(path: str, filename: str) -> list[Segment]:
+    """Split a spooled file into independently parseable segments."""
+    settings = get_settings()
+    ext = get_extension(filename)
+
+    if ext == ".pdf":
+        pages = count_pdf_pages(path)
+        step = settings.PDF_PAGES_PER_TASK
+        return [Segment(i, min(i + step, pages)) for i in range(0, pages, step)]
+    if ext in (".txt", ".md"):
+        size = os.path.getsize(path)
+        step = settings.TEXT_BYTES_PER_TASK
+        return [Segment(i, min(i + step, size)) for i in range(0, size, step)] or [Segment(0, None)]
+    return [Segment(0, None)]
+
+
+# Worker-process state: the PDF reader this worker last used, and the file it was opened on.
+_pdf: tuple[tuple, object] | None = None
+
+
+def _worker_pdf(path: str):
+    """This worker's reader for ``path``, parsed once and reused by its later segments.
+
+    The reader's file is reopened for each segment and closed after it, so an
+    idle worker never keeps a finished (deleted) spool file alive.
+    """
+    global _pdf
+    stream = open(path, "rb")
+    try:
+        stat = os.fstat(stream.fileno())
+        # Spool paths are reused when a document is re-uploaded; the inode and mtime tell the files apart.
+        key = (path, stat.st_ino, stat.st_mtime_ns)
+        if _pdf is not None and _pdf[0] == key:
+            _pdf[1].stream = stream
+        else:
+            _close_worker_pdf()
+            _pdf = (key, open_pdf(stream))
+    except BaseException:
+        stream.close()
+        raise
+    return _pdf[1]
+
+
+def _release_worker_pdf() -> None:
+    """Close the reader's file between segments, keeping the parsed reader."""
+    if _pdf is not None:
+        _pdf[1].stream.close()
+
+
+def _close_worker_pdf() -> None:
+    global _pdf
+    if _pdf is not None:
+        _pdf[1].stream.close()
+        _pdf = None
+
+
+def _segment_sections(path: str, filename: str, segment: Segment):
+    if get_extension(filename) != ".pdf":
+        return iter_sections(path, filename, segment.start, segment.stop)
+
+    reader = _worker_pdf(path)
+    # After the last segment the reader won't be needed again.
+    last = segment.stop is None or segment.stop >= len(reader.pages)
+
+    def pages():
+        try:
+            yield from iter_pdf_pages(reader, segment.start, segment.stop)
+        finally:
+            if last:
+                _close_worker_pdf()
+            else:
+                _release_worker_pdf()
+    return pages()
+
+
+def process_segment(path: str, filename: str, segment: Segment) -> SegmentResult:
+    """Parse and chunk one segment. Runs in a worker process.
+
+    Parsing is lazy and interleaved with chunking, so parse time is what was
+    spent inside the section iterator and chunk time is the rest.
+    """
+    sections = 0
+    parse_s = 0.0
+
+    def counted(items):
+        nonlocal sections, parse_s
+        items = iter(items)
+        while True:
+            start = time.perf_counter()
+            item = next(items, None)
+            parse_s += time.perf_counter() - start
+            if item is None:
+                return
+            sections += 1
+            yield item
+
+    start = time.perf_counter()
+    try:
+        chunks = list(iter_chunks(counted(_segment_sections(path, filename, segment))))
+    except BaseException:
+        # A reader that failed once isn't worth keeping.
+        _close_worker_pdf()
+        raise
+    return SegmentResult(sections, chunks, parse_s, time.perf_counter() - start - parse_s)
+
+
+async def iter_segment_results(path: str, filename: str) -> AsyncIterator[SegmentResult]:
+    """Parse a file across the process pool, yielding per-segment results in order."""
+    loop = asyncio.get_running_loop()
+    pool = get_process_pool()
+    segments = await loop.run_in_executor(pool, plan_segments, path, filename)
+    window = max(1, pool_size() * 2)
+
+    pending: list[asyncio.Future] = []
+    try:
+        for segment in segments:
+            pending.append(loop.run_in_executor(pool, process_segment, path, filename, segment))
+            if len(pending) >= window:
+                yield await pending.pop(0)
+        while pending:
+            yield await pending.pop(0)
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def pool_size() -> int:
+    return get_settings().PARSE_PROCESSES or os.cpu_count() or 1
+
+
+# Singleton
+_pool: ProcessPoolExecutor | None = None
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn: forking a process that runs an event loop and threads is unsafe.
+        _pool = ProcessPoolExecutor(
+            max_workers=pool_size(),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        logger.info("Parse process pool started", workers=pool_size())
+    return _pool
+
+
+def shutdown_process_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -0,0 +1,179 @@
+"""Semantic retrieval-result cache — reuses top-k hits for near-identical queries.
+
+A lookup hits when a cached query embedding has cosine similarity at or
+above the configured threshold, so paraphrases share one vector search.
+Entries are tied to the vector store's corpus version: any upsert or delete
+bumps the version and the whole cache is dropped on the next access.
+Entries only ever answer queries from the tenant that stored them.
+"""
+import json
+import time
+
+import numpy as np
+
+from ..config import get_settings
+from ..models.document import DEFAULT_TENANT
+
+
+class _Entry:
+    __slots__ = ("tenant_id", "top_k", "score_threshold", "results", "nbytes", "last_used")
+
+    def __init__(self, tenant_id: str, top_k: int, score_threshold: float, results: list[dict], nbytes: int):
+        self.tenant_id = tenant_id
+        self.top_k = top_k
+        self.score_threshold = score_threshold
+        self.results = results
+        self.nbytes = nbytes
+        self.last_used = time.monotonic()
+
+
+class SemanticResultCache:
+    """Similarity-keyed cache with a byte budget and least-recently-used eviction.
+
+    Query vectors live in one preallocated float32 matrix so a lookup is a
+    single matrix-vector product; evicted rows go on a free list for reuse.
+    """
+
+    def __init__(self, similarity: float, max_bytes: int):
+        self.similarity = similarity
+        self.max_bytes = max_bytes
+        self._matrix: np.ndarray | None = None
+        self._valid: np.ndarray | None = None
+        self._entries: dict[int, _Entry] = {}
+        self._free: list[int] = []
+        self._bytes = 0
+        self._version: int | None = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _sync_version(self, version: int) -> None:
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+            self.clear()
+            self._version = version
+
+    def clear(self) -> None:
+        self._matrix = None
+        self._valid = None
+        self._entries.clear()
+        self._free.clear()
+        self._bytes = 0
+
+    @staticmethod
+    def _normalize(vector: list[float]) -> np.ndarray:
+        q = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(q)
+        return q / norm if norm else q
+
+    def lookup(
+        self,
+        query_vector: list[float],
+        top_k: int,
+        score_threshold: float,
+        version: int,
+        tenant_id: str = DEFAULT_TENANT,
+    ) -> list[dict] | None:
+        """Return cached results for a similar-enough query, or ``None``."""
+        self._sync_version(version)
+        if not self._entries:
+            self.misses += 1
+            return None
+
+        q = self._normalize(query_vector)
+        if q.shape[0] != self._matrix.shape[1]:
+            self.misses += 1
+            return None
+
+        sims = self._matrix @ q
+        sims[~self._valid] = -1.0
+        # Walk candidates best-first; an entry must cover the requested k and threshold.
+        candidates = np.flatnonzero(sims >= self.similarity)
+        for slot in candidates[np.argsort(-sims[candidates])]:
+            entry = self._entries[int(slot)]
+            if entry.tenant_id == tenant_id and entry.top_k >= top_k and entry.score_threshold == score_threshold:
+                entry.last_used = time.monotonic()
+                self.hits += 1
+                return entry.results[:top_k]
+
+        self.misses += 1
+        return None
+
+    def store(
+        self,
+        query_vector: list[float],
+        top_k: int,
+        score_threshold: float,
+        results: list[dict],
+        version: int,
+        tenant_id: str = DEFAULT_TENANT,
+    ) -> None:
+        """Cache results computed against corpus ``version``; stale versions are dropped."""
+        if self._version is not None and version < self._version:
+            return
+        self._sync_version(version)
+
+        q = self._normalize(query_vector)
+        nbytes = q.nbytes + len(json.dumps(results, default=str))
+        if nbytes > self.max_bytes:
+            return
+
+        while self._entries and self._bytes + nbytes > self.max_bytes:
+            self._evict_one()
+
+        slot = self._allocate(q.shape[0])
+        self._matrix[slot] = q
+        self._valid[slot] = True
+        self._entries[slot] = _Entry(tenant_id, top_k, score_threshold, results, nbytes)
+        self._bytes += nbytes
+
+    def _allocate(self, dimensions: int) -> int:
+        if self._matrix is None or self._matrix.shape[1] != dimensions:
+            self.clear()
+            self._matrix = np.zeros((64, dimensions), dtype=np.float32)
+            self._valid = np.zeros(64, dtype=bool)
+            self._free = list(range(63, -1, -1))
+        if not self._free:
+            rows = self._matrix.shape[0]
+            self._matrix = np.vstack([self._matrix, np.zeros_like(self._matrix)])
+            self._valid = np.concatenate([self._valid, np.zeros(rows, dtype=bool)])
+            self._free = list(range(2 * rows - 1, rows - 1, -1))
+        return self._free.pop()
+
+    def _evict_one(self) -> None:
+        slot = min(self._entries, key=lambda s: self._entries[s].last_used)
+        entry = self._entries.pop(slot)
+        self._valid[slot] = False
+        self._free.append(slot)
+        self._bytes -= entry.nbytes
+        self.evictions += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# Singleton
+_cache: SemanticResultCache | None = None
+
+
+def get_result_cache() -> SemanticResultCache:
+    global _cache
+    if _cache is None:
+        settings = get_settings()
+        _cache = SemanticResultCache(
+            similarity=settings.RESULT_CACHE_SIMILARITY,
+            max_bytes=settings.RESULT_CACHE_MAX_MB * 1024 * 1024,
+        )
+    return _cache
@@ -1,34 +1,234 @@
-"""Retriever — orchestrates embedding + vector search for queries."""
+"""Retriever — orchestrates embedding + vector search (and optional BM25 fusion) for queries.
+
+Every path goes through ``retrieve_many``, which embeds all of its queries
+in one backend call and runs their vector searches as one Qdrant batch.
+Single-query callers are coalesced into such batches by ``RetrievalBatcher``
+when they arrive within ``RETRIEVE_BATCH_WINDOW_MS`` of each other.
+"""
+import asyncio
+from typing import NamedTuple
+
 import structlog
-from ..adapters.openai_embeddings import get_embeddings
-from ..adapters.qdrant_store import get_vector_store
+from ..adapters.embeddings import get_embeddings
+from ..adapters.lexical_index import get_lexical_index, lexical_index_loaded
+from ..adapters.vector_store import get_vector_store
 from ..config import get_settings
+from ..metrics import timed
+from ..models.document import DEFAULT_TENANT, RetrievalMode, RetrieveFilter
+from .result_cache import get_result_cache
 
 logger = structlog.get_logger()
 
 
-async def retrieve_context(query: str, top_k: int | None = None) -> list[dict]:
-    """Retrieve relevant document chunks for a given query."""
+class QuerySpec(NamedTuple):
+    query: str
+    top_k: int
+    mode: RetrievalMode
+    filter: RetrieveFilter | None = None
+    tenant_id: str = DEFAULT_TENANT
+
+
+def reciprocal_rank_fusion(rankings: list[list[dict]], top_k: int, k: int = 60) -> list[dict]:
+    """Merge ranked lists by summing ``1 / (k + rank)``; ``score`` becomes the fused score."""
+    fused: dict[str, dict] = {}
+    for ranking in rankings:
+        for rank, chunk in enumerate(ranking, start=1):
+            entry = fused.setdefault(chunk["chunk_id"], {**chunk, "score": 0.0})
+            entry["score"] += 1.0 / (k + rank)
+    return sorted(fused.values(), key=lambda c: c["score"], reverse=True)[:top_k]
+
+
+def merge_results(results: list[list[dict]], top_k: int | None = None) -> list[dict]:
+    """Deduplicate chunks across queries, keeping the best score and which queries hit each."""
+    merged: dict[str, dict] = {}
+    for i, chunks in enumerate(results):
+        for chunk in chunks:
+            entry = merged.get(chunk["chunk_id"])
+            if entry is None:
+                merged[chunk["chunk_id"]] = {**chunk, "queries": [i]}
+            else:
+                entry["queries"].append(i)
+                entry["score"] = max(entry["score"], chunk["score"])
+    ranked = sorted(merged.values(), key=lambda c: c["score"], reverse=True)
+    return ranked[:top_k] if top_k else ranked
+
+
+def resolve_mode(mode: RetrievalMode | None) -> RetrievalMode:
+    mode = mode or RetrievalMode(get_settings().RETRIEVAL_MODE)
+    if mode != RetrievalMode.DENSE and not lexical_index_loaded():
+        # Still replaying the collection after a restart; lexical hits would be partial.
+        return RetrievalMode.DENSE
+    return mode
+
+
+async def retrieve_many(specs: list[QuerySpec]) -> list[list[dict]]:
+    """Retrieve chunks for several queries with one embedding call and one vector search batch."""
     settings = get_settings()
-    k = top_k or settings.TOP_K
-
-    # 1. Embed the query
-    embeddings = get_embeddings()
-    query_vector = embeddings.embed_query(query)
-
-    # 2. Search Qdrant
-    store = get_vector_store()
-    results = store.search(
-        query_vector=query_vector,
-        top_k=k,
-        score_threshold=settings.SCORE_THRESHOLD,
-    )
+    threshold = settings.SCORE_THRESHOLD
+
+    dense_ids = [i for i, spec in enumerate(specs) if spec.mode != RetrievalMode.LEXICAL]
+    dense: dict[int, list[dict]] = {}
+    if dense_ids:
+        # 1. Embed every query that needs a vector in one call
+        with timed("embed_query"):
+            vectors = await get_embeddings().embed_queries([specs[i].query for i in dense_ids])
+        vectors = dict(zip(dense_ids, vectors))
+
+        # 2. Reuse results of near-identical earlier queries, batch-search the rest.
+        # Paraphrase-keyed caching only suits unfiltered dense queries: "order 1234" and
+        # "order 1235" embed almost identically but must hit different chunks lexically.
+        store = await get_vector_store()
+        version = await store.current_corpus_version()
+        cache = get_result_cache() if settings.RESULT_CACHE_ENABLED else None
+
+        def cacheable(spec: QuerySpec) -> bool:
+            return cache is not None and spec.mode == RetrievalMode.DENSE and spec.filter is None
+
+        searches: list[tuple[int, int]] = []
+        for i in dense_ids:
+            spec = specs[i]
+            if cacheable(spec):
+                hit = cache.lookup(vectors[i], spec.top_k, threshold, version, spec.tenant_id)
+                if hit is not None:
+                    dense[i] = hit
+                    continue
+            k = spec.top_k if spec.mode == RetrievalMode.DENSE else max(spec.top_k, settings.HYBRID_CANDIDATES)
+            searches.append((i, k))
+
+        if searches:
+            with timed("vector_search"):
+                found = await store.search_batch(
+                    query_vectors=[vectors[i] for i, _ in searches],
+                    top_ks=[k for _, k in searches],
+                    score_threshold=threshold,
+                    filters=[specs[i].filter for i, _ in searches],
+                    tenant_ids=[specs[i].tenant_id for i, _ in searches],
+                )
+            for (i, _), hits in zip(searches, found):
+                dense[i] = hits
+                if cacheable(specs[i]):
+                    cache.store(vectors[i], specs[i].top_k, threshold, hits, version, specs[i].tenant_id)
+
+    results = []
+    for i, spec in enumerate(specs):
+        if spec.mode == RetrievalMode.DENSE:
+            results.append(dense[i])
+        elif spec.mode == RetrievalMode.LEXICAL:
+            with timed("lexical_search"):
+                results.append(get_lexical_index(spec.tenant_id).search(spec.query, spec.top_k, spec.filter))
+        else:
+            candidates = max(spec.top_k, settings.HYBRID_CANDIDATES)
+            with timed("lexical_search"):
+                lexical = get_lexical_index(spec.tenant_id).search(spec.query, candidates, spec.filter)
+            results.append(reciprocal_rank_fusion([dense[i], lexical], spec.top_k, settings.RRF_K))
+    return results
+
+
+class RetrievalBatcher:
+    """Coalesces concurrent single-query retrievals into shared ``retrieve_many`` calls.
+
+    The first query to arrive opens a window of ``window_s``; everything that
+    arrives before it closes (or until ``max_batch`` queries) runs as one batch.
+    """
+
+    def __init__(self, window_s: float, max_batch: int):
+        self.window_s = window_s
+        self.max_batch = max_batch
+        self._pending: list[tuple[QuerySpec, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._running: set[asyncio.Task] = set()
+        self.batches = 0
+        self.queries = 0
+
+    async def submit(self, spec: QuerySpec) -> list[dict]:
+        if self.window_s <= 0:
+            return (await retrieve_many([spec]))[0]
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((spec, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_s, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._run(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: list[tuple[QuerySpec, asyncio.Future]]) -> None:
+        self.batches += 1
+        self.queries += len(batch)
+        try:
+            results = await retrieve_many([spec for spec, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), chunks in zip(batch, results):
+            if not future.done():
+                future.set_result(chunks)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "queries": self.queries,
+            "avg_batch": round(self.queries / self.batches, 2) if self.batches else 0.0,
+        }
+
+
+async def retrieve_context(
+    query: str,
+    top_k: int | None = None,
+    mode: RetrievalMode | None = None,
+    filter: RetrieveFilter | None = None,
+    tenant_id: str = DEFAULT_TENANT,
+) -> list[dict]:
+    """Retrieve relevant document chunks for a given query."""
+    spec = QuerySpec(query, top_k or get_settings().TOP_K, resolve_mode(mode), filter, tenant_id)
+    results = await get_retrieval_batcher().submit(spec)
 
     logger.info(
         "Retrieved context",
         query=query[:100],
+        tenant_id=tenant_id,
+        mode=spec.mode.value,
         results=len(results),
         top_score=results[0]["score"] if results else 0,
     )
 
     return results
+
+
+async def load_lexical_index() -> None:
+    """Replay stored chunks into the BM25 index; hybrid requests use dense-only until done."""
+    try:
+        store = await get_vector_store()
+        await store.load_lexical_index()
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.error("Could not load lexical index; hybrid retrieval stays dense-only", error=str(e))
+
+
+# Singleton
+_batcher: RetrievalBatcher | None = None
+
+
+def get_retrieval_batcher() -> RetrievalBatcher:
+    global _batcher
+    if _batcher is None:
+        settings = get_settings()
+        _batcher = RetrievalBatcher(
+            window_s=settings.RETRIEVE_BATCH_WINDOW_MS / 1000,
+            max_batch=settings.RETRIEVE_BATCH_MAX,
+        )
+    return _batcher
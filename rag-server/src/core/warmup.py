@@ -0,0 +1,113 @@
+"""Startup warmup and readiness checks for the server's dependencies.
+
+Every adapter is a lazy singleton, so without a warmup the first /retrieve
+after a deploy would construct the clients, ensure the collection and open
+TLS connections inside a live voice turn. ``warm_up`` does all of that
+before the server accepts traffic; ``check_readiness`` backs ``/ready``.
+Orchestrators probe ``/ready`` every few seconds and the embedder may be a
+metered API, so only Redis and the vector store are probed each time; the
+embedder's state is its warmup result.
+"""
+import asyncio
+import time
+from typing import Awaitable, Callable
+
+import structlog
+
+from ..adapters.embeddings import get_embeddings
+from ..adapters.vector_store import get_vector_store
+from ..adapters.redis_store import get_redis
+from ..config import get_settings
+
+logger = structlog.get_logger()
+
+# Result of each check at warmup (or its latest recheck), and when that ran
+_report: dict[str, dict] | None = None
+_checked_at: dict[str, float] = {}
+
+
+async def _ping_redis() -> None:
+    await (await get_redis()).ping()
+
+
+async def _ping_vector_store() -> None:
+    await (await get_vector_store()).ping()
+
+
+async def _ping_embedder() -> None:
+    await get_embeddings().ping()
+
+
+CHECKS: dict[str, Callable[[], Awaitable[None]]] = {
+    "redis": _ping_redis,
+    "vector_store": _ping_vector_store,
+    "embedder": _ping_embedder,
+}
+# Cheap enough to probe on every /ready
+LIVE_CHECKS = ("redis", "vector_store")
+
+
+async def _timed(check: Callable[[], Awaitable[None]], timeout: float) -> dict:
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(check(), timeout)
+    except Exception as e:
+        error = str(e) or type(e).__name__
+        return {"ok": False, "latency_ms": round((time.perf_counter() - start) * 1000, 2), "error": error}
+    return {"ok": True, "latency_ms": round((time.perf_counter() - start) * 1000, 2)}
+
+
+async def _warm(name: str, check: Callable[[], Awaitable[None]], connections: int, timeout: float) -> dict:
+    # The first call builds the client alone; the rest then run concurrently so
+    # each pool holds several open connections.
+    result = await _timed(check, timeout)
+    if result["ok"] and connections > 1:
+        await asyncio.gather(*(_timed(check, timeout) for _ in range(connections - 1)))
+    return result
+
+
+async def warm_up() -> dict[str, dict]:
+    """Create every client and pre-open its pool, all dependencies concurrently.
+
+    Failures are logged, not raised: the server still starts, and ``/ready``
+    keeps reporting the dependency until it recovers.
+    """
+    global _report
+    settings = get_settings()
+    start = time.perf_counter()
+    results = await asyncio.gather(*(
+        _warm(name, check, settings.WARMUP_CONNECTIONS, settings.WARMUP_TIMEOUT_S)
+        for name, check in CHECKS.items()
+    ))
+    _report = dict(zip(CHECKS, results))
+    _checked_at.update(dict.fromkeys(CHECKS, time.monotonic()))
+    failed = [name for name, result in _report.items() if not result["ok"]]
+    if failed:
+        logger.error("Warmup incomplete", failed=failed, report=_report)
+    else:
+        logger.info("Warmup complete", ms=round((time.perf_counter() - start) * 1000, 2), report=_report)
+    return dict(_report)
+
+
+async def check_readiness() -> tuple[bool, dict]:
+    """Ready once warmed and every dependency is up.
+
+    ``LIVE_CHECKS`` are probed now; the others report their warmup result,
+    and one that failed is retried at most every READY_RECHECK_S.
+    """
+    if _report is None:
+        return False, {}
+    settings = get_settings()
+    timeout = settings.READY_CHECK_TIMEOUT_S
+    now = time.monotonic()
+    probe = [
+        name for name, result in _report.items()
+        if name in LIVE_CHECKS or (not result["ok"] and now - _checked_at[name] >= settings.READY_RECHECK_S)
+    ]
+    for name in probe:
+        # Claimed before the await so concurrent probes don't retry it too.
+        _checked_at[name] = now
+    results = await asyncio.gather(*(_timed(CHECKS[name], timeout) for name in probe))
+    _report.update(zip(probe, results))
+    checks = dict(_report)
+    return all(r["ok"] for r in checks.values()), checks
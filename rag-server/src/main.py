@@ -1,13 +1,23 @@
+import asyncio
+import re
+import uuid
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 import structlog
 
 from .api.ingest import router as ingest_router
 from .api.retrieve import router as retrieve_router
 from .api.health import router as health_router
-from .adapters.redis_store import close_redis
+from .adapters.redis_store import close_redis, migrate_legacy_documents
+from .adapters.embeddings import close_embeddings
+from .adapters.vector_store import close_vector_store
+from .core.bulk_ingestion import get_bulk_pipeline
+from .core.ingestion import get_ingestion_queue
+from .core.retriever import load_lexical_index
+from .core.warmup import warm_up
+from .core.parse_pool import shutdown_process_pool
 
 structlog.configure(
     processors=[
@@ -25,9 +35,26 @@ logger = structlog.get_logger()
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("RAG Server starting up")
+    await warm_up()
+    try:
+        await migrate_legacy_documents()
+    except Exception as e:
+        logger.error("Could not migrate documents to the registry", error=str(e))
+    ingestion = get_ingestion_queue()
+    ingestion.start()
+    await ingestion.resume()
+    bulk = get_bulk_pipeline()
+    bulk.start()
+    lexical_load = asyncio.create_task(load_lexical_index())
     yield
     logger.info("RAG Server shutting down")
+    lexical_load.cancel()
+    await bulk.stop()
+    await ingestion.stop()
+    shutdown_process_pool()
     await close_redis()
+    await close_embeddings()
+    await close_vector_store()
 
 
 app = FastAPI(
@@ -46,6 +73,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+TRACE_HEADER = "X-Trace-ID"
+_TRACE_ID = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+
+@app.middleware("http")
+async def bind_trace_id(request: Request, call_next):
+    """Tag every log line of a request with the caller's trace id, or a fresh one."""
+    trace_id = request.headers.get(TRACE_HEADER, "")
+    if not _TRACE_ID.fullmatch(trace_id):
+        trace_id = uuid.uuid4().hex[:16]
+    structlog.contextvars.clear_contextvars()
+    structlog.contextvars.bind_contextvars(trace_id=trace_id)
+    response = await call_next(request)
+    response.headers[TRACE_HEADER] = trace_id
+    return response
+
+
 app.include_router(ingest_router)
 app.include_router(retrieve_router)
 app.include_router(health_router)
@@ -0,0 +1,183 @@
+"""Convert the Qdrant collections to the configured storage profile and dimensions.
+
+Usage (from rag-server/, with ingestion stopped):
+    QDRANT_STORAGE_PROFILE=int8 python -m src.migrate_storage --dry-run
+    QDRANT_STORAGE_PROFILE=binary EMBEDDING_DIMENSIONS=1024 python -m src.migrate_storage
+
+Quantization and on-disk changes are applied in place; Qdrant rebuilds the
+quantized index in the background and search keeps working meanwhile. A
+smaller ``EMBEDDING_DIMENSIONS`` copies every point into a new collection
+with Matryoshka-truncated vectors (no re-embedding), then repoints
+``QDRANT_COLLECTION`` at it through an alias and drops the old one. Growing
+the dimensions or switching models needs a re-ingest.
+
+With ``TENANT_ISOLATION=collection`` each tenant's collection is migrated the
+same way, one after another.
+"""
+import argparse
+import asyncio
+
+import structlog
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.models import (
+    CreateAlias,
+    CreateAliasOperation,
+    DeleteAlias,
+    DeleteAliasOperation,
+    Disabled,
+    PointStruct,
+    VectorParamsDiff,
+)
+
+from .adapters.embeddings import get_embeddings
+from .adapters.qdrant_store import tenant_collections
+from .adapters.storage_profiles import (
+    StorageProfile,
+    get_storage_profile,
+    profile_of,
+    quantization_config,
+    truncate,
+    vectors_config,
+)
+from .config import get_settings
+
+logger = structlog.get_logger()
+
+
+async def _resolve_alias(client: AsyncQdrantClient, name: str) -> str | None:
+    for alias in (await client.get_aliases()).aliases:
+        if alias.alias_name == name:
+            return alias.collection_name
+    return None
+
+
+async def _copy_truncated(
+    client: AsyncQdrantClient,
+    source: str,
+    target: str,
+    dimensions: int,
+    profile: StorageProfile,
+    batch_size: int,
+) -> int:
+    if await client.collection_exists(target):
+        # Left over from an interrupted run.
+        await client.delete_collection(target)
+    await client.create_collection(
+        collection_name=target,
+        vectors_config=vectors_config(dimensions, profile),
+        quantization_config=quantization_config(profile),
+    )
+
+    copied = 0
+    offset = None
+    while True:
+        records, offset = await client.scroll(
+            collection_name=source,
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True,
+        )
+        if records:
+            await client.upsert(
+                collection_name=target,
+                points=[
+                    PointStruct(id=r.id, vector=truncate(r.vector, dimensions), payload=r.payload)
+                    for r in records
+                ],
+            )
+            copied += len(records)
+            logger.info("Copied points", target=target, copied=copied)
+        if offset is None:
+            return copied
+
+
+async def migrate_storage(client: AsyncQdrantClient, dry_run: bool = False, batch_size: int = 256) -> None:
+    """Migrate ``QDRANT_COLLECTION`` and every per-tenant collection next to it."""
+    settings = get_settings()
+    name = settings.QDRANT_COLLECTION
+    profile = get_storage_profile(settings.QDRANT_STORAGE_PROFILE)
+    dimensions = get_embeddings().dimensions
+
+    # Listed whatever TENANT_ISOLATION is now, so none are left behind in the old format.
+    tenants = await tenant_collections(client, name)
+    for collection in [name, *sorted(tenants.values())]:
+        await _migrate_collection(client, collection, profile, dimensions, dry_run, batch_size)
+
+
+async def _migrate_collection(
+    client: AsyncQdrantClient,
+    name: str,
+    profile: StorageProfile,
+    dimensions: int,
+    dry_run: bool,
+    batch_size: int,
+) -> None:
+    if not await client.collection_exists(name):
+        logger.info("Collection does not exist yet; it will be created with the configured profile", name=name)
+        return
+
+    info = await client.get_collection(name)
+    size = info.config.params.vectors.size
+    current = profile_of(info)
+    plan = {"name": name, "from": f"{current}/{size}d", "to": f"{profile.name}/{dimensions}d"}
+
+    if size < dimensions:
+        raise SystemExit(
+            f"{name!r} holds {size}-d vectors; growing to {dimensions}-d needs a re-ingest "
+            f"into a new QDRANT_COLLECTION"
+        )
+
+    if size == dimensions:
+        if current == profile.name:
+            logger.info("Collection already matches the configured profile", **plan)
+            return
+        logger.info("Updating collection in place", dry_run=dry_run, **plan)
+        if not dry_run:
+            await client.update_collection(
+                collection_name=name,
+                vectors_config={"": VectorParamsDiff(on_disk=profile.on_disk)},
+                quantization_config=quantization_config(profile) or Disabled.DISABLED,
+            )
+        return
+
+    aliased = await _resolve_alias(client, name)
+    source = aliased or name
+    target = f"{name}_{dimensions}d_{profile.name}"
+    logger.info("Copying into a truncated collection", source=source, target=target, dry_run=dry_run, **plan)
+    if dry_run:
+        return
+
+    copied = await _copy_truncated(client, source, target, dimensions, profile, batch_size)
+    expected = (await client.count(source, exact=True)).count
+    if copied != expected:
+        raise SystemExit(f"Copied {copied} points but {source!r} holds {expected}; aborting before the swap")
+
+    # A real collection can't be aliased over, so it's dropped first; an
+    # existing alias is repointed in one atomic operation.
+    operations = [CreateAliasOperation(create_alias=CreateAlias(collection_name=target, alias_name=name))]
+    if aliased:
+        operations.insert(0, DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=name)))
+    else:
+        await client.delete_collection(source)
+    await client.update_collection_aliases(change_aliases_operations=operations)
+    if aliased:
+        await client.delete_collection(source)
+    logger.info("Migration complete", copied=copied, **plan)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="report the plan without changing anything")
+    parser.add_argument("--batch-size", type=int, default=256)
+    args = parser.parse_args()
+
+    client = AsyncQdrantClient(url=get_settings().QDRANT_URL)
+    try:
+        await migrate_storage(client, dry_run=args.dry_run, batch_size=args.batch_size)
+    finally:
+        await client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -3,12 +3,32 @@ from datetime import datetime
 from enum import Enum
 
 
+# Tenant of requests without an X-Tenant-ID header, and of data stored before tenancy.
+DEFAULT_TENANT = "default"
+
+# Largest top_k a retrieval request may ask for, per query
+MAX_TOP_K = 50
+
+
 class DocumentStatus(str, Enum):
     PROCESSING = "processing"
     READY = "ready"
     FAILED = "failed"
 
 
+class IngestStage(str, Enum):
+    QUEUED = "queued"
+    PARSING = "parsing"
+    EMBEDDING = "embedding"
+    DONE = "done"
+
+
+class RetrievalMode(str, Enum):
+    DENSE = "dense"
+    LEXICAL = "lexical"
+    HYBRID = "hybrid"
+
+
 class DocumentInfo(BaseModel):
     id: str
     filename: str
@@ -17,6 +37,44 @@ class DocumentInfo(BaseModel):
     file_size: int = 0
     created_at: datetime = Field(default_factory=datetime.utcnow)
     error: str | None = None
+    tenant_id: str = DEFAULT_TENANT
+
+    # Ingestion progress, published by the background worker
+    stage: IngestStage = IngestStage.QUEUED
+    pages_parsed: int = 0
+    chunks_embedded: int = 0
+    points_upserted: int = 0
+    # Chunks kept from the stored version, copied from another document, or deleted
+    chunks_unchanged: int = 0
+    chunks_reused: int = 0
+    chunks_removed: int = 0
+
+
+class DocumentCounts(BaseModel):
+    total: int
+    processing: int
+    ready: int
+    failed: int
+
+
+class IngestJob(BaseModel):
+    """Durable record of a queued ingestion, kept until the worker finishes it."""
+    doc_id: str
+    filename: str
+    path: str
+    attempts: int = 0
+    tenant_id: str = DEFAULT_TENANT
+    trace_id: str | None = None
+
+
+class SkippedFile(BaseModel):
+    filename: str
+    reason: str
+
+
+class BulkIngestResponse(BaseModel):
+    documents: list[DocumentInfo]
+    skipped: list[SkippedFile] = []
 
 
 class ChunkInfo(BaseModel):
@@ -26,12 +84,39 @@ class ChunkInfo(BaseModel):
     metadata: dict = {}
 
 
+class RetrieveFilter(BaseModel):
+    """Restrict a search to chunks matching any of the listed values per field."""
+    document_ids: list[str] | None = None
+    filenames: list[str] | None = None
+
+
 class RetrieveRequest(BaseModel):
     query: str
-    top_k: int = 5
+    top_k: int = Field(5, ge=1, le=MAX_TOP_K)
+    mode: RetrievalMode | None = None  # defaults to RETRIEVAL_MODE
+    filter: RetrieveFilter | None = None
 
 
 class RetrieveResponse(BaseModel):
     query: str
     chunks: list[dict]
     total_found: int
+
+
+class BatchQuery(BaseModel):
+    query: str
+    top_k: int | None = Field(None, ge=1, le=MAX_TOP_K)  # defaults to the batch's top_k
+    filter: RetrieveFilter | None = None
+
+
+class BatchRetrieveRequest(BaseModel):
+    queries: list[BatchQuery] = Field(min_length=1, max_length=256)
+    top_k: int = Field(5, ge=1, le=MAX_TOP_K)
+    mode: RetrievalMode | None = None
+    merge: bool = False  # also return one list deduplicated across queries
+    merge_top_k: int | None = Field(None, ge=1, le=MAX_TOP_K)
+
+
+class BatchRetrieveResponse(BaseModel):
+    results: list[RetrieveResponse]
+    merged: list[dict] | None = None
@@ -0,0 +1,91 @@
+"""Shared fixtures: in-process Redis, vector store and embeddings, so tests need no services."""
+import fakeredis
+import pytest
+
+from src.adapters import embeddings as embedding_backend, redis_store, vector_store
+from src.adapters.vector_store import chunk_point_id
+from src.config import get_settings
+from src.core import parse_pool
+
+
+class MemoryVectorStore:
+    """The parts of the vector store adapter that ingestion uses, kept in a dict."""
+
+    dimensions = 8
+
+    def __init__(self):
+        self.points: dict[str, dict] = {}
+
+    async def upsert_chunks(self, texts, embeddings, document_id, filename, tenant_id="default",
+                            chunk_indexes=None, start_index=0) -> int:
+        indexes = chunk_indexes or range(start_index, start_index + len(texts))
+        for text, index in zip(texts, indexes):
+            self.points[chunk_point_id(document_id, text)] = {
+                "document_id": document_id, "tenant_id": tenant_id, "filename": filename, "chunk_index": index,
+            }
+        return len(texts)
+
+    async def document_chunks(self, document_id, tenant_id="default") -> dict[str, dict]:
+        return {
+            point_id: {"chunk_index": p["chunk_index"], "filename": p["filename"]}
+            for point_id, p in self.points.items()
+            if p["document_id"] == document_id and p["tenant_id"] == tenant_id
+        }
+
+    async def count_chunks(self, tenant_id="default") -> int:
+        return sum(p["tenant_id"] == tenant_id for p in self.points.values())
+
+    async def update_chunks(self, payloads, tenant_id="default") -> None:
+        for point_id, fields in payloads.items():
+            if point_id in self.points:
+                self.points[point_id].update(fields)
+
+    async def vectors_by_content(self, hashes, tenant_id="default") -> dict:
+        return {}
+
+    async def delete_chunks(self, chunk_ids, tenant_id="default") -> None:
+        for point_id in chunk_ids:
+            self.points.pop(point_id, None)
+
+    async def delete_by_document(self, document_id, tenant_id="default") -> None:
+        for point_id in list(await self.document_chunks(document_id, tenant_id)):
+            del self.points[point_id]
+
+    async def ping(self) -> None:
+        pass
+
+
+class FakeEmbeddings:
+    model = "fake"
+    dimensions = MemoryVectorStore.dimensions
+
+    async def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        return [[1.0] * self.dimensions for _ in texts]
+
+
+@pytest.fixture
+def settings(tmp_path, monkeypatch):
+    monkeypatch.setenv("INGEST_SPOOL_DIR", str(tmp_path / "spool"))
+    monkeypatch.setenv("PARSE_PROCESSES", "1")
+    get_settings.cache_clear()
+    yield get_settings()
+    get_settings.cache_clear()
+
+
+@pytest.fixture
+def services(settings):
+    """Fakes installed in the adapter singletons; yields the vector store."""
+    store = MemoryVectorStore()
+    redis_store._redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+    embedding_backend._embeddings = FakeEmbeddings()
+    vector_store._store = store
+    yield store
+    redis_store._redis = None
+    embedding_backend._embeddings = None
+    vector_store._store = None
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _parse_pool():
+    yield
+    parse_pool.shutdown_process_pool()
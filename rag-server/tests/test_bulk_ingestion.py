@@ -0,0 +1,65 @@
+import asyncio
+import io
+import uuid
+
+import pytest
+
+from src.adapters.redis_store import get_document
+from src.core import bulk_ingestion
+from src.core.bulk_ingestion import BulkIngestionPipeline
+from src.models.document import DocumentInfo, DocumentStatus, IngestStage
+
+
+def _text(name: str, paragraphs: int = 40) -> bytes:
+    return "\n\n".join(f"{name} paragraph {i} " + "word " * 120 for i in range(paragraphs)).encode()
+
+
+async def _ingest(pipeline: BulkIngestionPipeline, names: list[str]) -> dict[str, DocumentInfo]:
+    docs = {}
+    for name in names:
+        doc = DocumentInfo(id=str(uuid.uuid4()), filename=f"{name}.txt")
+        await pipeline.submit(doc, io.BytesIO(_text(name)))
+        docs[name] = doc
+    settled = pipeline.documents_ready + pipeline.documents_failed
+
+    async def wait():
+        while pipeline.documents_ready + pipeline.documents_failed < settled + len(names):
+            await asyncio.sleep(0.02)
+
+    await asyncio.wait_for(wait(), timeout=60)
+    return {name: await get_document(doc.id) for name, doc in docs.items()}
+
+
+@pytest.mark.parametrize("failing_write", ["complete", "progress"])
+def test_redis_error_fails_one_document_and_pipeline_keeps_draining(services, monkeypatch, failing_write):
+    """A registry write that raises in the embed/upsert stages fails that document only."""
+    update = bulk_ingestion.update_document_fields
+
+    async def flaky_update(doc, *fields):
+        if doc.filename == "bad.txt" and doc.status != DocumentStatus.FAILED:
+            if failing_write == "complete" and doc.status == DocumentStatus.READY:
+                raise ConnectionError("redis went away")
+            if failing_write == "progress" and doc.stage == IngestStage.EMBEDDING:
+                raise ConnectionError("redis went away")
+        await update(doc, *fields)
+
+    monkeypatch.setattr(bulk_ingestion, "update_document_fields", flaky_update)
+
+    async def run():
+        pipeline = BulkIngestionPipeline(parsers=2, queue_chunks=8, linger_s=0.01, embed_in_flight=2)
+        pipeline.start()
+        try:
+            first = await _ingest(pipeline, ["good-1", "bad", "good-2"])
+            # The stage workers survived: a later document still goes through.
+            later = await _ingest(pipeline, ["good-3"])
+        finally:
+            await pipeline.stop()
+        return pipeline, first | later
+
+    pipeline, docs = asyncio.run(run())
+
+    assert docs["bad"].status == DocumentStatus.FAILED
+    assert "redis went away" in docs["bad"].error
+    assert all(docs[n].status == DocumentStatus.READY for n in ("good-1", "good-2", "good-3"))
+    assert pipeline._reserved == {}
+    assert not any(p["document_id"] == docs["bad"].id for p in services.points.values())
@@ -0,0 +1,53 @@
+import asyncio
+import time
+
+from src.adapters.embedding_scheduler import EmbeddingScheduler, RateLimiter
+
+
+def _scheduler(embed_batch, rate_limiter=None) -> EmbeddingScheduler:
+    return EmbeddingScheduler(
+        embed_batch,
+        batch_tokens=10,
+        batch_max_items=1,
+        max_in_flight=2,
+        rate_limiter=rate_limiter or RateLimiter(rpm=1_000_000, tpm=1_000_000_000),
+        max_retries=0,
+        query_max_in_flight=1,
+    )
+
+
+def test_query_does_not_wait_for_document_batches():
+    async def embed_batch(batch):
+        await asyncio.sleep(0.2 if batch[0].startswith("doc") else 0)
+        return [[1.0] for _ in batch]
+
+    async def run():
+        scheduler = _scheduler(embed_batch)
+        documents = asyncio.create_task(scheduler.embed([f"doc {i}" for i in range(10)]))
+        await asyncio.sleep(0.01)
+        started = time.monotonic()
+        await scheduler.embed(["query"], priority=True)
+        elapsed = time.monotonic() - started
+        await documents
+        return elapsed
+
+    assert asyncio.run(run()) < 0.1
+
+
+def test_priority_callers_take_the_rate_budget_first():
+    async def run():
+        # One request a second once the initial budget is spent.
+        limiter = RateLimiter(rpm=60, tpm=1_000_000)
+        limiter._requests = 0.0
+        order = []
+
+        async def acquire(name, priority):
+            await limiter.acquire(1, priority)
+            order.append(name)
+
+        document = asyncio.create_task(acquire("document", False))
+        await asyncio.sleep(0.5)
+        await asyncio.gather(document, acquire("query", True))
+        return order
+
+    assert asyncio.run(run()) == ["query", "document"]
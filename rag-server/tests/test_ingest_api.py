@@ -0,0 +1,48 @@
+import asyncio
+import uuid
+
+import httpx
+
+from src.adapters.redis_store import get_document, save_document
+from src.core import ingestion
+from src.main import app
+from src.models.document import DocumentInfo, DocumentStatus
+
+
+def test_concurrent_updates_of_one_document_claim_it_once(services, monkeypatch):
+    """Only one of several simultaneous PUTs is accepted; the rest get 409."""
+    monkeypatch.setattr(ingestion, "_queue", None)
+
+    async def run():
+        doc = DocumentInfo(id=str(uuid.uuid4()), filename="notes.txt", status=DocumentStatus.READY, chunks=3)
+        await save_document(doc)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            responses = await asyncio.gather(*(
+                client.put(f"/documents/{doc.id}", files={"file": (f"notes-{i}.txt", b"new text")})
+                for i in range(4)
+            ))
+        return doc, responses, await get_document(doc.id)
+
+    doc, responses, stored = asyncio.run(run())
+
+    assert sorted(r.status_code for r in responses) == [202, 409, 409, 409]
+    accepted = next(r for r in responses if r.status_code == 202).json()
+    assert stored.status == DocumentStatus.PROCESSING
+    assert stored.filename == accepted["filename"]
+    assert ingestion._queue.depth == 1
+
+
+def test_update_rejected_by_a_full_queue_leaves_the_document_updatable(services, monkeypatch):
+    monkeypatch.setattr(ingestion, "_queue", ingestion.IngestionQueue(workers=1, max_size=0))
+
+    async def run():
+        doc = DocumentInfo(id=str(uuid.uuid4()), filename="notes.txt", status=DocumentStatus.READY, chunks=3)
+        await save_document(doc)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.put(f"/documents/{doc.id}", files={"file": ("notes.txt", b"new text")})
+        return response, await get_document(doc.id)
+
+    response, stored = asyncio.run(run())
+
+    assert response.status_code == 503
+    assert stored.status == DocumentStatus.READY
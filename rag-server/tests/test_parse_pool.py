@@ -0,0 +1,55 @@
+import pytest
+from pypdf import PdfWriter
+from pypdf.generic import ContentStream, DictionaryObject, NameObject
+
+from src.core import parse_pool
+from src.core.parse_pool import Segment, process_segment
+
+
+def _write_pdf(path, pages: int) -> None:
+    font = DictionaryObject({
+        NameObject("/Type"): NameObject("/Font"),
+        NameObject("/Subtype"): NameObject("/Type1"),
+        NameObject("/BaseFont"): NameObject("/Helvetica"),
+    })
+    writer = PdfWriter()
+    for n in range(pages):
+        page = writer.add_blank_page(612, 792)
+        page[NameObject("/Resources")] = DictionaryObject({
+            NameObject("/Font"): DictionaryObject({NameObject("/F1"): font}),
+        })
+        content = ContentStream(None, None)
+        content.set_data(f"BT /F1 12 Tf 40 760 Td (Page {n} of the report) Tj ET".encode())
+        page.replace_contents(content)
+    with open(path, "wb") as f:
+        writer.write(f)
+
+
+@pytest.fixture
+def pdf(tmp_path):
+    path = tmp_path / "report.pdf"
+    _write_pdf(path, 4)
+    yield str(path)
+    parse_pool._close_worker_pdf()
+
+
+def test_reader_is_reused_without_holding_the_file_between_segments(pdf):
+    first = process_segment(pdf, "report.pdf", Segment(0, 2))
+    reader = parse_pool._pdf[1]
+    assert reader.stream.closed
+
+    last = process_segment(pdf, "report.pdf", Segment(2, 4))
+    assert parse_pool._pdf is None  # dropped after the last segment
+    assert reader.stream.closed
+    assert (first.sections, last.sections) == (2, 2)
+
+
+def test_reader_is_dropped_when_a_segment_fails(pdf, monkeypatch):
+    def broken(sections):
+        next(iter(sections))
+        raise ValueError("chunker failed")
+
+    monkeypatch.setattr(parse_pool, "iter_chunks", broken)
+    with pytest.raises(ValueError):
+        process_segment(pdf, "report.pdf", Segment(0, 2))
+    assert parse_pool._pdf is None
@@ -0,0 +1,66 @@
+import asyncio
+import uuid
+
+import pytest
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.models import PointStruct
+
+from src.adapters import lexical_index, qdrant_store
+from src.adapters.lexical_index import get_lexical_index
+from src.adapters.qdrant_store import QdrantVectorStore
+from src.adapters.redis_store import bump_corpus_version
+
+
+@pytest.fixture
+def store(services, monkeypatch):
+    monkeypatch.setattr(lexical_index, "_indexes", {})
+    monkeypatch.setattr(lexical_index, "_loaded", False)
+    monkeypatch.setattr(qdrant_store, "AsyncQdrantClient", lambda **kwargs: AsyncQdrantClient(":memory:"))
+    return QdrantVectorStore()
+
+
+async def _write_from_another_replica(store: QdrantVectorStore, text: str, document_id: str) -> None:
+    """What another replica's upsert leaves behind: the point, and a bumped shared version."""
+    await store.client.upsert(store.collection_name, points=[PointStruct(
+        id=str(uuid.uuid4()),
+        vector=[1.0] * store.dimensions,
+        payload={"text": text, "document_id": document_id, "filename": "b.txt", "chunk_index": 0,
+                 "tenant_id": "default"},
+    )])
+    await bump_corpus_version()
+
+
+def test_writes_by_another_replica_refresh_the_lexical_index(store):
+    async def run():
+        await store.upsert_chunks(["alpha report"], [[1.0] * 8], "doc-a", "a.txt")
+        await store.load_lexical_index()
+        before = await store.current_corpus_version()
+
+        await _write_from_another_replica(store, "order AB-1234 shipped", "doc-b")
+        assert not get_lexical_index().search("AB-1234", 5)
+
+        after = await store.current_corpus_version()
+        await store._lexical_refresh
+        hits = get_lexical_index().search("AB-1234", 5)
+        await store.close()
+        return before, after, hits
+
+    before, after, hits = asyncio.run(run())
+
+    assert after > before  # so result-cache entries from before are not reused
+    assert [h["document_id"] for h in hits] == ["doc-b"]
+
+
+def test_own_writes_keep_the_lexical_index_current(store):
+    async def run():
+        await store.load_lexical_index()
+        await store.upsert_chunks(["alpha report"], [[1.0] * 8], "doc-a", "a.txt")
+        await store.current_corpus_version()
+        hits = get_lexical_index().search("alpha", 5)
+        await store.close()
+        return store._lexical_refresh, hits
+
+    refresh, hits = asyncio.run(run())
+
+    assert refresh is None
+    assert [h["document_id"] for h in hits] == ["doc-a"]
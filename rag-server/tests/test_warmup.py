@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+from src.config import get_settings
+from src.core import warmup
+
+
+@pytest.fixture
+def embedder(services, monkeypatch):
+    """Counts embedder pings; set ``failing`` to make them raise."""
+    monkeypatch.setattr(warmup, "_report", None)
+    monkeypatch.setattr(warmup, "_checked_at", {})
+
+    class Embedder:
+        calls = 0
+        failing = False
+
+    async def ping():
+        Embedder.calls += 1
+        if Embedder.failing:
+            raise ConnectionError("embedding API unreachable")
+
+    monkeypatch.setitem(warmup.CHECKS, "embedder", ping)
+    return Embedder
+
+
+def test_ready_probes_do_not_call_the_embedder(embedder):
+    async def run():
+        await warmup.warm_up()
+        warmed_with = embedder.calls
+        results = [await warmup.check_readiness() for _ in range(5)]
+        return warmed_with, results
+
+    warmed_with, results = asyncio.run(run())
+
+    assert embedder.calls == warmed_with
+    assert all(ready for ready, _ in results)
+    assert set(results[0][1]) == {"redis", "vector_store", "embedder"}
+
+
+def test_failed_embedder_is_rechecked_until_it_recovers(embedder, monkeypatch):
+    monkeypatch.setenv("READY_RECHECK_S", "0")
+    get_settings.cache_clear()
+
+    async def run():
+        embedder.failing = True
+        await warmup.warm_up()
+        first, checks = await warmup.check_readiness()
+        embedder.failing = False
+        second, _ = await warmup.check_readiness()
+        calls = embedder.calls
+        await warmup.check_readiness()
+        return first, checks, second, calls
+
+    first, checks, second, calls = asyncio.run(run())
+
+    assert not first and "unreachable" in checks["embedder"]["error"]
+    assert second
+    assert embedder.calls == calls  # healthy again, so no longer probed
@@ -15,6 +15,8 @@ const envSchema = z.object({
     RAG_SERVER_URL: z.string().url().default('http://localhost:8001'),
     CLIENT_URL: z.string().url().default('http://localhost:5173'),
     GATEWAY_PORT: z.coerce.number().default(3000),
+    // Tenant the gateway's document routes act as; unset uses the RAG server's default tenant
+    GATEWAY_TENANT_ID: z.string().min(1).optional(),
 
     // Redis
     REDIS_URL: z.string().default('redis://localhost:6379'),
@@ -1,5 +1,5 @@
 import type { FastifyInstance } from 'fastify';
-import { proxyUploadToRAG, listDocuments, deleteDocument } from '../services/document.service.js';
+import { proxyUploadToRAG, listDocuments, deleteDocument, type ListDocumentsQuery } from '../services/document.service.js';
 
 const ALLOWED_TYPES = [
     'application/pdf',
@@ -33,7 +33,8 @@ export async function documentRoutes(app: FastifyInstance) {
             const buffer = await data.toBuffer();
             const result = await proxyUploadToRAG(buffer, data.filename, data.mimetype);
 
-            return reply.status(201).send(result);
+            // RAG server accepts the upload and ingests it in the background
+            return reply.status(202).send(result);
         } catch (error) {
             request.log.error(error, 'Document upload failed');
             return reply.status(500).send({
@@ -43,11 +44,11 @@ export async function documentRoutes(app: FastifyInstance) {
         }
     });
 
-    // GET /api/documents — List documents
-    app.get('/documents', async (_request, reply) => {
+    // GET /api/documents — List documents, a page at a time (?limit, ?cursor, ?status, ?order)
+    app.get('/documents', async (request, reply) => {
         try {
-            const documents = await listDocuments();
-            return reply.send({ documents });
+            const page = await listDocuments(request.query as ListDocumentsQuery);
+            return reply.send(page);
         } catch (error) {
             return reply.status(503).send({
                 error: 'RAG server unavailable',
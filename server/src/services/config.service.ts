@@ -2,6 +2,8 @@ import Redis from 'ioredis';
 import { config } from '../config.js';
 
 const PROMPT_KEY = 'voice-ai:system-prompt';
+// Voice agent workers cache the prompt and apply edits pushed on this channel, live calls included.
+const PROMPT_CHANNEL = 'voice-ai:system-prompt:updated';
 const DEFAULT_PROMPT = `You are a helpful AI assistant that answers questions using the context provided from uploaded documents.
 
 When answering:
@@ -42,7 +44,7 @@ export async function getSystemPrompt(): Promise<string> {
 }
 
 export async function setSystemPrompt(prompt: string): Promise<void> {
-    await getRedis().set(PROMPT_KEY, prompt);
+    await getRedis().multi().set(PROMPT_KEY, prompt).publish(PROMPT_CHANNEL, prompt).exec();
 }
 
 export function getDefaultPrompt(): string {
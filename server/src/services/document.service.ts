@@ -8,6 +8,13 @@ export interface DocumentInfo {
     createdAt: string;
 }
 
+// The RAG server scopes documents to the X-Tenant-ID header; without one they
+// belong to its default tenant. Until the gateway authenticates users, the tenant
+// comes from its own config, never from the client.
+function tenantHeaders(): Record<string, string> {
+    return config.GATEWAY_TENANT_ID ? { 'X-Tenant-ID': config.GATEWAY_TENANT_ID } : {};
+}
+
 export async function proxyUploadToRAG(
     fileBuffer: Buffer,
     filename: string,
@@ -19,6 +26,7 @@ export async function proxyUploadToRAG(
 
     const response = await fetch(`${config.RAG_SERVER_URL}/ingest`, {
         method: 'POST',
+        headers: tenantHeaders(),
         body: formData,
     });
 
@@ -30,19 +38,44 @@ export async function proxyUploadToRAG(
     return response.json() as Promise<DocumentInfo>;
 }
 
-export async function listDocuments(): Promise<DocumentInfo[]> {
-    const response = await fetch(`${config.RAG_SERVER_URL}/documents`);
+export interface DocumentPage {
+    documents: DocumentInfo[];
+    nextCursor: string | null;
+    total: number;
+}
+
+export interface ListDocumentsQuery {
+    limit?: string;
+    cursor?: string;
+    status?: string;
+    order?: string;
+}
+
+export async function listDocuments(query: ListDocumentsQuery = {}): Promise<DocumentPage> {
+    const params = new URLSearchParams();
+    for (const key of ['limit', 'cursor', 'status', 'order'] as const) {
+        if (query[key]) params.set(key, query[key]);
+    }
+    const qs = params.toString();
+    const response = await fetch(`${config.RAG_SERVER_URL}/documents${qs ? `?${qs}` : ''}`, {
+        headers: tenantHeaders(),
+    });
 
     if (!response.ok) {
         throw new Error(`RAG server error: ${response.status}`);
     }
 
-    return response.json() as Promise<DocumentInfo[]>;
+    return {
+        documents: (await response.json()) as DocumentInfo[],
+        nextCursor: response.headers.get('x-next-cursor'),
+        total: Number(response.headers.get('x-total-count') ?? 0),
+    };
 }
 
 export async function deleteDocument(id: string): Promise<void> {
     const response = await fetch(`${config.RAG_SERVER_URL}/documents/${id}`, {
         method: 'DELETE',
+        headers: tenantHeaders(),
     });
 
     if (!response.ok) {
@@ -0,0 +1,124 @@
+"""Call setup — the system prompt step between a participant joining and the session starting.
+
+  before  what ``entrypoint`` used to do: a new ``httpx.AsyncClient`` per
+          call, GET ``/api/prompt`` from the gateway, close the client
+  after   the worker's ``PromptCache``, loaded in prewarm: a memory read
+
+The stand-in gateway answers after ``--gateway-ms`` and charges
+``--handshake-ms`` on every new connection (TCP + TLS to a gateway on
+another host). The cache runs against fakeredis; the ``push`` row is the
+time from the gateway publishing an edit to a live session's listener
+running on its event loop, which the old code never did (a running call
+kept the prompt it started with).
+
+Everything else in call setup (room connect, session start) is unchanged;
+in production the agent reports the whole join-to-ready time as the
+``call_setup`` stage of ``voice_agent_stage_duration_seconds``.
+
+Usage (from voice-agent/, needs fakeredis):
+    python -m benchmarks.call_setup --calls 50 --handshake-ms 30 --gateway-ms 5
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import time
+
+import fakeredis
+import httpx
+import structlog
+
+from src.rag.prompt_cache import PROMPT_CHANNEL, PROMPT_KEY, PromptCache
+
+_PROMPT = "You are a support agent for Acme pumps. Answer from the manuals."
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))]
+
+
+async def _serve_gateway(handshake_s: float, latency_s: float) -> asyncio.Server:
+    body = json.dumps({"prompt": _PROMPT}).encode()
+    response = b"HTTP/1.1 200 OK\r\ncontent-type: application/json\r\ncontent-length: %d\r\n\r\n%s" % (len(body), body)
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        await asyncio.sleep(handshake_s)
+        try:
+            while await reader.readuntil(b"\r\n\r\n"):
+                await asyncio.sleep(latency_s)
+                writer.write(response)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, "127.0.0.1", 0)
+
+
+async def _fetch_per_call(url: str) -> str:
+    """The pre-cache ``fetch_system_prompt``."""
+    async with httpx.AsyncClient(timeout=5.0) as client:
+        response = await client.get(f"{url}/api/prompt")
+        response.raise_for_status()
+        return response.json()["prompt"]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--handshake-ms", type=float, default=30)
+    parser.add_argument("--gateway-ms", type=float, default=5)
+    parser.add_argument("--edits", type=int, default=20)
+    args = parser.parse_args()
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    gateway = await _serve_gateway(args.handshake_ms / 1000, args.gateway_ms / 1000)
+    host, port = gateway.sockets[0].getsockname()[:2]
+    url = f"http://{host}:{port}"
+
+    server = fakeredis.FakeServer()
+    publisher = fakeredis.FakeRedis(server=server, decode_responses=True)
+    publisher.set(PROMPT_KEY, _PROMPT)
+    cache = PromptCache(fakeredis.FakeRedis(server=server, decode_responses=True))
+    start = time.perf_counter()
+    cache.start(wait_s=5.0)  # prewarm
+    prewarm_s = time.perf_counter() - start
+
+    before, after = [], []
+    for _ in range(args.calls):
+        start = time.perf_counter()
+        await _fetch_per_call(url)
+        before.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        if not cache.start():
+            await asyncio.to_thread(cache.start, 5.0)
+        assert cache.prompt == _PROMPT
+        after.append(time.perf_counter() - start)
+
+    received: asyncio.Queue[float] = asyncio.Queue()
+    remove = cache.add_listener(lambda prompt: received.put_nowait(time.perf_counter()))
+    push = []
+    for i in range(args.edits):
+        prompt = f"{_PROMPT} (edit {i})"
+        start = time.perf_counter()
+        publisher.set(PROMPT_KEY, prompt)
+        publisher.publish(PROMPT_CHANNEL, prompt)
+        push.append(await asyncio.wait_for(received.get(), 5.0) - start)
+    remove()
+    cache.close()
+    gateway.close()
+
+    print(f"{args.calls} calls, gateway {args.gateway_ms:g} ms + {args.handshake_ms:g} ms per new connection; "
+          f"prewarm load {prewarm_s * 1000:.1f} ms")
+    print(f"{'prompt step':<12}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, samples in (("before", before), ("after", after), ("push", push)):
+        print(f"{name:<12}{_percentile(samples, 50) * 1000:>10.3f}{_percentile(samples, 95) * 1000:>10.3f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,172 @@
+"""Voice turn latency — the part of a turn spent in ``VoiceAIAgent.on_user_turn_completed``.
+
+That hook runs between end-of-turn detection and the LLM call, so every
+millisecond in it lands on time to first audio. Each of ``--concurrency``
+simulated sessions plays scripted turns: words arrive as interim
+transcripts every ``--word-ms`` (so speculative prefetch runs as it would
+live), then a final transcript, then ``--eou-ms`` of end-of-utterance
+delay before the hook is timed. Every few turns is a short follow-up that
+the session's retrieval memory can answer without /retrieve.
+
+Needs a RAG server at ``RAG_SERVER_URL``; rag-server's ``benchmarks.e2e``
+starts one with local stand-ins and runs this with ``--json``.
+
+Usage (from voice-agent/):
+    python -m benchmarks.turn_latency --turns 40 --concurrency 4
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import random
+import time
+from collections import defaultdict
+from types import SimpleNamespace
+from typing import NamedTuple
+
+import structlog
+from livekit.agents import llm
+
+from src import metrics
+from src.agent import VoiceAIAgent
+from src.config import get_settings
+from src.rag.prefetch import SpeculativeRetriever
+from src.rag.retriever import close_client
+
+_QUESTIONS = (
+    "what is the refund policy for order {code}",
+    "can you check the shipping status of {code}",
+    "how long is the warranty on item {code}",
+    "why was invoice {code} charged twice",
+)
+_FOLLOW_UPS = ("and the refund policy", "what about shipping", "is that the warranty")
+
+
+class _Stage(NamedTuple):
+    samples: list[float]
+
+    def observe(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+
+class StageSamples:
+    """Stand-in for ``src.metrics.STAGE_SECONDS`` that keeps every sample for exact percentiles."""
+
+    def __init__(self):
+        self.samples: dict[str, list[float]] = defaultdict(list)
+
+    def labels(self, stage: str) -> _Stage:
+        return _Stage(self.samples[stage])
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))]
+
+
+def summarize(samples: list[float]) -> dict:
+    return {
+        "n": len(samples),
+        **{f"p{p}_ms": round(percentile(samples, p) * 1000, 3) for p in (50, 95, 99)},
+    }
+
+
+def _script(turns: int, rng: random.Random) -> list[str]:
+    script = []
+    for i in range(turns):
+        if i % 4 == 3:
+            script.append(rng.choice(_FOLLOW_UPS))
+        else:
+            script.append(rng.choice(_QUESTIONS).format(code=f"AB-{rng.randrange(10_000):04d}"))
+    return script
+
+
+async def _session(script: list[str], args, latencies: list[float]) -> tuple[SpeculativeRetriever | None, dict]:
+    settings = get_settings()
+    prefetcher = None
+    if settings.RAG_PREFETCH_ENABLED:
+        prefetcher = SpeculativeRetriever(
+            top_k=settings.RAG_TOP_K,
+            debounce_s=settings.RAG_PREFETCH_DEBOUNCE_MS / 1000,
+            min_words=settings.RAG_PREFETCH_MIN_WORDS,
+            match_ratio=settings.RAG_PREFETCH_MATCH_RATIO,
+        )
+    # No room participant: the agent's data-channel publishes become no-ops.
+    job_ctx = SimpleNamespace(room=SimpleNamespace(local_participant=None))
+    agent = VoiceAIAgent(instructions="benchmark", job_ctx=job_ctx, prefetcher=prefetcher)
+    chat_ctx = llm.ChatContext()
+
+    for text in script:
+        words = text.split()
+        for n in range(1, len(words) + 1):
+            await asyncio.sleep(args.word_ms / 1000)
+            if prefetcher:
+                # Same as the session's user_input_transcribed handler.
+                with structlog.contextvars.bound_contextvars(trace_id=agent.turn_trace_id()):
+                    prefetcher.on_transcript(" ".join(words[:n]), n == len(words))
+        await asyncio.sleep(args.eou_ms / 1000)
+
+        message = chat_ctx.add_message(role="user", content=text)
+        start = time.perf_counter()
+        await agent.on_user_turn_completed(chat_ctx, message)
+        latencies.append(time.perf_counter() - start)
+        chat_ctx.add_message(role="assistant", content="Sure, here is what I found.")
+    return prefetcher, agent.packer.stats()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=40, help="across all sessions")
+    parser.add_argument("--concurrency", type=int, default=1, help="simultaneous sessions")
+    parser.add_argument("--word-ms", type=float, default=80)
+    parser.add_argument("--eou-ms", type=float, default=300)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+    samples = StageSamples()
+    metrics.STAGE_SECONDS = samples
+    rng = random.Random(0)
+    per_session = max(1, args.turns // args.concurrency)
+    latencies: list[float] = []
+    start = time.perf_counter()
+    try:
+        sessions = await asyncio.gather(*(
+            _session(_script(per_session, rng), args, latencies) for _ in range(args.concurrency)
+        ))
+    finally:
+        await close_client()
+    elapsed = time.perf_counter() - start
+
+    prefetchers = [p for p, _ in sessions if p]
+    packing = [stats for _, stats in sessions]
+    turns = sum(p.turns for p in prefetchers)
+    result = {
+        "benchmark": "turn_latency",
+        "sessions": args.concurrency,
+        "turns": len(latencies),
+        "turns_per_s": round(len(latencies) / elapsed, 2),
+        "user_turn_completed": summarize(latencies),
+        "stages": {stage: summarize(values) for stage, values in sorted(samples.samples.items())},
+        "prefetch_hit_rate": round(sum(p.hits for p in prefetchers) / turns, 3) if turns else None,
+        # What reaches the LLM's prefill, before and after context packing.
+        "retrieved_tokens": sum(s["retrieved_tokens"] for s in packing),
+        "packed_tokens": sum(s["packed_tokens"] for s in packing),
+    }
+    if args.json:
+        print(json.dumps(result))
+    else:
+        print(f"{len(latencies)} turns over {args.concurrency} sessions, "
+              f"prefetch hit rate {result['prefetch_hit_rate']}, "
+              f"context tokens {result['retrieved_tokens']} retrieved -> {result['packed_tokens']} packed")
+        print(f"{'stage':<22}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        for name, row in {"user_turn_completed": result["user_turn_completed"], **result["stages"]}.items():
+            print(f"{name:<22}{row['n']:>6}{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}{row['p99_ms']:>10.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -2,9 +2,12 @@ import logging
 import json
 import asyncio
 import os
+import time
+import uuid
 from pathlib import Path
 from typing import AsyncIterable
 
+import structlog
 from dotenv import load_dotenv
 from livekit import rtc
 from livekit.agents import (
@@ -16,12 +19,16 @@ from livekit.agents import (
     cli,
     llm,
 )
-from livekit.agents.voice import AgentSession, UserInputTranscribedEvent
+from livekit.agents.voice import AgentSession, MetricsCollectedEvent, UserInputTranscribedEvent
 from livekit.plugins import cartesia, openai, silero
 
 from src.config import get_settings
-from src.rag.retriever import retrieve_rag_context, close_client
-from src.rag.prompt_builder import fetch_system_prompt
+from src.metrics import RAG_TURNS, observe_stage, record_rss, record_session_metrics
+from src.rag.retriever import retrieve_rag_context, close_client, warm_client
+from src.rag.prefetch import SpeculativeRetriever
+from src.rag.context_packer import ContextPacker
+from src.rag.session_memory import RetrievalMemory
+from src.rag.prompt_cache import get_prompt_cache
 
 _env_path = Path(__file__).resolve().parent.parent.parent / ".env"
 load_dotenv(_env_path)
@@ -35,6 +42,13 @@ def _on_publish_done(task: asyncio.Task) -> None:
         logger.error("publish_data failed: %s", task.exception())
 
 
+def _on_instructions_updated(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Could not apply the updated system prompt: %s", task.exception())
+    elif not task.cancelled():
+        logger.info("Applied the updated system prompt to the live session")
+
+
 def _publish(room: rtc.Room, payload: dict) -> None:
     """Fire-and-forget publish a JSON payload to all participants via data channel."""
     if not room.local_participant:
@@ -47,9 +61,31 @@ def _publish(room: rtc.Room, payload: dict) -> None:
 
 
 class VoiceAIAgent(Agent):
-    def __init__(self, *args, job_ctx: JobContext, **kwargs):
+    def __init__(
+        self,
+        *args,
+        job_ctx: JobContext,
+        prefetcher: SpeculativeRetriever | None = None,
+        **kwargs,
+    ):
         super().__init__(*args, **kwargs)
         self.job_ctx = job_ctx
+        self.prefetcher = prefetcher
+        self.memory = RetrievalMemory(follow_up_max_words=get_settings().RAG_FOLLOW_UP_MAX_WORDS)
+        self.packer = ContextPacker(budget_tokens=get_settings().RAG_CONTEXT_BUDGET_TOKENS)
+        self._turn_completed_at: float | None = None
+        self._trace_id: str | None = None
+        self._completed_trace_id: str | None = None
+
+    def turn_trace_id(self) -> str:
+        """Trace id of the turn in progress, started by its first transcript.
+
+        Bound into structlog's context around the turn's RAG calls, prefetches
+        included, and sent to the RAG server with each of them.
+        """
+        if self._trace_id is None:
+            self._trace_id = uuid.uuid4().hex[:16]
+        return self._trace_id
 
     async def on_user_turn_completed(
         self, turn_ctx: llm.ChatContext, new_message: llm.ChatMessage
@@ -66,7 +102,12 @@ class VoiceAIAgent(Agent):
         if not user_text or len(user_text.strip()) < 2:
             return
 
-        logger.info("User turn: %s", user_text)
+        trace_id = self.turn_trace_id()
+        # The next transcript belongs to the next turn.
+        self._trace_id = None
+        logger.info("User turn [trace %s]: %s", trace_id, user_text)
+        self._turn_completed_at = time.perf_counter()
+        self._completed_trace_id = trace_id
 
         # ── 1. Send user transcript to frontend ──────────────────────
         _publish(self.job_ctx.room, {
@@ -78,15 +119,35 @@ class VoiceAIAgent(Agent):
 
         # ── 2. RAG retrieval ─────────────────────────────────────────
         try:
-            rag_chunks = await retrieve_rag_context(user_text, top_k=3)
+            rag_started = time.perf_counter()
+            rag_chunks = self.memory.follow_up_chunks(user_text)
+            if rag_chunks is not None:
+                logger.info("RAG: follow-up, reusing %d chunks from last turn", len(rag_chunks))
+                RAG_TURNS.labels("follow_up").inc()
+                if self.prefetcher:
+                    self.prefetcher.reset()
+            else:
+                with structlog.contextvars.bound_contextvars(trace_id=trace_id):
+                    if self.prefetcher:
+                        rag_chunks = await self.prefetcher.retrieve(user_text)
+                    else:
+                        RAG_TURNS.labels("retrieve").inc()
+                        rag_chunks = await retrieve_rag_context(user_text, top_k=get_settings().RAG_TOP_K)
+            observe_stage("rag", time.perf_counter() - rag_started)
+
             if rag_chunks:
                 logger.info("RAG: %d chunks retrieved", len(rag_chunks))
-                context_str = "\n".join([c.get("text", "") for c in rag_chunks])
-                rag_header = (
-                    f"--- KNOWLEDGE BASE CONTEXT ---\n"
-                    f"{context_str}\n"
-                    f"----------------------------\n\n"
+                # Overlapping neighbours merged, repeats dropped, cut to the token budget
+                passages, packing = self.packer.pack(rag_chunks)
+                # Chunks already in the chat context are cited by label, not pasted again
+                rag_header, usage = self.memory.build_context(
+                    user_text,
+                    passages,
+                    message_id=new_message.id,
+                    live_ids={item.id for item in turn_ctx.items},
                 )
+                usage.update(packing)
+                logger.info("RAG context usage: %s", usage)
                 if isinstance(new_message.content, list):
                     new_message.content = [f"{rag_header}User Question: {user_text}"]
                 else:
@@ -98,6 +159,7 @@ class VoiceAIAgent(Agent):
                     "sources": rag_chunks,
                     "query": user_text,
                 })
+                _publish(self.job_ctx.room, {"type": "rag_usage", **usage})
             else:
                 logger.debug("RAG: no relevant chunks found")
         except Exception as e:
@@ -121,6 +183,17 @@ class VoiceAIAgent(Agent):
 
         # Stream audio frames as normal, but collect text chunks in parallel
         async for frame in super().tts_node(tee(text), model_settings):
+            if self._turn_completed_at is not None:
+                ttfa = time.perf_counter() - self._turn_completed_at
+                ttfa_ms = ttfa * 1000
+                self._turn_completed_at = None
+                observe_stage("first_audio", ttfa)
+                logger.info(
+                    "Time to first audio [trace %s]: %.0f ms (RAG prefetch %s)",
+                    self._completed_trace_id,
+                    ttfa_ms,
+                    self.prefetcher.stats() if self.prefetcher else "off",
+                )
             yield frame
 
         # After all frames are yielded, send the full agent response text
@@ -135,59 +208,140 @@ class VoiceAIAgent(Agent):
             })
 
 
-async def entrypoint(ctx: JobContext):
-    logger.info("Entrypoint started for room: %s", ctx.room.name)
-
+def _speech_plugins() -> dict:
     oai_key = os.getenv("OPENAI_API_KEY")
     cart_key = os.getenv("CARTESIA_API_KEY")
     logger.info("API keys — openai=%s cartesia=%s", bool(oai_key), bool(cart_key))
+    return {
+        "stt": openai.STT(model="gpt-4o-mini-transcribe", api_key=oai_key, language="en"),
+        "llm": openai.LLM(model="gpt-4o", api_key=oai_key),
+        "tts": cartesia.TTS(model="sonic-2", api_key=cart_key),
+    }
+
+
+async def entrypoint(ctx: JobContext):
+    logger.info("Entrypoint started for room: %s", ctx.room.name)
+
+    # Built in prewarm. A process that runs more than one job (thread executor in dev)
+    # builds fresh ones: their connection pools belong to the first job's event loop.
+    plugins = ctx.proc.userdata.pop("plugins", None) or _speech_plugins()
+    vad = ctx.proc.userdata.get("vad") or silero.VAD.load()
+    # Open the STT/LLM/TTS and RAG connections while the room connects and the participant joins.
+    plugins["stt"].prewarm()
+    plugins["llm"].prewarm()
+    plugins["tts"].prewarm()
+    rag_warmup = asyncio.create_task(warm_client())
 
     await ctx.connect(auto_subscribe=AutoSubscribe.AUDIO_ONLY)
     participant = await ctx.wait_for_participant()
+    joined_at = time.perf_counter()
     logger.info("Participant joined: %s", participant.identity)
 
-    instructions = (
-        "You are a helpful voice AI assistant. "
-        "User documents are accessible and automatically retrieved when relevant. "
-        "Be conversational, concise (under 3 sentences), and friendly."
-    )
-    try:
-        custom_prompt = await fetch_system_prompt()
-        if custom_prompt:
-            instructions = custom_prompt
-            logger.info("Loaded custom system prompt")
-    except Exception as e:
-        logger.warning("Using default prompt: %s", e)
+    settings = get_settings()
+    prompts = get_prompt_cache()
+    if not prompts.start():
+        # Loaded in prewarm; only waits here if this process skipped it.
+        await asyncio.to_thread(prompts.start, settings.PROMPT_WARMUP_TIMEOUT_S)
+    instructions = prompts.prompt
+
+    prefetcher = None
+    if settings.RAG_PREFETCH_ENABLED:
+        prefetcher = SpeculativeRetriever(
+            top_k=settings.RAG_TOP_K,
+            debounce_s=settings.RAG_PREFETCH_DEBOUNCE_MS / 1000,
+            min_words=settings.RAG_PREFETCH_MIN_WORDS,
+            match_ratio=settings.RAG_PREFETCH_MATCH_RATIO,
+        )
 
     agent = VoiceAIAgent(
         instructions=instructions,
-        stt=openai.STT(model="gpt-4o-mini-transcribe", api_key=oai_key, language="en"),
-        llm=openai.LLM(model="gpt-4o", api_key=oai_key),
-        tts=cartesia.TTS(model="sonic-2", api_key=cart_key),
+        stt=plugins["stt"],
+        llm=plugins["llm"],
+        tts=plugins["tts"],
         job_ctx=ctx,
+        prefetcher=prefetcher,
     )
 
-    session = AgentSession(vad=silero.VAD.load())
+    session = AgentSession(vad=vad)
 
     @session.on("user_input_transcribed")
     def on_transcribed(ev: UserInputTranscribedEvent):
-        # Log interim transcripts for debugging; final ones are sent in on_user_turn_completed
+        # Final transcripts are sent to the frontend in on_user_turn_completed
         if ev.is_final:
             logger.info("STT final: %s", ev.transcript)
+        if prefetcher:
+            # Prefetch tasks started here inherit the turn's trace id.
+            with structlog.contextvars.bound_contextvars(trace_id=agent.turn_trace_id()):
+                prefetcher.on_transcript(ev.transcript, ev.is_final)
+
+    @session.on("metrics_collected")
+    def on_metrics(ev: MetricsCollectedEvent):
+        record_session_metrics(ev.metrics)
 
     logger.info("Starting agent session...")
     await session.start(agent, room=ctx.room)
-    logger.info("Session active — agent processing audio")
+    ready_s = time.perf_counter() - joined_at
+    observe_stage("call_setup", ready_s)
+    rss = record_rss("in_call")
+    logger.info(
+        "Session active — agent processing audio (%.0f ms after join, RSS %s MB)",
+        ready_s * 1000,
+        rss // 2**20 if rss else "?",
+    )
+
+    def _on_prompt_updated(prompt: str) -> None:
+        # Edits from the UI reach calls already in progress from their next reply.
+        task = asyncio.create_task(agent.update_instructions(prompt))
+        task.add_done_callback(_on_instructions_updated)
+
+    remove_prompt_listener = prompts.add_listener(_on_prompt_updated)
+    if prompts.prompt != instructions:
+        # Edited while the session was starting.
+        _on_prompt_updated(prompts.prompt)
+
+    async def _stop_prompt_updates():
+        remove_prompt_listener()
+
+    ctx.add_shutdown_callback(_stop_prompt_updates)
+
+    if prefetcher:
+        async def _close_prefetcher():
+            prefetcher.reset()
+            logger.info("RAG prefetch summary: %s", prefetcher.stats())
+
+        ctx.add_shutdown_callback(_close_prefetcher)
+
+    async def _log_packing():
+        logger.info("RAG context packing summary: %s", agent.packer.stats())
 
+    ctx.add_shutdown_callback(_log_packing)
     ctx.add_shutdown_callback(close_client)
+    await rag_warmup
 
 
 def prewarm(proc: JobProcess):
+    """Load everything a call needs once per process, before the process is offered a job."""
+    started = time.perf_counter()
     proc.userdata["vad"] = silero.VAD.load()
+    proc.userdata["plugins"] = _speech_plugins()
+    get_prompt_cache().start(wait_s=get_settings().PROMPT_WARMUP_TIMEOUT_S)
+    prewarm_s = time.perf_counter() - started
+    observe_stage("process_prewarm", prewarm_s)
+    rss = record_rss("idle")
+    logger.info("Process prewarmed in %.0f ms (RSS %s MB)", prewarm_s * 1000, rss // 2**20 if rss else "?")
 
 
 if __name__ == "__main__":
     settings = get_settings()
+    pool_options = {"initialize_process_timeout": settings.AGENT_PREWARM_TIMEOUT_S}
+    if settings.AGENT_IDLE_PROCESSES is not None:
+        pool_options["num_idle_processes"] = settings.AGENT_IDLE_PROCESSES
+    metrics_options = {}
+    if settings.AGENT_METRICS_PORT:
+        metrics_options = {
+            "prometheus_port": settings.AGENT_METRICS_PORT,
+            "prometheus_multiproc_dir": settings.AGENT_METRICS_DIR,
+        }
     cli.run_app(
         WorkerOptions(
             entrypoint_fnc=entrypoint,
@@ -195,5 +349,7 @@ if __name__ == "__main__":
             api_key=settings.LIVEKIT_API_KEY,
             api_secret=settings.LIVEKIT_API_SECRET,
             ws_url=settings.LIVEKIT_URL,
+            **pool_options,
+            **metrics_options,
         ),
     )
@@ -15,13 +15,45 @@ class Settings(BaseSettings):
 
     # RAG Server
     RAG_SERVER_URL: str = "http://localhost:8001"
-
-    # API Server (for prompt fetch)
+    # "dense", "lexical" or "hybrid" (BM25 fused with vector search, so spoken codes and
+    # names match exactly); unset = the RAG server's RETRIEVAL_MODE
+    RAG_RETRIEVAL_MODE: str | None = None
+    RAG_TOP_K: int = 3
+    # Sent as X-Tenant-ID; unset = the RAG server's default tenant
+    RAG_TENANT_ID: str | None = None
+
+    # Speculative retrieval on interim transcripts (reused if the final text matches)
+    RAG_PREFETCH_ENABLED: bool = True
+    RAG_PREFETCH_DEBOUNCE_MS: int = 250
+    RAG_PREFETCH_MIN_WORDS: int = 3
+    RAG_PREFETCH_MATCH_RATIO: float = 0.8
+
+    # Short follow-ups answerable from the last turn's chunks skip /retrieve (0 = off)
+    RAG_FOLLOW_UP_MAX_WORDS: int = 8
+
+    # Retrieved chunks are merged, deduplicated and cut to this many tokens before injection (0 = no cap)
+    RAG_CONTEXT_BUDGET_TOKENS: int = 600
+
+    # API Server (prompt fallback when Redis is unreachable)
     API_SERVER_URL: str = "http://localhost:3000"
 
+    # System prompt: cached per process, loaded in prewarm (waiting up to the timeout)
+    # and updated from the gateway's Redis pub/sub channel
+    REDIS_URL: str = "redis://localhost:6379"
+    PROMPT_WARMUP_TIMEOUT_S: float = 5.0
+
     # Agent Config
     AGENT_NAME: str = "voice-ai-agent"
 
+    # Job processes kept prewarmed for the next calls (unset = LiveKit's default: up to 4
+    # in production, 0 in dev) and how long one may take to prewarm
+    AGENT_IDLE_PROCESSES: int | None = None
+    AGENT_PREWARM_TIMEOUT_S: float = 20.0
+
+    # Prometheus /metrics on the worker (0 = off); job processes share samples through the dir
+    AGENT_METRICS_PORT: int = 0
+    AGENT_METRICS_DIR: str = "/tmp/voice-agent-metrics"
+
     model_config = {"env_file": "../.env", "extra": "ignore"}
 
 
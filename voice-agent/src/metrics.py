@@ -0,0 +1,73 @@
+"""Prometheus metrics for the agent — per-turn latency by stage and RAG call outcomes.
+
+Each job process records into prometheus_client's default registry. With
+``AGENT_METRICS_PORT`` set, the LiveKit worker serves them at /metrics,
+aggregated across job processes through ``AGENT_METRICS_DIR``.
+"""
+import os
+
+from livekit.agents.metrics import AgentMetrics, EOUMetrics, LLMMetrics, STTMetrics, TTSMetrics
+from prometheus_client import Counter, Gauge, Histogram
+
+# Same buckets as the RAG server's stage histograms, so the two line up on one dashboard.
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.15, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+STAGE_SECONDS = Histogram(
+    "voice_agent_stage_duration_seconds",
+    "Time spent in one stage of a voice turn",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+
+RAG_REQUESTS = Counter(
+    "voice_agent_rag_requests_total",
+    "Calls to the RAG server's /retrieve by outcome",
+    ["outcome"],
+)
+
+RAG_TURNS = Counter(
+    "voice_agent_rag_turns_total",
+    "User turns by where their RAG chunks came from",
+    ["source"],
+)
+
+
+# One series per live job process (the pid label is added in multiprocess mode).
+PROCESS_RSS = Gauge(
+    "voice_agent_process_rss_bytes",
+    "Resident memory of a job process, once prewarmed (idle) and once its call is ready",
+    ["phase"],
+    multiprocess_mode="liveall",
+)
+
+
+def observe_stage(stage: str, seconds: float) -> None:
+    STAGE_SECONDS.labels(stage).observe(seconds)
+
+
+def record_rss(phase: str) -> int | None:
+    """Set this process's RSS gauge for ``phase``; returns the bytes, or ``None`` off Linux."""
+    try:
+        with open("/proc/self/statm") as f:
+            rss = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return None
+    PROCESS_RSS.labels(phase).set(rss)
+    return rss
+
+
+def record_session_metrics(metrics: AgentMetrics) -> None:
+    """Fold one ``metrics_collected`` event from the session into the stage histograms."""
+    if isinstance(metrics, EOUMetrics):
+        observe_stage("end_of_utterance", metrics.end_of_utterance_delay)
+        observe_stage("transcription", metrics.transcription_delay)
+        # Includes RAG retrieval, which runs in on_user_turn_completed.
+        observe_stage("user_turn_completed", metrics.on_user_turn_completed_delay)
+    elif isinstance(metrics, LLMMetrics) and not metrics.cancelled:
+        observe_stage("llm_ttft", metrics.ttft)
+    elif isinstance(metrics, TTSMetrics) and not metrics.cancelled:
+        observe_stage("tts_ttfb", metrics.ttfb)
+    elif isinstance(metrics, STTMetrics) and not metrics.streamed:
+        observe_stage("stt", metrics.duration)
@@ -0,0 +1,155 @@
+"""Context packing — shrink retrieved chunks to a token budget before they are injected.
+
+Every injected token is LLM prefill in front of the first word of the
+answer, and retrieved chunks repeat themselves: the RAG server splits
+documents with an overlap, so consecutive chunks of one document share
+their boundary text, and near-identical passages often recur across
+documents. ``ContextPacker`` merges runs of consecutive chunks into one
+passage (keeping the shared text once), drops sentences already included
+from a better-scoring passage, then keeps the best passages that fit the
+budget. Only the best passage is ever cut short; a later one either fits
+whole or is left out, so the budget goes to complete passages.
+"""
+import re
+
+from .session_memory import estimate_tokens
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_SPACE = re.compile(r"\s+")
+
+# Shorter sentences ("Yes.", "See below.") repeat legitimately; don't dedupe them.
+_MIN_DEDUP_CHARS = 24
+# Characters of a chunk's start looked for in its predecessor's tail.
+_OVERLAP_PROBE = 32
+
+
+def _overlap(a: str, b: str) -> int:
+    """Length of the longest suffix of ``a`` that ``b`` starts with (0 if under the probe length)."""
+    head = b[:_OVERLAP_PROBE]
+    pos = a.find(head, max(0, len(a) - len(b)))
+    while pos != -1:
+        if b.startswith(a[pos:]):
+            return len(a) - pos
+        pos = a.find(head, pos + 1)
+    return 0
+
+
+def merge_adjacent(chunks: list[dict]) -> list[dict]:
+    """Join chunks of one document with consecutive ``chunk_index`` into single passages.
+
+    A passage keeps the first chunk's fields, the best score of its chunks,
+    and the ids of all of them in ``chunk_ids``. Chunks without a
+    ``document_id`` or ``chunk_index`` pass through unchanged.
+    """
+    by_position: dict[tuple[str, int], dict] = {}
+    loose = []
+    for chunk in chunks:
+        if chunk.get("document_id") is None or chunk.get("chunk_index") is None:
+            loose.append(chunk)
+        else:
+            by_position.setdefault((chunk["document_id"], chunk["chunk_index"]), chunk)
+
+    passages = []
+    for (document_id, index), chunk in sorted(by_position.items()):
+        previous = passages[-1] if passages else None
+        if previous and previous["document_id"] == document_id and previous["_last_index"] == index - 1:
+            text = chunk.get("text", "")
+            shared = _overlap(previous["text"], text)
+            previous["text"] = previous["text"] + (text[shared:] if shared else " " + text)
+            previous["score"] = max(previous.get("score", 0), chunk.get("score", 0))
+            previous["chunk_ids"].append(chunk.get("chunk_id"))
+            previous["_last_index"] = index
+        else:
+            passages.append({
+                **chunk,
+                "chunk_ids": [chunk.get("chunk_id")],
+                "_last_index": index,
+            })
+
+    for passage in passages:
+        del passage["_last_index"]
+        if len(passage["chunk_ids"]) > 1:
+            # A stable id for the merged passage; session memory goes by ``chunk_ids``.
+            passage["chunk_id"] = "+".join(str(i) for i in passage["chunk_ids"])
+    return passages + loose
+
+
+class ContextPacker:
+    """Per-session packer; ``pack`` one turn's chunks, ``stats`` sums the savings so far.
+
+    ``budget_tokens`` of 0 disables the budget; merging and deduplication
+    still apply.
+    """
+
+    def __init__(self, budget_tokens: int):
+        self.budget_tokens = budget_tokens
+        self.turns = 0
+        self.input_tokens = 0
+        self.packed_tokens = 0
+
+    def pack(self, chunks: list[dict]) -> tuple[list[dict], dict]:
+        """Passages to inject, best first, and what packing removed."""
+        input_tokens = sum(estimate_tokens(c.get("text", "")) for c in chunks)
+        passages = sorted(merge_adjacent(chunks), key=lambda p: p.get("score", 0), reverse=True)
+
+        seen: set[str] = set()
+        packed = []
+        used = duplicates = trimmed = dropped = 0
+        for passage in passages:
+            kept: list[tuple[str, str]] = []
+            for sentence in _SENTENCE_END.split(passage.get("text", "").strip()):
+                key = _SPACE.sub(" ", sentence.lower()).strip()
+                if len(key) >= _MIN_DEDUP_CHARS and (key in seen or key in {k for k, _ in kept}):
+                    duplicates += 1
+                    continue
+                kept.append((key, sentence))
+            if not kept:
+                # Everything in it was already included.
+                dropped += 1
+                continue
+
+            fitted = kept
+            room = self.budget_tokens - used
+            if self.budget_tokens and estimate_tokens(" ".join(s for _, s in kept)) > room:
+                if packed:
+                    dropped += 1
+                    continue
+                # The best passage alone is over budget: keep its leading sentences.
+                fitted = []
+                for key, sentence in kept:
+                    if estimate_tokens(" ".join([*(s for _, s in fitted), sentence])) > room:
+                        break
+                    fitted.append((key, sentence))
+                if not fitted:
+                    dropped += 1
+                    continue
+                trimmed += 1
+
+            seen.update(key for key, _ in fitted if len(key) >= _MIN_DEDUP_CHARS)
+            text = " ".join(sentence for _, sentence in fitted)
+            used += estimate_tokens(text)
+            packed.append({**passage, "text": text})
+
+        self.turns += 1
+        self.input_tokens += input_tokens
+        self.packed_tokens += used
+        usage = {
+            "retrieved_chunks": len(chunks),
+            "packed_passages": len(packed),
+            "retrieved_tokens": input_tokens,
+            "packed_tokens": used,
+            "packing_saved_tokens": max(0, input_tokens - used),
+            "duplicate_sentences": duplicates,
+            "trimmed_passages": trimmed,
+            "dropped_passages": dropped,
+        }
+        return packed, usage
+
+    def stats(self) -> dict:
+        return {
+            "turns": self.turns,
+            "budget_tokens": self.budget_tokens,
+            "retrieved_tokens": self.input_tokens,
+            "packed_tokens": self.packed_tokens,
+            "saved_tokens": max(0, self.input_tokens - self.packed_tokens),
+        }
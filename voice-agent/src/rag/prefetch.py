@@ -0,0 +1,145 @@
+"""Speculative RAG prefetch — start retrieval from interim STT transcripts.
+
+Retrieval normally starts only after end-of-turn detection, putting the
+whole ``/retrieve`` round-trip in front of the LLM. Here each stable
+interim transcript (unchanged for the debounce window, or a final segment)
+fires a lookup; a newer transcript that reads differently cancels it. When
+the turn completes, a prefetch whose query is close enough to the final
+text is reused, otherwise a fresh lookup runs.
+"""
+import asyncio
+import re
+import time
+from difflib import SequenceMatcher
+
+import structlog
+
+from ..metrics import RAG_TURNS
+from .retriever import retrieve_rag_context
+
+logger = structlog.get_logger()
+
+_WORD = re.compile(r"[\w'-]+")
+
+
+def similarity(a: str, b: str) -> float:
+    """Word-level similarity in [0, 1], ignoring case and punctuation."""
+    return SequenceMatcher(None, _WORD.findall(a.lower()), _WORD.findall(b.lower())).ratio()
+
+
+class _Prefetch:
+    __slots__ = ("query", "task", "duration")
+
+    def __init__(self, query: str):
+        self.query = query
+        self.duration = 0.0
+        self.task: asyncio.Task | None = None
+
+
+class SpeculativeRetriever:
+    """Per-session prefetcher; feed it transcripts, then ask it for the turn's chunks."""
+
+    def __init__(self, top_k: int, debounce_s: float, min_words: int, match_ratio: float):
+        self.top_k = top_k
+        self.debounce_s = debounce_s
+        self.min_words = min_words
+        self.match_ratio = match_ratio
+        self._finals: list[str] = []
+        self._debounce: asyncio.Task | None = None
+        self._prefetch: _Prefetch | None = None
+
+        self.turns = 0
+        self.hits = 0
+        self.misses = 0
+        self.issued = 0
+        self.cancelled = 0
+        self.saved_s = 0.0
+
+    def on_transcript(self, text: str, is_final: bool) -> None:
+        """Handle a ``user_input_transcribed`` event."""
+        text = text.strip()
+        if not text:
+            return
+        if is_final:
+            # A turn can span several final segments; the turn text is all of them.
+            self._finals.append(text)
+            query, delay = " ".join(self._finals), 0.0
+        else:
+            query, delay = " ".join([*self._finals, text]), self.debounce_s
+
+        if len(query.split()) < self.min_words:
+            return
+        self._cancel_debounce()
+        if self._prefetch and similarity(query, self._prefetch.query) >= self.match_ratio:
+            # The running lookup already covers this wording.
+            return
+        self._debounce = asyncio.create_task(self._fire(query, delay))
+
+    async def _fire(self, query: str, delay: float) -> None:
+        if delay:
+            await asyncio.sleep(delay)
+        if self._prefetch and not self._prefetch.task.done():
+            self._prefetch.task.cancel()
+            self.cancelled += 1
+        prefetch = _Prefetch(query)
+        prefetch.task = asyncio.create_task(self._fetch(prefetch))
+        self._prefetch = prefetch
+        self.issued += 1
+
+    async def _fetch(self, prefetch: _Prefetch) -> list[dict]:
+        start = time.perf_counter()
+        chunks = await retrieve_rag_context(prefetch.query, top_k=self.top_k)
+        prefetch.duration = time.perf_counter() - start
+        return chunks
+
+    def _cancel_debounce(self) -> None:
+        if self._debounce and not self._debounce.done():
+            self._debounce.cancel()
+        self._debounce = None
+
+    async def retrieve(self, final_text: str) -> list[dict]:
+        """Chunks for a completed turn, reusing the prefetch when it matches."""
+        self._cancel_debounce()
+        prefetch, self._prefetch = self._prefetch, None
+        self._finals.clear()
+        self.turns += 1
+
+        if prefetch and similarity(final_text, prefetch.query) >= self.match_ratio:
+            start = time.perf_counter()
+            chunks = await prefetch.task
+            waited = time.perf_counter() - start
+            saved = max(0.0, prefetch.duration - waited)
+            self.hits += 1
+            self.saved_s += saved
+            RAG_TURNS.labels("prefetch").inc()
+            logger.info(
+                "RAG prefetch hit",
+                saved_ms=round(saved * 1000),
+                waited_ms=round(waited * 1000),
+                **self.stats(),
+            )
+            return chunks
+
+        if prefetch:
+            prefetch.task.cancel()
+            self.misses += 1
+            logger.info("RAG prefetch miss", prefetched=prefetch.query[:80], final=final_text[:80], **self.stats())
+        RAG_TURNS.labels("retrieve").inc()
+        return await retrieve_rag_context(final_text, top_k=self.top_k)
+
+    def reset(self) -> None:
+        """Drop the turn's state without retrieving (turn answered another way, or shutdown)."""
+        self._cancel_debounce()
+        if self._prefetch and self._prefetch.task:
+            self._prefetch.task.cancel()
+        self._prefetch = None
+        self._finals.clear()
+
+    def stats(self) -> dict:
+        return {
+            "turns": self.turns,
+            "hit_rate": round(self.hits / self.turns, 3) if self.turns else 0.0,
+            "issued": self.issued,
+            "cancelled": self.cancelled,
+            "avg_saved_ms": round(self.saved_s / self.hits * 1000) if self.hits else 0,
+        }
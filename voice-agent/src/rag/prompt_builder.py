@@ -1,9 +1,6 @@
 """Prompt builder — constructs the LLM prompt with system prompt + RAG context."""
-import httpx
-import structlog
 from ..config import get_settings
-
-logger = structlog.get_logger()
+from .context_packer import ContextPacker
 
 DEFAULT_PROMPT = """You are a helpful AI assistant that answers questions using the context provided from uploaded documents.
 
@@ -14,31 +11,25 @@ When answering:
 - Keep responses under 3 sentences unless asked for more detail"""
 
 
-async def fetch_system_prompt() -> str:
-    """Fetch the current system prompt from the API server."""
-    settings = get_settings()
-    try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(f"{settings.API_SERVER_URL}/api/prompt")
-            response.raise_for_status()
-            data = response.json()
-            return data.get("prompt", DEFAULT_PROMPT)
-    except Exception as e:
-        logger.warning("Could not fetch system prompt, using default", error=str(e))
-        return DEFAULT_PROMPT
-
-
 def build_prompt_with_context(
     system_prompt: str,
     rag_chunks: list[dict],
     user_query: str,
+    budget_tokens: int | None = None,
 ) -> str:
-    """Build the complete prompt with RAG context injected."""
+    """Build the complete prompt with RAG context injected.
+
+    Chunks are packed to ``budget_tokens`` first (default
+    ``RAG_CONTEXT_BUDGET_TOKENS``; 0 = no cap).
+    """
     prompt = system_prompt
 
     if rag_chunks:
+        if budget_tokens is None:
+            budget_tokens = get_settings().RAG_CONTEXT_BUDGET_TOKENS
+        passages, _ = ContextPacker(budget_tokens).pack(rag_chunks)
         context_parts = []
-        for i, chunk in enumerate(rag_chunks, 1):
+        for i, chunk in enumerate(passages, 1):
             source = chunk.get("filename", "Unknown")
             text = chunk.get("text", "")
             score = chunk.get("score", 0)
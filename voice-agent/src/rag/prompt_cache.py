@@ -0,0 +1,151 @@
+"""Process-wide system prompt cache, kept current by Redis pub/sub.
+
+The gateway stores the prompt under ``PROMPT_KEY`` and publishes every edit
+on ``PROMPT_CHANNEL``. A daemon thread holds the subscription for the life
+of the process: it is started in ``prewarm`` (before any event loop
+exists), subscribes first and then reads the key, so an edit made in
+between still arrives. Calls read the prompt from memory at start-up, and
+live sessions register a listener to receive edits as they happen.
+"""
+import asyncio
+import threading
+from typing import Callable
+
+import httpx
+import redis
+import structlog
+from redis.backoff import NoBackoff
+from redis.retry import Retry
+
+from ..config import get_settings
+from .prompt_builder import DEFAULT_PROMPT
+
+logger = structlog.get_logger()
+
+PROMPT_KEY = "voice-ai:system-prompt"
+PROMPT_CHANNEL = "voice-ai:system-prompt:updated"
+
+_CONNECT_TIMEOUT_S = 2.0
+_MAX_BACKOFF_S = 30.0
+
+
+class PromptCache:
+    """The current system prompt, pushed to listeners when it is edited."""
+
+    def __init__(self, client: redis.Redis, gateway_url: str | None = None):
+        self._redis = client
+        self._gateway_url = gateway_url
+        self._prompt: str | None = None
+        self._loaded = threading.Event()
+        self._closed = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._pubsub = None
+        self._lock = threading.Lock()
+        self._listeners: list[tuple[asyncio.AbstractEventLoop, Callable[[str], None]]] = []
+        self.updates = 0
+
+    @property
+    def prompt(self) -> str:
+        return self._prompt or DEFAULT_PROMPT
+
+    def start(self, wait_s: float = 0.0) -> bool:
+        """Start the subscription (once) and wait up to ``wait_s`` for the first load."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._listen, name="prompt-cache", daemon=True)
+            self._thread.start()
+        return self._loaded.wait(wait_s)
+
+    def close(self) -> None:
+        self._closed.set()
+        pubsub = self._pubsub
+        if pubsub is not None:
+            try:
+                pubsub.close()
+            except Exception:
+                pass
+
+    def add_listener(self, callback: Callable[[str], None]) -> Callable[[], None]:
+        """Call ``callback(prompt)`` on the running event loop after each edit; returns the remover."""
+        entry = (asyncio.get_running_loop(), callback)
+        with self._lock:
+            self._listeners.append(entry)
+
+        def remove() -> None:
+            with self._lock:
+                if entry in self._listeners:
+                    self._listeners.remove(entry)
+
+        return remove
+
+    def _set(self, prompt: str) -> None:
+        changed = self._prompt is not None and prompt != self._prompt
+        self._prompt = prompt
+        self._loaded.set()
+        if not changed:
+            return
+        self.updates += 1
+        logger.info("System prompt updated", chars=len(prompt))
+        with self._lock:
+            listeners = list(self._listeners)
+        for loop, callback in listeners:
+            try:
+                loop.call_soon_threadsafe(callback, prompt)
+            except RuntimeError:
+                # The session's loop has already closed.
+                pass
+
+    def _fetch_from_gateway(self) -> str:
+        try:
+            response = httpx.get(f"{self._gateway_url}/api/prompt", timeout=5.0)
+            response.raise_for_status()
+            return response.json().get("prompt", DEFAULT_PROMPT)
+        except Exception as e:
+            logger.warning("Could not fetch system prompt, using default", error=str(e))
+            return DEFAULT_PROMPT
+
+    def _listen(self) -> None:
+        backoff = 0.5
+        while not self._closed.is_set():
+            self._pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                self._pubsub.subscribe(PROMPT_CHANNEL)
+                self._set(self._redis.get(PROMPT_KEY) or DEFAULT_PROMPT)
+                backoff = 0.5
+                for message in self._pubsub.listen():
+                    if message["type"] == "message":
+                        self._set(message["data"])
+            except Exception as e:
+                if self._closed.is_set():
+                    break
+                logger.warning("System prompt subscription lost", error=str(e), retry_s=backoff)
+                if self._prompt is None:
+                    # Calls shouldn't wait on Redis; the gateway can still answer.
+                    self._set(self._fetch_from_gateway() if self._gateway_url else DEFAULT_PROMPT)
+                self._closed.wait(backoff)
+                backoff = min(backoff * 2, _MAX_BACKOFF_S)
+            finally:
+                try:
+                    self._pubsub.close()
+                except Exception:
+                    pass
+
+
+_cache: PromptCache | None = None
+
+
+def get_prompt_cache() -> PromptCache:
+    global _cache
+    if _cache is None:
+        settings = get_settings()
+        client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            decode_responses=True,
+            socket_connect_timeout=_CONNECT_TIMEOUT_S,
+            # The subscription loop retries with its own backoff; the client's retries
+            # would only delay the gateway fallback when Redis is down.
+            retry=Retry(NoBackoff(), 0),
+            # Pings on the idle subscription, so a dead connection is noticed and replaced.
+            health_check_interval=30,
+        )
+        _cache = PromptCache(client, gateway_url=settings.API_SERVER_URL)
+    return _cache
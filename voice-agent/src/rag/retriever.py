@@ -1,7 +1,10 @@
 """RAG retriever — HTTP client to the RAG Server."""
+import time
+
 import httpx
 import structlog
 from ..config import get_settings
+from ..metrics import RAG_REQUESTS, observe_stage
 
 logger = structlog.get_logger()
 
@@ -25,24 +28,53 @@ async def close_client() -> None:
         _client = None
 
 
+async def warm_client() -> None:
+    """Open a pooled connection to the RAG server before the first turn needs one."""
+    settings = get_settings()
+    try:
+        await _get_client().get(f"{settings.RAG_SERVER_URL}/health", timeout=2.0)
+    except Exception as e:
+        logger.warning("Could not warm the RAG server connection", error=str(e))
+
+
 async def retrieve_rag_context(query: str, top_k: int = 5) -> list[dict]:
-    """Call RAG server to retrieve relevant context for a query."""
+    """Call RAG server to retrieve relevant context for a query.
+
+    The turn's trace id, if one is bound, goes along as ``X-Trace-ID`` so the
+    RAG server's log lines for this call can be matched to the turn.
+    """
     settings = get_settings()
+    headers = {}
+    if settings.RAG_TENANT_ID:
+        headers["X-Tenant-ID"] = settings.RAG_TENANT_ID
+    trace_id = structlog.contextvars.get_contextvars().get("trace_id")
+    if trace_id:
+        headers["X-Trace-ID"] = trace_id
+
+    body = {"query": query, "top_k": top_k}
+    if settings.RAG_RETRIEVAL_MODE:
+        body["mode"] = settings.RAG_RETRIEVAL_MODE
 
+    start = time.perf_counter()
     try:
         response = await _get_client().post(
             f"{settings.RAG_SERVER_URL}/retrieve",
-            json={"query": query, "top_k": top_k},
+            json=body,
+            headers=headers,
         )
         response.raise_for_status()
         data = response.json()
         chunks = data.get("chunks", [])
+        observe_stage("rag_http", time.perf_counter() - start)
+        RAG_REQUESTS.labels("ok").inc()
         logger.info("RAG context retrieved", query=query[:80], chunks=len(chunks))
         return chunks
 
     except httpx.ConnectError:
+        RAG_REQUESTS.labels("unreachable").inc()
         logger.warning("RAG server unreachable, continuing without context")
         return []
     except Exception as e:
+        RAG_REQUESTS.labels("error").inc()
         logger.error("RAG retrieval failed", error=str(e))
         return []
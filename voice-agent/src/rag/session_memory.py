@@ -0,0 +1,133 @@
+"""Per-session retrieval memory — inject each chunk into the chat context once.
+
+The chat context keeps every earlier turn, so a chunk injected on turn 3 is
+still visible to the LLM on turn 7. ``RetrievalMemory`` labels injected
+chunks (``[S1]``, ``[S2]``, ...) and remembers which message carries them;
+later turns inject only new chunks and cite the rest by label. Chunks are
+forgotten once their host message drops out of the context (truncation).
+A passage the packer merged from adjacent chunks counts as known only if
+every chunk in it is, so it is recognised whichever way the chunks are
+grouped next time.
+
+Follow-up detection is a cheap lexical check: a short utterance whose
+content words all already appear in the previous query or its chunks
+("and the second one?", "what about the deposit?") reuses the previous
+results with no ``/retrieve`` call. An utterance with no content words at
+all counts only if it points back at those results ("that one", "tell me
+more"); a bare "okay" or "yes please" is not a follow-up question.
+"""
+import math
+import re
+
+import structlog
+
+logger = structlog.get_logger()
+
+_WORD = re.compile(r"[a-z0-9][a-z0-9'-]*")
+
+# Words that refer back to earlier results
+_REFERENCE_WORDS = frozenset(
+    "else it its more one ones other that them there these this those "
+    "first second third fourth fifth last next previous former latter same another again".split()
+)
+
+_FUNCTION_WORDS = _REFERENCE_WORDS | frozenset(
+    "a about also an and any are as at be but can could do does for from how i if in is "
+    "me my of on or please so tell than the then they to us was what when where which who why "
+    "with would you your ok okay yes no right really".split()
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English)."""
+    return math.ceil(len(text) / 4)
+
+
+class RetrievalMemory:
+    def __init__(self, follow_up_max_words: int = 8):
+        self.follow_up_max_words = follow_up_max_words
+        self._labels: dict[str, str] = {}  # chunk_id -> label of the passage it was injected in
+        self._hosts: dict[str, str] = {}  # chunk_id -> id of the message that carries it
+        self._next_label = 1
+        self._last_query = ""
+        self._last_chunks: list[dict] = []
+
+        self.turns = 0
+        self.follow_ups = 0
+        self.context_tokens = 0
+        self.saved_tokens = 0
+
+    def follow_up_chunks(self, text: str) -> list[dict] | None:
+        """The previous turn's chunks if ``text`` is a follow-up answerable from them, else ``None``."""
+        if not self._last_chunks:
+            return None
+        words = _WORD.findall(text.lower())
+        if not words or len(words) > self.follow_up_max_words:
+            return None
+        content = {w for w in words if w not in _FUNCTION_WORDS}
+        if not content and _REFERENCE_WORDS.isdisjoint(words):
+            return None
+        known = set(_WORD.findall(self._last_query.lower()))
+        for chunk in self._last_chunks:
+            known.update(_WORD.findall(chunk.get("text", "").lower()))
+        if not content <= known:
+            return None
+        self.follow_ups += 1
+        return self._last_chunks
+
+    def _new_label(self) -> str:
+        label = f"S{self._next_label}"
+        self._next_label += 1
+        return label
+
+    def build_context(self, query: str, chunks: list[dict], message_id: str, live_ids: set[str]) -> tuple[str, dict]:
+        """Context block for this turn (new chunks in full, known ones by label) and its usage.
+
+        ``live_ids`` are the ids of the messages currently in the chat context.
+        """
+        for chunk_id in [c for c, host in self._hosts.items() if host not in live_ids]:
+            del self._hosts[chunk_id]
+
+        new, reused = [], []
+        for chunk in chunks:
+            # Merged passages carry their chunks' ids; memory works on those, not the joined id.
+            chunk_ids = [str(i) for i in chunk.get("chunk_ids") or [chunk.get("chunk_id") or chunk.get("text", "")]]
+            if all(chunk_id in self._hosts for chunk_id in chunk_ids):
+                reused.extend(self._labels[chunk_id] for chunk_id in chunk_ids)
+                continue
+            labels = {self._labels.get(chunk_id) for chunk_id in chunk_ids}
+            # Re-injected after truncation: keep its old label if it had exactly one.
+            label = labels.pop() if len(labels) == 1 and None not in labels else self._new_label()
+            for chunk_id in chunk_ids:
+                self._labels[chunk_id] = label
+                self._hosts[chunk_id] = message_id
+            new.append(f"[{label}] {chunk.get('text', '')}")
+        reused = list(dict.fromkeys(reused))
+
+        lines = ["--- KNOWLEDGE BASE CONTEXT ---", *new]
+        if reused:
+            lines.append(f"(Also relevant, provided earlier in this conversation: {', '.join(f'[{r}]' for r in reused)})")
+        lines.append("----------------------------")
+        context = "\n".join(lines) + "\n\n"
+
+        # What re-injecting every chunk in full would cost.
+        full = estimate_tokens("\n".join([lines[0], *(c.get("text", "") for c in chunks), lines[-1]]) + "\n\n")
+        tokens = estimate_tokens(context)
+        self.turns += 1
+        self.context_tokens += tokens
+        self.saved_tokens += max(0, full - tokens)
+        self._last_query = query
+        self._last_chunks = chunks
+
+        usage = {
+            "turn": self.turns,
+            "chunks": len(chunks),
+            "new_chunks": len(new),
+            "reused_chunks": len(reused),
+            "context_tokens": tokens,
+            "saved_tokens": max(0, full - tokens),
+            "total_context_tokens": self.context_tokens,
+            "total_saved_tokens": self.saved_tokens,
+            "follow_ups": self.follow_ups,
+        }
+        return context, usage